@@ -1,7 +1,8 @@
 from django.contrib import admin
 
-from cardroom.models import CashGame, HandHistory, Poker
+from cardroom.models import CashGame, HandHistory, Participant, Poker
 
 admin.site.register(CashGame)
 admin.site.register(HandHistory)
+admin.site.register(Participant)
 admin.site.register(Poker)
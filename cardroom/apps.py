@@ -1,4 +1,8 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CardroomConfig(AppConfig):
@@ -7,3 +11,38 @@ class CardroomConfig(AppConfig):
 
     def ready(self) -> None:
         __import__('cardroom.signals')
+        __import__('cardroom.recorders')
+        __import__('cardroom.lobbies')
+
+        if self.is_serving():
+            from cardroom.consumers import CashGameConsumer
+
+            CashGameConsumer.setup()
+
+    def is_serving(self) -> bool:
+        """Return whether this process is starting to serve the ASGI
+        application.
+
+        The cash-game tables are started only then, so that management
+        commands, tests, and other processes that merely load the apps
+        do not start any. The server is taken to be starting if the ASGI
+        application is being imported, as ASGI servers do, or if this
+        process serves the ``runserver`` command, rather than watching
+        for code changes to restart the one that does.
+
+        :return: ``True`` if the server is starting, otherwise
+                 ``False``.
+        """
+        module_name, _, _ = getattr(
+            settings,
+            'ASGI_APPLICATION',
+            '',
+        ).rpartition('.')
+
+        if module_name in sys.modules:
+            return True
+
+        return sys.argv[1:2] == ['runserver'] and (
+            os.environ.get('RUN_MAIN') == 'true'
+            or '--noreload' in sys.argv
+        )
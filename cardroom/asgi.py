@@ -10,12 +10,18 @@ from channels.security.websocket import (  # type: ignore[import-untyped]
 )
 from django.core.asgi import get_asgi_application
 
-from cardroom.middlewares import TokenAuthMiddlewareStack
 from cardroom.utilities import get_root_routingconf
 
+# The apps are set up, and the tables started (see
+# cardroom.apps.CardroomConfig.is_serving), before anything importing
+# the models is.
+http_application = get_asgi_application()
+
+from cardroom.middlewares import TokenAuthMiddlewareStack  # noqa: E402
+
 application = ProtocolTypeRouter(
     {
-        'http': get_asgi_application(),
+        'http': http_application,
         'websocket': AllowedHostsOriginValidator(
             AuthMiddlewareStack(
                 TokenAuthMiddlewareStack(
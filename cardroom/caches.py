@@ -0,0 +1,230 @@
+""":mod:`cardroom.caches` implements classes related to in-process
+caches.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+
+@dataclass
+class LRUCache:
+    """The base class for in-process caches.
+
+    Entries are evicted in least recently used order once there are
+    more than :attr:`size` of them. Subclasses decide which entries are
+    still valid when looked up.
+
+    The cache is local to each process.
+    """
+
+    size: int = 1024
+    """The maximum number of entries."""
+    hit_count: int = field(default=0, init=False, repr=False, compare=False)
+    """The number of lookups served from the cache."""
+    miss_count: int = field(default=0, init=False, repr=False, compare=False)
+    """The number of lookups not served from the cache."""
+    _entries: OrderedDict[Any, Any] = field(
+        default_factory=OrderedDict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _lock: Lock = field(
+        default_factory=Lock,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the ratio of lookups served from the cache.
+
+        :return: The hit rate, or ``0`` if nothing was looked up.
+        """
+        lookup_count = self.hit_count + self.miss_count
+
+        return self.hit_count / lookup_count if lookup_count else 0
+
+    def _get(self, key: Any, validate: Callable[[Any], bool]) -> Any:
+        with self._lock:
+            if key not in self._entries or not validate(self._entries[key]):
+                self._entries.pop(key, None)
+
+                self.miss_count += 1
+
+                raise KeyError(key)
+
+            self._entries.move_to_end(key)
+
+            self.hit_count += 1
+
+            return self._entries[key]
+
+    def _set(self, key: Any, entry: Any) -> None:
+        with self._lock:
+            self._entries[key] = entry
+
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.size:
+                self._entries.popitem(False)
+
+    def discard(self, key: Any) -> None:
+        """Discard the entry, if cached.
+
+        :param key: The key.
+        :return: ``None``.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Discard all entries and reset the statistics.
+
+        :return: ``None``.
+        """
+        with self._lock:
+            self._entries.clear()
+
+            self.hit_count = 0
+            self.miss_count = 0
+
+
+@dataclass
+class TokenCache(LRUCache):
+    """The class for caches of token-to-user resolutions.
+
+    Entries are keyed by the token keys and expire after :attr:`ttl`
+    seconds. Unknown tokens are cached too, resolving to anonymous
+    users, so that repeated handshakes with stale tokens do not reach
+    the database either.
+
+    Invalidations triggered by token or user changes only reach the
+    process that made them, so the TTL bounds how long other processes
+    may keep serving a stale resolution.
+    """
+
+    ttl: float = 60
+    """The number of seconds an entry is valid for."""
+
+    def get(self, key: str) -> Any:
+        """Return the user the token resolves to.
+
+        :param key: The token key.
+        :return: The user.
+        :raises KeyError: If the token is not cached or has expired.
+        """
+        time = monotonic()
+        _, user = self._get(key, lambda entry: entry[0] > time)
+
+        return user
+
+    def set(self, key: str, user: Any) -> None:
+        """Cache the user the token resolves to.
+
+        :param key: The token key.
+        :param user: The user.
+        :return: ``None``.
+        """
+        self._set(key, (monotonic() + self.ttl, user))
+
+    def discard_user(self, pk: Any) -> None:
+        """Discard the tokens resolving to the user.
+
+        :param pk: The primary key of the user.
+        :return: ``None``.
+        """
+        with self._lock:
+            for key, (_, user) in tuple(self._entries.items()):
+                if user.pk is not None and user.pk == pk:
+                    del self._entries[key]
+
+
+@dataclass
+class ReplayCache(LRUCache):
+    """The class for caches of hand history replays.
+
+    Entries are keyed by the primary keys of the hand histories and
+    hold their digests alongside their replays, so that a hand whose
+    contents changed is replayed anew.
+    """
+
+    size: int = 256
+    """The maximum number of entries."""
+
+    def get(self, pk: Any, digest: str) -> Any:
+        """Return the replay of the hand history.
+
+        :param pk: The primary key of the hand history.
+        :param digest: The digest of the hand history.
+        :return: The replay.
+        :raises KeyError: If the hand history is not cached or has
+                          changed since.
+        """
+        _, replay = self._get(pk, lambda entry: entry[0] == digest)
+
+        return replay
+
+    def set(self, pk: Any, digest: str, replay: Any) -> None:
+        """Cache the replay of the hand history.
+
+        :param pk: The primary key of the hand history.
+        :param digest: The digest of the hand history.
+        :param replay: The replay.
+        :return: ``None``.
+        """
+        self._set(pk, (digest, replay))
+
+
+@dataclass
+class ThumbnailCache(LRUCache):
+    """The class for caches of rendered table thumbnails.
+
+    Entries are keyed by the group names of the tables and hold the
+    versions of the frames they were rendered from. A thumbnail is
+    served until its table has moved on to a newer frame and at least
+    :attr:`interval` seconds have passed since it was rendered, so
+    that each table is rendered at most once per interval however
+    many lobbies show it.
+    """
+
+    interval: float = 5
+    """The minimum number of seconds between renders of a table."""
+
+    def get(self, group_name: str, version: int) -> tuple[int, str]:
+        """Return the thumbnail of the table.
+
+        :param group_name: The group name of the table.
+        :param version: The version of the latest frames of the table.
+        :return: The version the thumbnail was rendered from and the
+                 thumbnail.
+        :raises KeyError: If the table is not cached, or its thumbnail
+                          is outdated and due to be rendered again.
+        """
+        time = monotonic()
+        _, cached_version, thumbnail = self._get(
+            group_name,
+            lambda entry: (
+                entry[1] == version
+                or time - entry[0] < self.interval
+            ),
+        )
+
+        return cached_version, thumbnail
+
+    def set(self, group_name: str, version: int, thumbnail: str) -> None:
+        """Cache the thumbnail of the table.
+
+        :param group_name: The group name of the table.
+        :param version: The version of the frames it was rendered from.
+        :param thumbnail: The thumbnail.
+        :return: ``None``.
+        """
+        self._set(group_name, (monotonic(), version, thumbnail))
@@ -1,21 +1,32 @@
 from abc import ABC, abstractmethod
+from logging import getLogger
+from time import perf_counter
 from typing import Any, cast
+from urllib.parse import parse_qs
 
-from asgiref.sync import async_to_sync
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import (  # type: ignore[import-untyped]
-    JsonWebsocketConsumer,
+    AsyncJsonWebsocketConsumer,
 )
 from django.contrib.auth.models import AnonymousUser, User
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import OperationalError, ProgrammingError
 
 from cardroom.controllers import Controller
 from cardroom.gamemaster import Gamemaster
+from cardroom.lobbies import Lobby
 from cardroom.models import CashGame
-from cardroom.utilities import serialize
-import cardroom.models as models
 
+logger = getLogger(__name__)
+
+
+class ControllerConsumer(  # type: ignore[misc]
+        AsyncJsonWebsocketConsumer,
+        ABC,
+):
+    group_name: str
+    _controller: Controller | None = None
 
-class ControllerConsumer(JsonWebsocketConsumer, ABC):  # type: ignore[misc]
     @classmethod
     @abstractmethod
     def setup(self) -> None:
@@ -25,46 +36,99 @@ class ControllerConsumer(JsonWebsocketConsumer, ABC):  # type: ignore[misc]
     def pk(self) -> int:
         return cast(int, self.scope['url_route']['kwargs']['pk'])
 
+    @property
+    def cursor(self) -> int | None:
+        query_string = parse_qs(self.scope['query_string'].decode())
+
+        try:
+            cursor = int(query_string['cursor'][0])
+        except (KeyError, ValueError):
+            cursor = None
+
+        return cursor
+
     @property
     def user(self) -> AnonymousUser | User:
         return cast(AnonymousUser | User, self.scope['user'])
 
     @property
+    def controller(self) -> Controller:
+        """Return the controller of the connected group.
+
+        The controller is looked up once and reused until a ``reload``
+        event is received.
+
+        :return: The controller.
+        """
+        if self._controller is None:
+            self._controller = Controller.lookup(self.group_name)
+
+        return self._controller
+
     @abstractmethod
-    def controller(self) -> models.Controller:
+    async def get_group_name(self) -> str:
         pass
 
-    def connect(self) -> None:
-        super().connect()
+    async def connect(self) -> None:
+        try:
+            group_name = await self.get_group_name()
+        except ObjectDoesNotExist:
+            await self.close()
+
+            return
 
-        group_name = self.controller.group_name
+        self.group_name = group_name
 
-        async_to_sync(self.channel_layer.group_add)(
-            group_name,
-            self.channel_name,
-        )
-        self.update(
-            {
+        await super().connect()
+        await self.channel_layer.group_add(group_name, self.channel_name)
+
+        cursor = self.cursor
+
+        if cursor is None:
+            history = None
+        else:
+            history = await sync_to_async(
+                Gamemaster.get_history,
+                thread_sensitive=False,
+            )(group_name, cursor)
+
+        if history is None:
+            version, frames = await sync_to_async(
+                Gamemaster.get_keyframe,
+                thread_sensitive=False,
+            )(group_name)
+            event = {
                 'type': 'update',
-                'frames': [serialize(Gamemaster.get_frames(group_name))],
-            },
-        )
+                'frames': [frames],
+                'version': version,
+                'keyframe': True,
+            }
+        else:
+            assert cursor is not None
 
-    def disconnect(self, code: int) -> None:
-        async_to_sync(self.channel_layer.group_discard)(
-            self.controller.group_name,
-            self.channel_name,
-        )
-        super().disconnect(code)
+            event = {
+                'type': 'update',
+                'frames': history,
+                'version': cursor + len(history),
+                'keyframe': False,
+            }
+
+        await self.update(event)
+
+    async def disconnect(self, code: int) -> None:
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(
+                self.group_name,
+                self.channel_name,
+            )
 
-    def receive_json(self, content: Any, **kwargs: Any) -> None:
-        if self.user.is_authenticated:
-            group_name = self.controller.group_name
-            controller = Controller.lookup(group_name)
+        await super().disconnect(code)
 
-            controller.handle(self.user.username, content)
+    async def receive_json(self, content: Any, **kwargs: Any) -> None:
+        if self.user.is_authenticated:
+            self.controller.handle(self.user.username, content)
         else:
-            self.notify(
+            await self.notify(
                 {
                     'type': 'notify',
                     'users': [''],
@@ -72,8 +136,8 @@ class ControllerConsumer(JsonWebsocketConsumer, ABC):  # type: ignore[misc]
                 },
             )
 
-    def update(self, event: dict[str, Any]) -> None:
-        self.send_json(
+    async def update(self, event: dict[str, Any]) -> None:
+        await self.send_json(
             (
                 event
                 | {
@@ -87,25 +151,94 @@ class ControllerConsumer(JsonWebsocketConsumer, ABC):  # type: ignore[misc]
             )
         )
 
-    def notify(self, event: dict[str, Any]) -> None:
+    async def notify(self, event: dict[str, Any]) -> None:
         if self.user.username in event['users']:
-            self.send_json(event)
+            await self.send_json(event)
+
+    async def reload(self, event: dict[str, Any]) -> None:
+        self._controller = None
+
+    async def terminate(self, event: dict[str, Any]) -> None:
+        await self.close()
 
 
 class CashGameConsumer(ControllerConsumer):
     @classmethod
     def setup(self) -> None:
+        """Start the controllers of the cash games that are not running
+        yet.
+
+        This is called once as the server starts (see
+        :meth:`cardroom.apps.CardroomConfig.is_serving`), not when this
+        module is imported, so that management commands and other
+        processes that merely import the consumers do not start any
+        tables. The controllers run by other processes sharing the
+        frame store are skipped.
+
+        :return: ``None``.
+        """
+        start = perf_counter()
+
         try:
-            cash_games = tuple(CashGame.objects.all())
+            cash_games = tuple(CashGame.objects.select_related('game'))
         except (OperationalError, ProgrammingError):
             cash_games = ()
 
+        count = 0
+        skipped_count = 0
+
         for cash_game in cash_games:
-            Controller.start(cash_game.group_name, cash_game.load())
+            try:
+                Controller.lookup(cash_game.group_name)
+            except KeyError:
+                try:
+                    cash_game.start()
+                except ValueError:
+                    skipped_count += 1
+                else:
+                    count += 1
+
+        logger.info(
+            (
+                'Started %d cash-game controllers in %.3f seconds (%d run'
+                ' by other processes)'
+            ),
+            count,
+            perf_counter() - start,
+            skipped_count,
+        )
+
+    async def get_group_name(self) -> str:
+        return (await CashGame.objects.aget(pk=self.pk)).group_name
 
-    @property
-    def controller(self) -> CashGame:
-        return CashGame.objects.get(pk=self.pk)
 
+class LobbyConsumer(AsyncJsonWebsocketConsumer):  # type: ignore[misc]
+    """The consumer of the lobby feed.
 
-CashGameConsumer.setup()
+    The lobby is sent on connection, followed by the deltas of the
+    summaries as they change (see :class:`cardroom.lobbies.Lobby`).
+    """
+
+    async def connect(self) -> None:
+        await super().connect()
+        await self.channel_layer.group_add(
+            Lobby.group_name,
+            self.channel_name,
+        )
+
+        _, data = Lobby.get_data()
+
+        await self.send(data.decode())
+
+    async def disconnect(self, code: int) -> None:
+        await self.channel_layer.group_discard(
+            Lobby.group_name,
+            self.channel_name,
+        )
+
+        await super().disconnect(code)
+
+    async def update(self, event: dict[str, Any]) -> None:
+        await self.send_json(
+            {'version': event['version'], 'tables': event['tables']},
+        )
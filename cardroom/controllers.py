@@ -19,8 +19,13 @@ from django.dispatch import Signal
 from pokerkit import min_or_none, parse_action
 
 from cardroom.frame import Frame
-from cardroom.signals import post_state_construction, pre_state_destruction
+from cardroom.signals import (
+    post_state_construction,
+    post_termination,
+    pre_state_destruction,
+)
 from cardroom.table import Table
+from cardroom.utilities import get_settings
 
 
 @dataclass(frozen=True)
@@ -35,9 +40,16 @@ class Controller(ABC):
     def start(cls, name: str, controller: Controller) -> None:
         """Associate a name with a controller and start it.
 
+        The name is claimed in the frame store first, so that no other
+        process runs a controller of the same name (see
+        :meth:`cardroom.stores.FrameStore.acquire`).
+
         :param name: The controller name.
         :param controller: The associated controller.
         :return: ``None``.
+        :raises ValueError: If the name is already associated with a
+                            running controller, in this process or in
+                            another.
         """
         with cls._lock:
             if name in cls._controllers:
@@ -48,6 +60,14 @@ class Controller(ABC):
                     ),
                 )
 
+            if not get_settings().frame_store.acquire(name):
+                raise ValueError(
+                    (
+                        f'The name {name} has already been associated with a'
+                        ' controller running in another process.'
+                    ),
+                )
+
             assert name not in cls._controllers
             assert name not in cls._threads
 
@@ -70,6 +90,7 @@ class Controller(ABC):
 
         controller.handle('', 'terminate')
         thread.join()
+        get_settings().frame_store.release(name)
 
         return controller
 
@@ -105,6 +126,8 @@ class Controller(ABC):
     """The value parser."""
     tzinfo: ZoneInfo
     """The timezone."""
+    name: str = field(default='', kw_only=True)
+    """The name it is started with (``''`` if unnamed)."""
 
     @abstractmethod
     def mainloop(self) -> None:
@@ -497,6 +520,8 @@ class Controller(ABC):
 
             users_message = [], ''
 
+        send_signal(post_termination)
+
 
 @dataclass(frozen=True)
 class CashGame(Controller):
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, KW_ONLY
-from math import pi
-from typing import TypeVar
+from html import escape
+from math import cos, hypot, pi, sin
+from typing import Any, TypeVar
 
 _T = TypeVar('_T')
 
@@ -122,4 +123,385 @@ class Style:
     shifter_timeout: float = 0.25
     watchdog_timeout: float = 1
 
+    render_on_change_status: bool = True
     frame_rate: float = 1000
+
+
+SUIT_CHARS: dict[str, str] = {
+    'c': '♣',
+    'd': '♦',
+    'h': '♥',
+    's': '♠',
+    '?': ' ',
+}
+SUIT_COLOR_KEYS: dict[str, str] = {
+    'c': 'club_color',
+    'd': 'diamond_color',
+    'h': 'heart_color',
+    's': 'spade_color',
+    '?': 'unknown_color',
+}
+
+
+def get_point_on_ellipse(
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        angle: float,
+) -> tuple[float, float]:
+    """Return the point on the ellipse in the direction of the angle.
+
+    This mirrors ``Felt.getPointOnEllipse`` in ``felt.js``.
+
+    :param x: The x-coordinate of the center.
+    :param y: The y-coordinate of the center.
+    :param width: The width.
+    :param height: The height.
+    :param angle: The angle.
+    :return: The point.
+    """
+    rx = width / 2
+    ry = height / 2
+    radius = rx * ry / hypot(ry * cos(angle), rx * sin(angle))
+
+    return x + radius * cos(angle), y + radius * sin(angle)
+
+
+def render_thumbnail(
+        frame: Any,
+        style: Style,
+        width: float,
+        height: float,
+) -> str:
+    """Render the serialized frame as an SVG image.
+
+    The layout is that of ``Felt`` in ``felt.js``, so that thumbnails
+    look like the felt they preview. Text widths are estimated.
+
+    :param frame: The serialized frame.
+    :param style: The style.
+    :param width: The width of the image.
+    :param height: The height of the image.
+    :return: The SVG image.
+    """
+    elements = []
+
+    def format_(value: Any) -> str:
+        if isinstance(value, float):
+            return f'{value:.5g}'
+
+        return str(value)
+
+    def rect(
+            x: float,
+            y: float,
+            width: float,
+            height: float,
+            radius: float,
+            color: str,
+    ) -> None:
+        elements.append(
+            (
+                f'<rect x="{format_(x - width / 2)}"'
+                f' y="{format_(y - height / 2)}" width="{format_(width)}"'
+                f' height="{format_(height)}" rx="{format_(radius)}"'
+                f' fill="{escape(color)}"/>'
+            ),
+        )
+
+    def text(
+            value: Any,
+            x: float,
+            y: float,
+            color: str,
+            text_style: str,
+            font: str,
+            size: float,
+    ) -> None:
+        weight = 'bold' if 'bold' in text_style else 'normal'
+        font_style = 'italic' if 'italic' in text_style else 'normal'
+
+        elements.append(
+            (
+                f'<text transform="translate({format_(x)} {format_(y)})'
+                f' scale(1 -1)" fill="{escape(color)}"'
+                f' font-family="{escape(font)}" font-size="{format_(size)}"'
+                f' font-weight="{weight}" font-style="{font_style}"'
+                ' text-anchor="middle" dominant-baseline="central">'
+                f'{escape(format_(value))}</text>'
+            ),
+        )
+
+    def card(
+            value: Any,
+            x: float,
+            y: float,
+            width: float,
+            height: float,
+            radius: float,
+            color: str,
+            text_style: str,
+            font: str,
+            size: float,
+    ) -> None:
+        rect(x, y, width, height, radius, color)
+        text(
+            value['rank'] + SUIT_CHARS[value['suit']],
+            x,
+            y,
+            getattr(style, SUIT_COLOR_KEYS[value['suit']]),
+            text_style,
+            font,
+            size,
+        )
+
+    elements.append(
+        (
+            f'<ellipse cx="{format_(style.table_x)}"'
+            f' cy="{format_(style.table_y)}"'
+            f' rx="{format_(style.table_outer_width / 2)}"'
+            f' ry="{format_(style.table_outer_height / 2)}"'
+            f' fill="{escape(style.table_border_color)}"/>'
+        ),
+    )
+    elements.append(
+        (
+            f'<ellipse cx="{format_(style.table_x)}"'
+            f' cy="{format_(style.table_y)}"'
+            f' rx="{format_(style.table_inner_width / 2)}"'
+            f' ry="{format_(style.table_inner_height / 2)}"'
+            f' fill="{escape(style.table_felt_color)}"/>'
+        ),
+    )
+    rect(
+        style.board_x,
+        style.board_y,
+        style.board_width,
+        style.board_height,
+        style.board_radius,
+        style.board_color,
+    )
+    text(
+        style.board_pot_text + ', '.join(map(format_, frame['pot'])),
+        style.board_x,
+        style.board_y,
+        style.board_pot_text_color,
+        style.board_pot_text_style,
+        style.board_pot_text_font,
+        style.board_pot_text_size,
+    )
+
+    if board_count := sum(frame['game']['board']):
+        board_card_width = (
+            style.board_width
+            - 2 * style.board_radius
+            - (board_count - 1) * style.board_card_margin
+        ) / board_count
+        board_card_x = (
+            style.board_x
+            - style.board_width / 2
+            + style.board_radius
+            + board_card_width / 2
+        )
+        board_card_y = (
+            style.board_y
+            + style.board_height / 2
+            + style.board_card_height / 2
+            + style.board_card_margin
+        )
+
+        for board_card in frame['board']:
+            card(
+                board_card,
+                board_card_x,
+                board_card_y,
+                board_card_width,
+                style.board_card_height,
+                style.board_card_radius,
+                style.board_card_color,
+                style.board_card_text_style,
+                style.board_card_text_font,
+                style.board_card_text_size,
+            )
+
+            board_card_x += board_card_width + style.board_card_margin
+
+    hole_statuses = [
+        status for statuses in frame['game']['hole'] for status in statuses
+    ]
+    hole_card_count = max(
+        sum(hole_statuses),
+        len(hole_statuses) - sum(hole_statuses),
+    )
+
+    for i, seat in enumerate(frame['seats']):
+        angle = -2 * pi * i / len(frame['seats'])
+
+        if seat['button']:
+            x, y = get_point_on_ellipse(
+                style.table_x,
+                style.table_y,
+                style.button_ring_width,
+                style.button_ring_height,
+                angle + style.button_angle,
+            )
+
+            elements.append(
+                (
+                    f'<circle cx="{format_(x)}" cy="{format_(y)}"'
+                    f' r="{format_(style.button_diameter / 2)}"'
+                    f' fill="{escape(style.button_color)}"/>'
+                ),
+            )
+            text(
+                style.button_text,
+                x,
+                y,
+                style.button_text_color,
+                style.button_text_style,
+                style.button_text_font,
+                style.button_text_size,
+            )
+
+        if seat['bet']:
+            x, y = get_point_on_ellipse(
+                style.table_x,
+                style.table_y,
+                style.bet_ring_width,
+                style.bet_ring_height,
+                angle + style.bet_angle,
+            )
+            bet_box_width = (
+                0.6 * style.bet_text_size * len(format_(seat['bet']))
+                + style.bet_box_x_padding
+            )
+
+            rect(
+                x,
+                y,
+                bet_box_width,
+                style.bet_box_height,
+                style.bet_box_radius,
+                style.bet_box_color,
+            )
+            text(
+                seat['bet'],
+                x,
+                y,
+                style.bet_text_color,
+                style.bet_text_style,
+                style.bet_text_font,
+                style.bet_text_size,
+            )
+
+        seat_x, seat_y = get_point_on_ellipse(
+            style.table_x,
+            style.table_y,
+            style.seat_ring_width,
+            style.seat_ring_height,
+            angle + style.seat_angle,
+        )
+        hole_x = seat_x + style.hole_x
+        hole_y = seat_y + style.hole_y
+
+        rect(
+            hole_x,
+            hole_y,
+            style.hole_width,
+            style.hole_height,
+            style.hole_radius,
+            style.hole_color,
+        )
+
+        if hole_card_count:
+            hole_card_width = (
+                style.hole_width
+                - 2 * style.hole_radius
+                - (hole_card_count - 1) * style.hole_card_margin
+            ) / hole_card_count
+            hole_card_y = (
+                hole_y
+                + style.hole_height / 2
+                + style.hole_card_height / 2
+                + style.hole_card_margin
+            )
+
+            for status in (False, True):
+                hole_card_x = (
+                    hole_x
+                    - style.hole_width / 2
+                    + style.hole_radius
+                    + hole_card_width / 2
+                )
+
+                for hole_card, hole_status in zip(seat['hole'], hole_statuses):
+                    if hole_status != status:
+                        continue
+
+                    card(
+                        hole_card,
+                        hole_card_x,
+                        hole_card_y,
+                        hole_card_width,
+                        style.hole_card_height,
+                        style.hole_card_radius,
+                        style.hole_card_color,
+                        style.hole_card_text_style,
+                        style.hole_card_text_font,
+                        style.hole_card_text_size,
+                    )
+
+                    hole_card_x += hole_card_width + style.hole_card_margin
+
+                hole_card_y += style.hole_card_height + style.hole_card_margin
+
+        if seat['user']:
+            rect(
+                seat_x + style.name_x,
+                seat_y + style.name_y,
+                style.name_box_width,
+                style.name_box_height,
+                style.name_box_radius,
+                style.name_box_color,
+            )
+            text(
+                seat['user'],
+                seat_x + style.name_x,
+                seat_y + style.name_y,
+                style.name_text_color,
+                style.name_text_style,
+                style.name_text_font,
+                style.name_text_size,
+            )
+
+        if seat['stack'] is not None:
+            rect(
+                seat_x + style.stack_x,
+                seat_y + style.stack_y,
+                style.stack_box_width,
+                style.stack_box_height,
+                style.stack_box_radius,
+                style.stack_box_color,
+            )
+            text(
+                seat['stack'],
+                seat_x + style.stack_x,
+                seat_y + style.stack_y,
+                style.stack_text_color,
+                style.stack_text_style,
+                style.stack_text_font,
+                style.stack_text_size,
+            )
+
+    scale = min(width, height)
+
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg"'
+        f' width="{format_(width)}" height="{format_(height)}">'
+        f'<rect width="100%" height="100%"'
+        f' fill="{escape(style.background_color)}"/>'
+        f'<g transform="translate({format_(width / 2)} {format_(height / 2)})'
+        f' scale({format_(scale)} {format_(-scale)})">'
+        f'{"".join(elements)}</g></svg>'
+    )
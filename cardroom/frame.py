@@ -6,9 +6,10 @@ from datetime import datetime
 from itertools import chain
 from typing import Literal, TypeVar
 
-from pokerkit import Card, HandHistory, Poker
+from pokerkit import Card, HandHistory, Poker, State
 
 from cardroom.table import Table
+from cardroom.utilities import get_settings
 
 _T = TypeVar('_T')
 
@@ -34,6 +35,7 @@ class Seat:
         seats: dict[str, list[Seat]] = {
             user: [] for user in chain(table.users, ('',))
         }
+        unscale = table.settings.unscale
 
         for seat in table.seats:
             user = seat.user or ''
@@ -44,7 +46,7 @@ class Seat:
 
             if not seat.player_status:
                 bet = None
-                stack = seat.starting_stack
+                stack = unscale(seat.starting_stack)
                 hole = ()
                 censored_hole = ()
                 turn = False
@@ -52,8 +54,8 @@ class Seat:
                 assert table.state is not None
                 assert seat.player_index is not None
 
-                bet = table.state.bets[seat.player_index]
-                stack = table.state.stacks[seat.player_index]
+                bet = unscale(table.state.bets[seat.player_index])
+                stack = unscale(table.state.stacks[seat.player_index])
                 hole = tuple(table.state.hole_cards[seat.player_index])
                 censored_hole = tuple(
                     table.state.get_censored_hole_cards(seat.player_index),
@@ -78,41 +80,48 @@ class Seat:
         return dict(zip(seats.keys(), map(tuple, seats.values())))
 
     @classmethod
-    def from_hand_history(
+    def from_state(
             cls,
-            hand_history: HandHistory,
-    ) -> Iterator[tuple[Seat, ...]]:
+            state: State,
+            players: list[str] | None,
+    ) -> tuple[Seat, ...]:
         timestamp = ()
         active = True
+        seats = []
 
-        for state in hand_history:
-            seats = []
+        for i in state.player_indices:
+            if players is None:
+                user = ''
+            else:
+                user = players[i]
+
+            button = i == state.player_count - 1
+            bet = state.bets[i]
+            stack = state.stacks[i]
+            hole = tuple(state.hole_cards[i])
+            turn = i == state.turn_index
+            seat = Seat(
+                user=user,
+                button=button,
+                bet=bet,
+                stack=stack,
+                hole=hole,
+                timestamp=timestamp,
+                active=active,
+                turn=turn,
+            )
 
-            for i in state.player_indices:
-                if hand_history.players is None:
-                    user = ''
-                else:
-                    user = hand_history.players[i]
-
-                button = i == state.player_count - 1
-                bet = state.bets[i]
-                stack = state.stacks[i]
-                hole = tuple(state.hole_cards[i])
-                turn = i == state.turn_index
-                seat = Seat(
-                    user=user,
-                    button=button,
-                    bet=bet,
-                    stack=stack,
-                    hole=hole,
-                    timestamp=timestamp,
-                    active=active,
-                    turn=turn,
-                )
+            seats.append(seat)
 
-                seats.append(seat)
+        return tuple(seats)
 
-            yield tuple(seats)
+    @classmethod
+    def from_hand_history(
+            cls,
+            hand_history: HandHistory,
+    ) -> Iterator[tuple[Seat, ...]]:
+        for state in hand_history:
+            yield cls.from_state(state, hand_history.players)
 
 
 @dataclass(frozen=True)
@@ -148,6 +157,7 @@ class Action:
 
     @classmethod
     def from_table(cls, table: Table) -> dict[str, Action]:
+        unscale = table.settings.unscale
         actions = {}
 
         for user in chain(table.users, ('',)):
@@ -162,8 +172,8 @@ class Action:
 
             if table.can_buy_rebuy_top_off_or_rat_hole(user):
                 brtr = (
-                    table.min_starting_stack,
-                    table.max_starting_stack,
+                    unscale(table.min_starting_stack),
+                    unscale(table.max_starting_stack),
                 )
             else:
                 brtr = None
@@ -175,12 +185,12 @@ class Action:
                 f = table.state.can_fold() or None
 
                 if table.state.can_check_or_call():
-                    cc = table.state.checking_or_calling_amount
+                    cc = unscale(table.state.checking_or_calling_amount)
                 else:
                     cc = None
 
                 if table.state.can_post_bring_in():
-                    pb = table.state.bring_in
+                    pb = unscale(table.state.bring_in)
                 else:
                     pb = None
 
@@ -197,15 +207,15 @@ class Action:
                     cbr = (
                         table.state.completion_status,
                         any(table.state.bets),
-                        (
+                        unscale(
                             table
                             .state
-                            .min_completion_betting_or_raising_to_amount
+                            .min_completion_betting_or_raising_to_amount,
                         ),
-                        (
+                        unscale(
                             table
                             .state
-                            .max_completion_betting_or_raising_to_amount
+                            .max_completion_betting_or_raising_to_amount,
                         ),
                     )
                 else:
@@ -282,7 +292,9 @@ class Frame:
             pot = ()
             board = ()
         else:
-            pot = tuple(pot.amount for pot in table.state.pots)
+            pot = table.settings.unscale(
+                tuple(pot.amount for pot in table.state.pots),
+            )
             board = tuple(table.state.board_cards)
 
         game = Game.from_game(table.game)
@@ -311,24 +323,31 @@ class Frame:
 
         return frames
 
+    @classmethod
+    def from_state(
+            cls,
+            state: State,
+            players: list[str] | None,
+            game: Game,
+            history: str,
+    ) -> Frame:
+        seats = Seat.from_state(state, players)
+        pot = tuple(pot.amount for pot in state.pots)
+        board = tuple(state.board_cards)
+
+        return Frame(
+            seats=seats,
+            pot=pot,
+            board=board,
+            game=game,
+            action=Action.create_empty(),
+            history=history,
+        )
+
     @classmethod
     def from_hand_history(cls, hand_history: HandHistory) -> Iterator[Frame]:
         game = Game.from_game(hand_history.create_game())
-        action = Action.create_empty()
         history = hand_history.dumps()
 
-        for seats, state in zip(
-                Seat.from_hand_history(hand_history),
-                hand_history,
-        ):
-            pot = tuple(pot.amount for pot in state.pots)
-            board = tuple(state.board_cards)
-
-            yield Frame(
-                seats=seats,
-                pot=pot,
-                board=board,
-                game=game,
-                action=action,
-                history=history,
-            )
+        for state in get_settings().make_exact(hand_history):
+            yield cls.from_state(state, hand_history.players, game, history)
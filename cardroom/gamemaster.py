@@ -1,16 +1,20 @@
+from asyncio import get_running_loop, Task
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from threading import Lock
-from typing import ClassVar
+from typing import Any, ClassVar
+import json
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer  # type: ignore[import-untyped]
 
-from cardroom.utilities import serialize
+from cardroom.utilities import get_settings, serialize
 from cardroom.frame import Frame
 
 
 class Gamemaster:
     _lock: ClassVar[Lock] = Lock()
-    _frames: ClassVar[dict[str, dict[str, Frame]]] = {}
+    _tasks: ClassVar[set[Task[None]]] = set()
 
     @classmethod
     def broadcast(
@@ -20,23 +24,182 @@ class Gamemaster:
             users_message: tuple[list[str], str],
     ) -> None:
         if frames:
-            with cls._lock:
-                cls._frames[group_name] = frames[-1]
+            frame_store = get_settings().frame_store
+            version = frame_store.increment(group_name, len(frames))
+            serialized_frames = serialize(frames)
 
-            async_to_sync(get_channel_layer().group_send)(
+            frame_store.set(
                 group_name,
-                {'type': 'update', 'frames': serialize(frames)},
+                version,
+                {
+                    user: json.dumps(frame).encode()
+                    for user, frame in serialized_frames[-1].items()
+                },
+                [json.dumps(frames).encode() for frames in serialized_frames],
+            )
+
+            cls.send(
+                group_name,
+                {
+                    'type': 'update',
+                    'frames': serialized_frames,
+                    'version': version,
+                },
             )
 
         if all(users_message):
             users, message = users_message
 
-            async_to_sync(get_channel_layer().group_send)(
+            cls.send(
                 group_name,
                 {'type': 'notify', 'users': users, 'message': message},
             )
 
     @classmethod
-    def get_frames(cls, group_name: str) -> dict[str, Frame]:
-        with cls._lock:
-            return cls._frames[group_name]
+    def send(cls, group_name: str, event: dict[str, Any]) -> None:
+        """Send the event to the group through the channel layer.
+
+        The event is not waited to be delivered. Within an event loop,
+        it is sent by a task of its own. Elsewhere, like in the
+        controllers' threads, it is handed to the channel layer, which
+        must therefore be thread-safe (see
+        :class:`cardroom.layers.InMemoryChannelLayer`).
+
+        :param group_name: The group name.
+        :param event: The event.
+        :return: ``None``.
+        """
+        channel_layer = get_channel_layer()
+
+        try:
+            loop = get_running_loop()
+        except RuntimeError:
+            async_to_sync(channel_layer.group_send)(group_name, event)
+        else:
+            task = loop.create_task(
+                channel_layer.group_send(group_name, event),
+            )
+
+            cls._tasks.add(task)
+            task.add_done_callback(cls._tasks.discard)
+
+    @classmethod
+    def get_keyframe(cls, group_name: str) -> tuple[int, dict[str, Any]]:
+        """Return the version and the serialized latest frames of the
+        group, keyed by user.
+
+        :param group_name: The group name.
+        :return: The version and the serialized frames.
+        """
+        version, data = get_settings().frame_store.get(group_name)
+
+        return (
+            version,
+            {user: json.loads(frame) for user, frame in data.items()},
+        )
+
+    @classmethod
+    def get_frames(cls, group_name: str) -> dict[str, Any]:
+        """Return the serialized latest frames of the group, keyed by
+        user.
+
+        :param group_name: The group name.
+        :return: The serialized frames.
+        """
+        _, frames = cls.get_keyframe(group_name)
+
+        return frames
+
+    @classmethod
+    def get_version(cls, group_name: str) -> int:
+        """Return the version of the latest frames of the group.
+
+        The version is the number of frames broadcasted to the group so
+        far and therefore increases monotonically.
+
+        :param group_name: The group name.
+        :return: The version.
+        """
+        return get_settings().frame_store.get_version(group_name)
+
+    @classmethod
+    def get_data(cls, group_name: str, user: str) -> tuple[int, bytes]:
+        """Return the version and the JSON-encoded latest frame of the
+        group as seen by the user.
+
+        The frames are encoded once per broadcast, so repeated calls
+        between actions do not re-serialize anything.
+
+        :param group_name: The group name.
+        :param user: The user (``''`` if anonymous).
+        :return: The version and the encoded frame.
+        """
+        return get_settings().frame_store.get_data(group_name, user)
+
+    @classmethod
+    def get_history(
+            cls,
+            group_name: str,
+            cursor: int,
+    ) -> list[dict[str, Any]] | None:
+        """Return the serialized frames of the group broadcasted after
+        the cursor, each keyed by user.
+
+        The ``i``-th frame has the version ``cursor + i + 1``.
+
+        :param group_name: The group name.
+        :param cursor: The version the client already has.
+        :return: The serialized frames, or ``None`` if the client is too
+                 far behind.
+        """
+        history = get_settings().frame_store.get_history(group_name, cursor)
+
+        if history is not None:
+            return list(map(json.loads, history))
+
+        return None
+
+    @classmethod
+    def reload(cls, group_name: str) -> None:
+        """Tell the consumers of the group that its controller was
+        replaced.
+
+        :param group_name: The group name.
+        :return: ``None``.
+        """
+        cls.send(group_name, {'type': 'reload'})
+
+    @classmethod
+    def discard(cls, group_name: str) -> None:
+        """Discard the latest frames of the group and close the
+        connections of its consumers.
+
+        :param group_name: The group name.
+        :return: ``None``.
+        """
+        get_settings().frame_store.delete(group_name)
+        cls.send(group_name, {'type': 'terminate'})
+
+    @classmethod
+    @asynccontextmanager
+    async def subscribe(cls, group_name: str) -> AsyncIterator[str]:
+        """Subscribe to the events sent to the group.
+
+        A new channel is added to the group for the duration of the
+        context, and the events are received from it through the
+        channel layer, so the subscribers are woken up by the
+        broadcasts of any process the layer spans. The layer bounds
+        the number of events each channel holds, dropping the rest.
+
+        :param group_name: The group name.
+        :return: The context manager yielding the channel name.
+        """
+        channel_layer = get_channel_layer()
+        channel_name = await channel_layer.new_channel()
+
+        await channel_layer.group_add(group_name, channel_name)
+
+        try:
+            yield channel_name
+        finally:
+            await channel_layer.group_discard(group_name, channel_name)
@@ -0,0 +1,85 @@
+""":mod:`cardroom.layers` implements channel layers."""
+
+from __future__ import annotations
+
+from asyncio import AbstractEventLoop, get_running_loop, Task
+from typing import Any
+
+from channels.exceptions import ChannelFull  # type: ignore[import-untyped]
+from channels.layers import (  # type: ignore[import-untyped]
+    InMemoryChannelLayer as BaseInMemoryChannelLayer,
+)
+
+
+class InMemoryChannelLayer(BaseInMemoryChannelLayer):  # type: ignore[misc]
+    """The in-memory channel layer that can be sent to from any thread.
+
+    The in-memory channel layer of Channels keeps a queue per channel
+    that belongs to the event loop of its receiver, so the messages
+    sent from other event loops, like those of
+    :func:`asgiref.sync.async_to_sync` in the controllers' threads, do
+    not wake the receiver up. This layer remembers the loop each
+    channel is received in and hands the messages sent from any other
+    loop over to it without waiting for them to be delivered.
+
+    Like the in-memory channel layer of Channels, this layer is local
+    to each process.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+
+        self._loops: dict[str, AbstractEventLoop] = {}
+        self._tasks: set[Task[None]] = set()
+
+    async def send(self, channel: str, message: dict[str, Any]) -> None:
+        loop = self._loops.get(channel)
+
+        if loop is None or loop is get_running_loop():
+            await super().send(channel, message)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._deliver, channel, message)
+            except RuntimeError:
+                self._loops.pop(channel, None)
+
+    def _deliver(self, channel: str, message: dict[str, Any]) -> None:
+        task = get_running_loop().create_task(self._send(channel, message))
+
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, channel: str, message: dict[str, Any]) -> None:
+        try:
+            await super().send(channel, message)
+        except ChannelFull:
+            pass
+
+    async def receive(self, channel: str) -> dict[str, Any]:
+        self._loops[channel] = get_running_loop()
+        message: dict[str, Any] = await super().receive(channel)
+
+        return message
+
+    async def group_discard(self, group: str, channel: str) -> None:
+        await super().group_discard(group, channel)
+
+        if not any(channel in channels for channels in self.groups.values()):
+            self._loops.pop(channel, None)
+
+    async def group_send(self, group: str, message: dict[str, Any]) -> None:
+        # The expired messages are cleaned up on receipt instead, as the
+        # groups may not be iterated over outside the receivers' loop.
+        assert isinstance(message, dict), 'Message is not a dict'
+        assert self.valid_group_name(group), 'Invalid group name'
+
+        for channel in tuple(self.groups.get(group, ())):
+            try:
+                await self.send(channel, message)
+            except ChannelFull:
+                pass
+
+    async def flush(self) -> None:
+        await super().flush()
+
+        self._loops = {}
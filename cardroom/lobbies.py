@@ -0,0 +1,297 @@
+""":mod:`cardroom.lobbies` implements classes related to the lobby."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Any, ClassVar
+import json
+
+from django.dispatch import receiver
+from pokerkit import ChipsPushing
+
+from cardroom.gamemaster import Gamemaster
+from cardroom.signals import (
+    post_state_construction,
+    post_termination,
+    pre_state_destruction,
+)
+from cardroom.table import Table
+import cardroom.controllers as controllers
+
+
+@dataclass
+class HandStatistics:
+    """The class for statistics of the recent hands of a table.
+
+    Only the hands that ended in the last :attr:`window` seconds count.
+    The sum of their pots is kept up to date as hands are recorded and
+    expire, so nothing is ever recomputed over the whole window.
+    """
+
+    window: float = 3600
+    """The number of seconds a hand counts for."""
+    _hands: deque[tuple[float, Any]] = field(
+        default_factory=deque,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _pot_sum: Any = field(default=0, init=False, repr=False, compare=False)
+
+    @property
+    def hand_count(self) -> int:
+        """Return the number of recent hands.
+
+        :return: The hand count.
+        """
+        return len(self._hands)
+
+    @property
+    def hands_per_hour(self) -> float:
+        """Return the number of recent hands per hour.
+
+        :return: The hands per hour.
+        """
+        return self.hand_count * 3600 / self.window
+
+    @property
+    def average_pot(self) -> float:
+        """Return the average pot of the recent hands.
+
+        The pots may be decimals (see
+        :meth:`cardroom.utilities.Settings.unscale`), but the average
+        is returned as a number that can be encoded in JSON.
+
+        :return: The average pot, or ``0`` if there are none.
+        """
+        if not self.hand_count:
+            return 0
+
+        return float(self._pot_sum / self.hand_count)
+
+    def expire(self, time: float) -> None:
+        """Forget the hands that ended before the window.
+
+        :param time: The present time.
+        :return: ``None``.
+        """
+        while self._hands and self._hands[0][0] <= time - self.window:
+            _, pot = self._hands.popleft()
+            self._pot_sum -= pot
+
+        if not self._hands:
+            self._pot_sum = 0
+
+    def record(self, time: float, pot: Any) -> None:
+        """Record the hand.
+
+        :param time: The time the hand ended.
+        :param pot: The pot of the hand.
+        :return: ``None``.
+        """
+        self.expire(time)
+        self._hands.append((time, pot))
+
+        self._pot_sum += pot
+
+
+class Lobby:
+    """The class for the lobby.
+
+    The lobby holds the summaries of the running tables, keyed by their
+    group names. The controllers update the summaries of their tables
+    on hand boundaries, and each summary is encoded once per change, so
+    serving the lobby neither touches the tables nor encodes the
+    summaries that did not change.
+
+    Each change increments the version of the lobby and is sent to the
+    :attr:`group_name` group as a delta that holds the changed
+    summaries (``None`` for tables no longer running). Deltas of
+    different tables may arrive out of order, but those of each table
+    do not, so clients can apply every delta newer than their snapshot.
+
+    The lobby is local to each process, like the controllers.
+    """
+
+    group_name: ClassVar[str] = 'lobby'
+    _lock: ClassVar[Lock] = Lock()
+    _summaries: ClassVar[dict[str, dict[str, Any]]] = {}
+    _statistics: ClassVar[dict[str, HandStatistics]] = {}
+    _entries: ClassVar[dict[str, bytes]] = {}
+    _version: ClassVar[int] = 0
+    _data: ClassVar[bytes | None] = None
+
+    @classmethod
+    def register(cls, group_name: str, summary: dict[str, Any]) -> None:
+        """List the table of the running controller with the group
+        name (see :attr:`cardroom.controllers.Controller.name`).
+
+        :param group_name: The group name.
+        :param summary: The summary of the table's configuration.
+        :return: ``None``.
+        """
+        with cls._lock:
+            cls._statistics[group_name] = HandStatistics()
+            event = cls._set(
+                group_name,
+                summary | {
+                    'player_count': 0,
+                    'waiting_count': 0,
+                    'average_pot': 0,
+                    'hands_per_hour': 0,
+                },
+            )
+
+        if event is not None:
+            Gamemaster.send(cls.group_name, event)
+
+    @classmethod
+    def unregister(cls, group_name: str) -> None:
+        """Delist the table, if listed.
+
+        :param group_name: The group name.
+        :return: ``None``.
+        """
+        with cls._lock:
+            if cls._statistics.pop(group_name, None) is None:
+                return
+
+            event = cls._set(group_name, None)
+
+        if event is not None:
+            Gamemaster.send(cls.group_name, event)
+
+    @classmethod
+    def update(
+            cls,
+            group_name: str,
+            table: Table,
+            pot: Any = None,
+    ) -> None:
+        """Update the summary of the table, if listed.
+
+        :param group_name: The group name.
+        :param table: The table.
+        :param pot: The pot of the hand that just ended, if any.
+        :return: ``None``.
+        """
+        time = monotonic()
+        player_count = 0
+        waiting_count = 0
+
+        for seat in table.occupied_seats:
+            player_count += 1
+
+            if not seat.ready_status:
+                waiting_count += 1
+
+        with cls._lock:
+            statistics = cls._statistics.get(group_name)
+
+            if statistics is None:
+                return
+
+            if pot is None:
+                statistics.expire(time)
+            else:
+                statistics.record(time, pot)
+
+            event = cls._set(
+                group_name,
+                cls._summaries[group_name] | {
+                    'player_count': player_count,
+                    'waiting_count': waiting_count,
+                    'average_pot': statistics.average_pot,
+                    'hands_per_hour': statistics.hands_per_hour,
+                },
+            )
+
+        if event is not None:
+            Gamemaster.send(cls.group_name, event)
+
+    @classmethod
+    def _set(
+            cls,
+            group_name: str,
+            summary: dict[str, Any] | None,
+    ) -> dict[str, Any] | None:
+        if cls._summaries.get(group_name) == summary:
+            return None
+
+        if summary is None:
+            cls._summaries.pop(group_name, None)
+            cls._entries.pop(group_name, None)
+        else:
+            cls._summaries[group_name] = summary
+            cls._entries[group_name] = json.dumps(summary).encode()
+
+        cls._version += 1
+        cls._data = None
+
+        return {
+            'type': 'update',
+            'version': cls._version,
+            'tables': {group_name: summary},
+        }
+
+    @classmethod
+    def get_data(cls) -> tuple[int, bytes]:
+        """Return the version and the JSON-encoded lobby.
+
+        The lobby is encoded as an object with the version and the
+        summaries keyed by group names, like the deltas.
+
+        :return: The version and the encoded lobby.
+        """
+        with cls._lock:
+            if cls._data is None:
+                tables = b', '.join(
+                    json.dumps(group_name).encode() + b': ' + entry
+                    for group_name, entry in cls._entries.items()
+                )
+                cls._data = b'{"version": %d, "tables": {%b}}' % (
+                    cls._version,
+                    tables,
+                )
+
+            return cls._version, cls._data
+
+
+@receiver(post_state_construction)
+def lobby_post_state_construction(
+        sender: type[controllers.Controller],
+        controller: controllers.Controller,
+        table: Table,
+        **kwargs: Any,
+) -> None:
+    Lobby.update(controller.name, table)
+
+
+@receiver(pre_state_destruction)
+def lobby_pre_state_destruction(
+        sender: type[controllers.Controller],
+        controller: controllers.Controller,
+        table: Table,
+        **kwargs: Any,
+) -> None:
+    pot = 0
+
+    if table.state is not None:
+        for operation in table.state.operations:
+            if isinstance(operation, ChipsPushing):
+                pot += sum(operation.amounts) + operation.rake
+
+    Lobby.update(controller.name, table, table.settings.unscale(pot))
+
+
+@receiver(post_termination)
+def lobby_post_termination(
+        sender: type[controllers.Controller],
+        controller: controllers.Controller,
+        table: Table,
+        **kwargs: Any,
+) -> None:
+    Lobby.unregister(controller.name)
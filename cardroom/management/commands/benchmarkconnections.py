@@ -0,0 +1,109 @@
+from argparse import ArgumentParser
+from asyncio import gather
+from importlib import import_module
+from time import perf_counter
+from typing import Any
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter  # type: ignore[import-untyped]
+from channels.testing import (  # type: ignore[import-untyped]
+    WebsocketCommunicator,
+)
+from django.core.management.base import BaseCommand
+
+from cardroom.controllers import Controller
+from cardroom.middlewares import TokenAuthMiddlewareStack
+from cardroom.models import CashGame
+from cardroom.utilities import get_root_routingconf, get_token_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks concurrent websocket connections to a cash game within'
+        ' this process.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('pk', type=int, help='The cash game id')
+        parser.add_argument(
+            '--connections',
+            type=int,
+            default=1000,
+            help='The number of concurrent connections',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='The timeout of each connection in seconds',
+        )
+        parser.add_argument(
+            '--token',
+            help='The token to authenticate the connections with',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        cash_game = CashGame.objects.get(pk=options['pk'])
+
+        try:
+            Controller.lookup(cash_game.group_name)
+        except KeyError:
+            cash_game.start()
+
+        path = cash_game.get_websocket_url()
+
+        if options['token'] is not None:
+            path += f'?token={options["token"]}'
+
+        token_cache = get_token_cache()
+
+        token_cache.clear()
+
+        count, duration = async_to_sync(self.benchmark)(
+            path,
+            options['connections'],
+            options['timeout'],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                (
+                    f'Success: served {count} concurrent connections in'
+                    f' {duration:.3f} seconds ({count / duration:.1f}'
+                    ' connections per second, token cache hit rate'
+                    f' {token_cache.hit_rate:.1%})'
+                ),
+            ),
+        )
+
+    async def benchmark(
+            self,
+            path: str,
+            connection_count: int,
+            timeout: float,
+    ) -> tuple[int, float]:
+        application = TokenAuthMiddlewareStack(
+            URLRouter(import_module(get_root_routingconf()).urlpatterns),
+        )
+        communicators = [
+            WebsocketCommunicator(application, path)
+            for _ in range(connection_count)
+        ]
+
+        async def connect(communicator: WebsocketCommunicator) -> bool:
+            status, _ = await communicator.connect(timeout)
+
+            if status:
+                await communicator.receive_json_from(timeout)
+
+            return bool(status)
+
+        start = perf_counter()
+        statuses = await gather(*map(connect, communicators))
+        duration = perf_counter() - start
+
+        await gather(
+            *(communicator.disconnect() for communicator in communicators),
+        )
+
+        return sum(statuses), duration
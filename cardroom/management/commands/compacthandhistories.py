@@ -0,0 +1,66 @@
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cardroom import models
+
+
+class Command(BaseCommand):
+    help = 'Converts the stored hand histories to or from the compact storage.'
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            '--expand',
+            action='store_true',
+            help='Convert compacted hand histories back instead',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of hand histories to convert per transaction',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['expand']:
+            queryset = models.HandHistory.objects.exclude(
+                game__isnull=True,
+                compressed_data__isnull=True,
+            ).select_related('game')
+        else:
+            queryset = models.HandHistory.objects.filter(
+                compressed_data__isnull=True,
+            )
+
+        field_names = [
+            *models.HandHistory.game_field_names,
+            *models.HandHistory.compressed_field_names,
+            'game',
+            'compressed_data',
+        ]
+        queryset = queryset.order_by('pk')
+        batch_size = options['batch_size']
+        count = 0
+        pk = 0
+
+        while hhs := list(queryset.filter(pk__gt=pk)[:batch_size]):
+            with transaction.atomic():
+                if options['expand']:
+                    for hh in hhs:
+                        hh.expand()
+                else:
+                    models.HandHistory.compact_all(hhs)
+
+                models.HandHistory.objects.bulk_update(hhs, field_names)
+
+            count += len(hhs)
+            pk = hhs[-1].pk
+
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Converted {count} hand histories')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Success: converted {count} hand histories'),
+        )
@@ -0,0 +1,114 @@
+from argparse import ArgumentParser
+from collections.abc import Iterator
+from contextlib import contextmanager, ExitStack
+from io import TextIOWrapper
+from time import perf_counter
+from typing import Any, IO
+from zipfile import ZIP_DEFLATED, ZipFile
+import os
+import sys
+
+from django.core.management.base import BaseCommand
+
+from cardroom import models
+from cardroom.management.commands.loadhandhistories import OPENERS
+
+
+@contextmanager
+def open_destination(pathname: str) -> Iterator[IO[str]]:
+    """Open the multi-hand PHH file to write, compressing or bundling
+    it according to its extension.
+
+    A zip archive holds a single member named after the archive.
+
+    :param pathname: The pathname, or ``-`` for the standard output.
+    :return: The text file.
+    """
+    if pathname == '-':
+        yield sys.stdout
+
+        return
+
+    root, extension = os.path.splitext(pathname)
+
+    with ExitStack() as stack:
+        if extension == '.zip':
+            zip_file = stack.enter_context(
+                ZipFile(pathname, 'w', ZIP_DEFLATED),
+            )
+            file = TextIOWrapper(
+                stack.enter_context(
+                    zip_file.open(os.path.basename(root), 'w'),
+                ),
+                encoding='utf-8',
+            )
+        elif extension in OPENERS:
+            file = OPENERS[extension](pathname, 'wt', encoding='utf-8')
+        else:
+            file = open(pathname, 'w', encoding='utf-8')
+
+        with file:
+            yield file
+
+
+class Command(BaseCommand):
+    help = 'Exports the hand histories to a multi-hand PHH file.'
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            'pathname',
+            help=(
+                'The pathname of the multi-hand (.phhs) file, optionally'
+                ' compressed (.gz, .xz, .bz2) or bundled (.zip), or - for'
+                ' the standard output'
+            ),
+        )
+        parser.add_argument(
+            '--variant',
+            help='Only export the hand histories of the variant',
+        )
+        parser.add_argument(
+            '--event',
+            help='Only export the hand histories of the event',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='The number of hand histories to fetch at a time',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queryset = models.HandHistory.objects.select_related(
+            'game',
+        ).order_by('pk')
+
+        for name in ('variant', 'event'):
+            if options[name] is not None:
+                queryset = queryset.filter(**{name: options[name]})
+
+        count = 0
+        start = perf_counter()
+
+        with open_destination(options['pathname']) as file:
+            for section in models.HandHistory.iter_phhs(
+                    queryset.iterator(options['chunk_size']),
+            ):
+                file.write(section)
+
+                count += 1
+
+                if options['verbosity'] > 1 and not count % 10000:
+                    self.stderr.write(f'Exported {count} hand histories')
+
+        duration = perf_counter() - start
+
+        self.stderr.write(
+            self.style.SUCCESS(
+                (
+                    f'Success: exported {count} hand histories in'
+                    f' {duration:.3f} seconds'
+                    f' ({count / duration:.1f} per second)'
+                ),
+            ),
+        )
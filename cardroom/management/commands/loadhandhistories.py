@@ -1,14 +1,126 @@
 from argparse import ArgumentParser
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from functools import partial
 from glob import glob
-from itertools import chain
-from typing import Any
+from io import TextIOWrapper
+from itertools import chain, filterfalse
+from time import perf_counter
+from typing import Any, IO
+from zipfile import BadZipFile, ZipFile
+import bz2
+import gzip
+import lzma
+import os
+import re
 
 from django.core.management.base import BaseCommand, CommandError
 from pokerkit import HandHistory
+import django
 
 from cardroom import models
 
+Source = tuple[str, str, str]
+Result = tuple[
+    str,
+    str,
+    tuple[models.HandHistory, list[models.Participant]] | str,
+]
+Batch = tuple[list[Source], list[str]]
+
+SECTION_PATTERN = re.compile(r'\[\s*(\w+)\s*\]\s*(#.*)?')
+OPENERS: dict[str, Callable[..., Any]] = {
+    '.bz2': bz2.open,
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+}
+
+
+def iter_sections(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Iterate through the hands of a multi-hand PHH file.
+
+    Each hand is a table whose name (like ``[1]``) is on its own line.
+
+    :param lines: The lines.
+    :return: The names and the PHH texts of the hands.
+    """
+    name = None
+    section_lines: list[str] = []
+
+    for line in lines:
+        if (match := SECTION_PATTERN.fullmatch(line.strip())) is not None:
+            if name is not None:
+                yield name, ''.join(section_lines)
+
+            name = match.group(1)
+            section_lines.clear()
+        elif name is not None:
+            section_lines.append(line)
+
+    if name is not None:
+        yield name, ''.join(section_lines)
+
+
+def iter_sources(name: str, file: IO[bytes]) -> Iterator[tuple[str, str]]:
+    """Iterate through the hands of a possibly compressed PHH file or
+    zip archive lazily.
+
+    Multi-hand files are recognized by the ``.phhs`` extension.
+
+    :param name: The file name.
+    :param file: The binary file.
+    :return: The labels of the hands, relative to the file, and their
+             PHH texts.
+    """
+    root, extension = os.path.splitext(name)
+
+    if extension == '.zip':
+        with ZipFile(file) as zip_file:
+            for info in zip_file.infolist():
+                if info.is_dir():
+                    continue
+
+                with zip_file.open(info) as member:
+                    for label, text in iter_sources(info.filename, member):
+                        yield f'/{info.filename}{label}', text
+    elif extension in OPENERS:
+        with OPENERS[extension](file, 'rb') as decompressed_file:
+            yield from iter_sources(root, decompressed_file)
+    elif extension == '.phhs':
+        for section_name, text in iter_sections(
+                TextIOWrapper(file, encoding='utf-8'),
+        ):
+            yield f'[{section_name}]', text
+    else:
+        yield '', file.read().decode()
+
+
+def load(sources: list[Source]) -> list[Result]:
+    """Parse the hand histories.
+
+    Besides parsing, the participants are built here from the parsed
+    players.
+
+    :param sources: The pathnames, labels, and PHH texts of the hands.
+    :return: The pathnames and labels paired with the unsaved hand
+             history models and their participants or, if they failed
+             to parse, the error messages.
+    """
+    results: list[Result] = []
+
+    for pathname, label, text in sources:
+        try:
+            hh = models.HandHistory.dump(HandHistory.loads(text))
+        except (KeyError, TypeError, ValueError) as error:
+            results.append(
+                (pathname, label, f'{type(error).__name__}: {error}'),
+            )
+        else:
+            results.append((pathname, label, (hh, hh.get_participants())))
+
+    return results
+
 
 class Command(BaseCommand):
     help = 'Installs the hand histories to the database.'
@@ -18,30 +130,199 @@ class Command(BaseCommand):
             'pathnames',
             nargs='+',
             type=str,
-            help='One or more pathnames',
+            help=(
+                'One or more pathnames of single-hand (.phh) or multi-hand'
+                ' (.phhs) files, optionally compressed (.gz, .xz, .bz2) or'
+                ' bundled (.zip)'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='The number of processes to parse the hands with',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of hand histories to create per transaction',
+        )
+        parser.add_argument(
+            '--continue-on-error',
+            action='store_true',
+            help='Report hands that fail to parse instead of aborting',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help=(
+                'The pathname of a file listing the files already imported,'
+                ' which are skipped and to which newly imported ones are'
+                ' appended'
+            ),
         )
 
     def handle(self, *args: Any, **options: Any) -> None:
-        pathnames = options['pathnames']
+        pathnames: Iterator[str] = chain.from_iterable(
+            map(partial(glob, recursive=True), options['pathnames']),
+        )
+        checkpoint = options['checkpoint']
+
+        if checkpoint is not None:
+            try:
+                with open(checkpoint) as file:
+                    imported_pathnames = set(file.read().splitlines())
+            except FileNotFoundError:
+                imported_pathnames = set()
+
+            pathnames = filterfalse(imported_pathnames.__contains__, pathnames)
+
+        failed_pathnames: set[str] = set()
         count = 0
+        duplicate_count = 0
+        error_count = 0
+        start = perf_counter()
+        batches = self.iter_batches(
+            pathnames,
+            options['batch_size'],
+            options['continue_on_error'],
+            failed_pathnames,
+        )
 
-        for pathname in chain.from_iterable(
-                map(partial(glob, recursive=True), pathnames),
-        ):
+        for results, read_pathnames in self.load(batches, options['workers']):
+            hhs = []
+            participants = []
+
+            for pathname, label, result in results:
+                if not isinstance(result, str):
+                    hh, hh_participants = result
+
+                    hhs.append(hh)
+                    participants.append(hh_participants)
+                elif options['continue_on_error']:
+                    self.stderr.write(
+                        (
+                            f'Failed to parse hand history {repr(label)}:'
+                            f' {result}'
+                        ),
+                    )
+                    failed_pathnames.add(pathname)
+
+                    error_count += 1
+                else:
+                    raise CommandError(
+                        (
+                            f'Failed to parse hand history {repr(label)}:'
+                            f' {result}'
+                        ),
+                    )
+
+            created_count = len(
+                models.HandHistory.create_all(hhs, participants),
+            )
+            count += created_count
+            duplicate_count += len(hhs) - created_count
+
+            if checkpoint is not None:
+                with open(checkpoint, 'a') as file:
+                    file.writelines(
+                        f'{pathname}\n' for pathname in read_pathnames
+                        if pathname not in failed_pathnames
+                    )
+
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    (
+                        f'Created {count} hand history models'
+                        f' ({count / (perf_counter() - start):.1f} per second)'
+                    ),
+                )
+
+        duration = perf_counter() - start
+        message = (
+            f'Success: created {count} hand history models in'
+            f' {duration:.3f} seconds ({count / duration:.1f} per second)'
+        )
+
+        if duplicate_count:
+            message += f', skipped {duplicate_count} duplicate hands'
+
+        if error_count:
+            message += f', skipped {error_count} hands that failed to parse'
+
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def iter_batches(
+            self,
+            pathnames: Iterable[str],
+            batch_size: int,
+            continue_on_error: bool,
+            failed_pathnames: set[str],
+    ) -> Iterator[Batch]:
+        sources: list[Source] = []
+        read_pathnames: list[str] = []
+
+        for pathname in pathnames:
             try:
                 with open(pathname, 'rb') as file:
-                    hh = HandHistory.load(file)
-            except ValueError:
-                raise CommandError(
-                    f'Failed to parse hand history file {repr(pathname)}.',
+                    for label, text in iter_sources(pathname, file):
+                        sources.append((pathname, f'{pathname}{label}', text))
+
+                        if len(sources) >= batch_size:
+                            yield sources, read_pathnames
+
+                            sources = []
+                            read_pathnames = []
+            except (BadZipFile, EOFError, OSError, ValueError) as error:
+                if not continue_on_error:
+                    raise CommandError(
+                        f'Failed to read hand history file {repr(pathname)}.',
+                    )
+
+                self.stderr.write(
+                    (
+                        'Failed to read hand history file'
+                        f' {repr(pathname)}: {error}'
+                    ),
                 )
+                failed_pathnames.add(pathname)
 
-            models.HandHistory.dump(hh).save()
+            read_pathnames.append(pathname)
 
-            count += 1
+        if sources or read_pathnames:
+            yield sources, read_pathnames
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'Success: created {count} hand history models',
-            ),
+    def load(
+            self,
+            batches: Iterable[Batch],
+            worker_count: int,
+    ) -> Iterator[tuple[list[Result], list[str]]]:
+        if worker_count <= 1:
+            for sources, read_pathnames in batches:
+                yield load(sources), read_pathnames
+
+            return
+
+        executor = ProcessPoolExecutor(
+            worker_count,
+            initializer=django.setup,
         )
+        futures: deque[tuple[Future[list[Result]], list[str]]] = deque()
+
+        try:
+            for sources, read_pathnames in batches:
+                future = executor.submit(load, sources)
+
+                futures.append((future, read_pathnames))
+
+                if len(futures) > 2 * worker_count:
+                    future, read_pathnames = futures.popleft()
+
+                    yield future.result(), read_pathnames
+
+            while futures:
+                future, read_pathnames = futures.popleft()
+
+                yield future.result(), read_pathnames
+        finally:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,58 @@
+from argparse import ArgumentParser
+from itertools import chain
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cardroom import models
+
+
+class Command(BaseCommand):
+    help = 'Backfills the participants of the hand histories.'
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild the participants of every hand history',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of hand histories to sync per transaction',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queryset = models.HandHistory.objects.filter(
+            players__isnull=False,
+        ).order_by('pk')
+
+        if not options['all']:
+            queryset = queryset.filter(participants__isnull=True)
+
+        batch_size = options['batch_size']
+        count = 0
+        pk = 0
+
+        while hhs := list(queryset.filter(pk__gt=pk)[:batch_size]):
+            with transaction.atomic():
+                models.Participant.objects.filter(
+                    hand_history__in=hhs,
+                ).delete()
+                models.Participant.objects.bulk_create(
+                    chain.from_iterable(hh.get_participants() for hh in hhs),
+                )
+
+            count += len(hhs)
+            pk = hhs[-1].pk
+
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Synced {count} hand histories')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Success: synced the participants of {count} hand histories',
+            ),
+        )
@@ -6,15 +6,35 @@ from channels.db import database_sync_to_async  # type: ignore[import-untyped]
 from django.contrib.auth.models import User, AnonymousUser
 from rest_framework.authtoken.models import Token
 
+from cardroom.utilities import get_settings
+
 
 @database_sync_to_async  # type: ignore[misc]
-def get_user_from_token(token_key: str) -> AnonymousUser | User:
+def load_user_from_token(token_key: str) -> AnonymousUser | User:
     try:
-        return cast(User, Token.objects.get(key=token_key).user)
+        return cast(
+            User,
+            Token.objects.select_related('user').get(key=token_key).user,
+        )
     except Token.DoesNotExist:
         return AnonymousUser()
 
 
+async def get_user_from_token(token_key: str) -> AnonymousUser | User:
+    token_cache = get_settings().token_cache
+
+    try:
+        return cast(AnonymousUser | User, token_cache.get(token_key))
+    except KeyError:
+        pass
+
+    user = await load_user_from_token(token_key)
+
+    token_cache.set(token_key, user)
+
+    return cast(AnonymousUser | User, user)
+
+
 class TokenAuthMiddleware:
     """The Token auth middleware for Django Channels."""
 
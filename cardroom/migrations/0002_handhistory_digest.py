@@ -0,0 +1,97 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:46
+
+from hashlib import sha256
+from typing import Any
+import json
+
+from django.db import migrations, models
+
+# The fields of pokerkit's hand histories stored by the model as of this
+# migration, and the digest below, are frozen here so that the digests
+# backfilled do not depend on how the model evolves.
+FIELD_NAMES = (
+    'variant',
+    'ante_trimming_status',
+    'antes',
+    'blinds_or_straddles',
+    'bring_in',
+    'small_bet',
+    'big_bet',
+    'min_bet',
+    'starting_stacks',
+    'actions',
+    'author',
+    'event',
+    'url',
+    'address',
+    'city',
+    'region',
+    'postal_code',
+    'country',
+    'time',
+    'time_zone',
+    'day',
+    'month',
+    'year',
+    'hand',
+    'level',
+    'seats',
+    'seat_count',
+    'table',
+    'players',
+    'finishing_stacks',
+    'currency',
+    'time_limit',
+    'time_banks',
+)
+
+
+def get_digest(values: dict[str, Any]) -> str:
+    values = json.loads(json.dumps(values, default=str))
+    content = json.dumps(values, separators=(',', ':'), sort_keys=True)
+
+    return sha256(content.encode()).hexdigest()
+
+
+def backfill_digests(apps: Any, schema_editor: Any) -> None:
+    HandHistory = apps.get_model('cardroom', 'HandHistory')
+    digests = set()
+    hhs = []
+
+    for hh in HandHistory.objects.order_by('pk').iterator():
+        digest = get_digest({name: getattr(hh, name) for name in FIELD_NAMES})
+
+        # Duplicates imported before digests existed are left unhashed.
+        if digest not in digests:
+            digests.add(digest)
+
+            hh.digest = digest
+
+            hhs.append(hh)
+
+        if len(hhs) >= 1000:
+            HandHistory.objects.bulk_update(hhs, ['digest'])
+            hhs.clear()
+
+    HandHistory.objects.bulk_update(hhs, ['digest'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cardroom', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='handhistory',
+            name='digest',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_digests, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='handhistory',
+            name='digest',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
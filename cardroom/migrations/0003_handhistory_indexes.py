@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cardroom', '0002_handhistory_digest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='handhistory',
+            index=models.Index(fields=['variant', 'id'], name='cardroom_ha_variant_f6775a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='handhistory',
+            index=models.Index(fields=['event', 'id'], name='cardroom_ha_event_472db0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='handhistory',
+            index=models.Index(fields=['year', 'month', 'day', 'id'], name='cardroom_ha_year_4bfc01_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='handhistory',
+            index=models.Index(fields=['table', 'id'], name='cardroom_ha_table_72c6c7_idx'),
+        ),
+    ]
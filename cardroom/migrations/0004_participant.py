@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cardroom', '0003_handhistory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Participant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seat', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('player', models.CharField(max_length=255)),
+                ('starting_stack', models.FloatField()),
+                ('finishing_stack', models.FloatField(blank=True, null=True)),
+                ('net', models.FloatField(blank=True, null=True)),
+                ('hand_history', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='cardroom.handhistory')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['player', 'hand_history'], name='cardroom_pa_player_568290_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cardroom', '0004_participant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HandHistoryGame',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(editable=False, max_length=64, unique=True)),
+                ('antes', models.JSONField(null=True)),
+                ('blinds_or_straddles', models.JSONField(blank=True, null=True)),
+                ('bring_in', models.JSONField(blank=True, null=True)),
+                ('small_bet', models.JSONField(blank=True, null=True)),
+                ('big_bet', models.JSONField(blank=True, null=True)),
+                ('min_bet', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='handhistory',
+            name='compressed_data',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='handhistory',
+            name='game',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='hand_histories', to='cardroom.handhistorygame'),
+        ),
+        migrations.AlterField(
+            model_name='handhistory',
+            name='actions',
+            field=models.JSONField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='handhistory',
+            name='antes',
+            field=models.JSONField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='handhistory',
+            name='starting_stacks',
+            field=models.JSONField(null=True),
+        ),
+    ]
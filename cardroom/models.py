@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from collections.abc import Iterator, Mapping
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import fields
 from functools import partial
-from typing import Any, ClassVar
+from hashlib import sha256
+from itertools import repeat
+from typing import Any, cast, ClassVar
+import json
+import zlib
 
 from django.core.exceptions import FieldDoesNotExist, ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.urls import NoReverseMatch, reverse
@@ -18,12 +22,13 @@ import pokerkit
 from cardroom.apps import CardroomConfig
 from cardroom.frame import Frame
 from cardroom.gamemaster import Gamemaster
+from cardroom.lobbies import Lobby
+from cardroom.replays import Replay
 from cardroom.utilities import (
-    get_divmod,
     get_felt,
-    get_parse_value,
     get_root_routingconf,
-    get_tzinfo,
+    get_settings,
+    Settings,
 )
 import cardroom.controllers as controllers
 import cardroom.table as table
@@ -76,18 +81,19 @@ class Poker(models.Model):
 
             return raw_values
 
+        settings = get_settings()
         kwargs = {
             'automations': self.automations,
             'ante_trimming_status': self.ante_trimming_status,
-            'raw_antes': clean_if_mapping(self.raw_antes),
-            'raw_blinds_or_straddles': clean_if_mapping(
-                self.raw_blinds_or_straddles,
+            'raw_antes': settings.scale(clean_if_mapping(self.raw_antes)),
+            'raw_blinds_or_straddles': settings.scale(
+                clean_if_mapping(self.raw_blinds_or_straddles),
             ),
-            'bring_in': self.bring_in,
-            'small_bet': self.small_bet,
-            'big_bet': self.big_bet,
-            'min_bet': self.min_bet,
-            'divmod': get_divmod(),
+            'bring_in': settings.scale(self.bring_in),
+            'small_bet': settings.scale(self.small_bet),
+            'big_bet': settings.scale(self.big_bet),
+            'min_bet': settings.scale(self.min_bet),
+            'divmod': settings.divmod,
         }
 
         for key, value in tuple(kwargs.items()):
@@ -129,20 +135,57 @@ class Controller(models.Model):
     betting_timeout = models.FloatField()
     hole_cards_showing_or_mucking_timeout = models.FloatField()
 
+    @classmethod
+    def get_group_name(cls, pk: Any) -> str:
+        return f'{cls.__name__}-{pk}'
+
     @property
     def group_name(self) -> str:
-        return f'{type(self).__name__}-{self.pk}'
+        return type(self).get_group_name(self.pk)
 
     @abstractmethod
     def load(self) -> controllers.Controller:
         pass
 
-    def load_table(self) -> table.Table:
+    def get_summary(self) -> dict[str, Any]:
+        stakes = {}
+
+        for key in (
+                'raw_antes',
+                'raw_blinds_or_straddles',
+                'bring_in',
+                'small_bet',
+                'big_bet',
+                'min_bet',
+        ):
+            value = getattr(self.game, key)
+
+            if value is not None:
+                stakes[key.removeprefix('raw_')] = value
+
+        return {
+            'id': self.pk,
+            'variant': self.game.variant,
+            'stakes': stakes,
+            'seat_count': self.seat_count,
+        }
+
+    def start(self) -> None:
+        controller = self.load()
+
+        controllers.Controller.start(self.group_name, controller)
+        Lobby.register(self.group_name, self.get_summary())
+
+    def load_table(self, settings: Settings | None = None) -> table.Table:
+        if settings is None:
+            settings = get_settings()
+
         return table.Table(
             self.game.load(),
             self.seat_count,
-            self.min_starting_stack,
-            self.max_starting_stack,
+            settings.scale(self.min_starting_stack),
+            settings.scale(self.max_starting_stack),
+            settings,
         )
 
     class Meta:
@@ -150,7 +193,7 @@ class Controller(models.Model):
 
 
 class CashGame(Controller):
-    def get_frames(self) -> dict[str, Frame]:
+    def get_frames(self) -> dict[str, Any]:
         return Gamemaster.get_frames(self.group_name)
 
     def get_frame_url(self) -> str:
@@ -164,6 +207,39 @@ class CashGame(Controller):
 
         return url
 
+    def get_frame_poll_url(self) -> str:
+        try:
+            url = reverse(
+                f'{CardroomConfig.name}:cashgame_frame_poll',
+                kwargs={'pk': self.pk},
+            )
+        except NoReverseMatch:
+            url = reverse('cashgame_frame_poll', kwargs={'pk': self.pk})
+
+        return url
+
+    def get_frame_events_url(self) -> str:
+        try:
+            url = reverse(
+                f'{CardroomConfig.name}:cashgame_frame_events',
+                kwargs={'pk': self.pk},
+            )
+        except NoReverseMatch:
+            url = reverse('cashgame_frame_events', kwargs={'pk': self.pk})
+
+        return url
+
+    def get_thumbnail_url(self) -> str:
+        try:
+            url = reverse(
+                f'{CardroomConfig.name}:cashgame_thumbnail',
+                kwargs={'pk': self.pk},
+            )
+        except NoReverseMatch:
+            url = reverse('cashgame_thumbnail', kwargs={'pk': self.pk})
+
+        return url
+
     def get_websocket_url(self) -> str:
         try:
             url = reverse(
@@ -196,6 +272,8 @@ class CashGame(Controller):
             return self.get_felt_url()
 
     def load(self) -> controllers.CashGame:
+        settings = get_settings()
+
         return controllers.CashGame(
             self.time_bank,
             self.time_bank_increment,
@@ -206,24 +284,66 @@ class CashGame(Controller):
             self.betting_timeout,
             self.hole_cards_showing_or_mucking_timeout,
             partial(Gamemaster.broadcast, self.group_name),
-            get_parse_value(),
-            get_tzinfo(),
-            self.load_table(),
+            settings.parse_value,
+            settings.tzinfo,
+            self.load_table(settings),
+            name=self.group_name,
         )
 
 
+class HandHistoryGame(models.Model):
+    """The model for game definitions shared by compacted hand
+    histories.
+
+    Each definition is stored once, keyed by the digest of its values.
+    """
+
+    key = models.CharField(max_length=64, unique=True, editable=False)
+    antes = models.JSONField(null=True)
+    blinds_or_straddles = models.JSONField(blank=True, null=True)
+    bring_in = models.JSONField(blank=True, null=True)
+    small_bet = models.JSONField(blank=True, null=True)
+    big_bet = models.JSONField(blank=True, null=True)
+    min_bet = models.JSONField(blank=True, null=True)
+
+    @classmethod
+    def get_key(cls, values: Mapping[str, Any]) -> str:
+        """Return the key of the game definition.
+
+        :param values: The values of the fields, keyed by name.
+        :return: The hexadecimal SHA-256 digest.
+        """
+        content = json.dumps(values, separators=(',', ':'), sort_keys=True)
+
+        return sha256(content.encode()).hexdigest()
+
+
 class HandHistory(models.Model):
     automations: ClassVar[tuple[Automation]] = (Automation.CARD_BURNING,)
+    game_field_names: ClassVar[tuple[str, ...]] = (
+        'antes',
+        'blinds_or_straddles',
+        'bring_in',
+        'small_bet',
+        'big_bet',
+        'min_bet',
+    )
+    compressed_field_names: ClassVar[tuple[str, ...]] = (
+        'starting_stacks',
+        'actions',
+        'seats',
+        'finishing_stacks',
+    )
     variant = models.CharField(max_length=255, choices=Variant.choices)
     ante_trimming_status = models.BooleanField(default=False)
-    antes = models.JSONField()
+    antes = models.JSONField(null=True)
     blinds_or_straddles = models.JSONField(blank=True, null=True)
     bring_in = models.JSONField(blank=True, null=True)
     small_bet = models.JSONField(blank=True, null=True)
     big_bet = models.JSONField(blank=True, null=True)
     min_bet = models.JSONField(blank=True, null=True)
-    starting_stacks = models.JSONField()
-    actions = models.JSONField()
+    starting_stacks = models.JSONField(null=True)
+    actions = models.JSONField(null=True)
     author = models.CharField(max_length=255, blank=True, null=True)
     event = models.CharField(max_length=255, blank=True, null=True)
     url = models.CharField(max_length=255, blank=True, null=True)
@@ -247,6 +367,21 @@ class HandHistory(models.Model):
     currency = models.CharField(max_length=255, blank=True, null=True)
     time_limit = models.JSONField(blank=True, null=True)
     time_banks = models.JSONField(blank=True, null=True)
+    digest = models.CharField(
+        max_length=64,
+        unique=True,
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    game = models.ForeignKey(
+        HandHistoryGame,
+        models.PROTECT,
+        blank=True,
+        null=True,
+        related_name='hand_histories',
+    )
+    compressed_data = models.BinaryField(blank=True, null=True)
 
     @classmethod
     def get_field_names(cls) -> Iterator[str]:
@@ -262,6 +397,43 @@ class HandHistory(models.Model):
     def frames(self) -> Iterator[Frame]:
         return Frame.from_hand_history(self.load())
 
+    def get_replay(self) -> Replay:
+        """Return the replay of the hand.
+
+        Replays of saved hands are kept in the replay cache until their
+        contents change.
+
+        :return: The replay.
+        """
+        if self.pk is None:
+            return Replay(self.load())
+
+        cache = get_settings().replay_cache
+        digest = self.digest or type(self).get_digest(self.get_values())
+
+        try:
+            replay = cache.get(self.pk, digest)
+        except KeyError:
+            replay = Replay(self.load())
+
+            cache.set(self.pk, digest, replay)
+
+        return cast(Replay, replay)
+
+    def get_serialized_frames(
+            self,
+            start: int = 0,
+            stop: int | None = None,
+    ) -> list[Any]:
+        """Return the serialized frames of the hand in the range.
+
+        :param start: The index of the first frame.
+        :param stop: The index after the last frame, or ``None`` for
+                     the end of the hand.
+        :return: The serialized frames.
+        """
+        return self.get_replay().get_frames(start, stop)
+
     def get_frames_url(self) -> str:
         try:
             url = reverse(
@@ -288,6 +460,22 @@ class HandHistory(models.Model):
         def get_absolute_url(self) -> str:
             return self.get_felt_url()
 
+    @classmethod
+    def get_digest(cls, values: Mapping[str, Any]) -> str:
+        """Return the content hash of the hand history.
+
+        The values are canonicalized through JSON so that those read
+        back from the database hash the same as those they were saved
+        from.
+
+        :param values: The values of the fields, keyed by name.
+        :return: The hexadecimal SHA-256 digest.
+        """
+        values = json.loads(json.dumps(values, default=str))
+        content = json.dumps(values, separators=(',', ':'), sort_keys=True)
+
+        return sha256(content.encode()).hexdigest()
+
     @classmethod
     def dump(cls, hh: pokerkit.HandHistory) -> HandHistory:
         kwargs = {}
@@ -295,18 +483,294 @@ class HandHistory(models.Model):
         for name in cls.get_field_names():
             kwargs[name] = getattr(hh, name)
 
-        return cls(**kwargs)
+        return cls(**kwargs, digest=cls.get_digest(kwargs))
 
-    def load(self) -> pokerkit.HandHistory:
-        kwargs = {}
+    @classmethod
+    def create_all(
+            cls,
+            hhs: Iterable[HandHistory],
+            participants: Iterable[list[Participant]] | None = None,
+    ) -> list[HandHistory]:
+        """Create the hand histories and their participants in bulk.
+
+        Hand histories whose digests are already stored, or repeated,
+        are skipped, even if stored concurrently by another process.
+        The rest are compacted beforehand if the compact storage is
+        enabled.
+
+        :param hhs: The unsaved hand histories.
+        :param participants: The optional unsaved participants of each
+                             hand history, as returned by
+                             :meth:`get_participants`.
+        :return: The created hand histories.
+        """
+        optional_participants: Iterable[list[Participant] | None]
+
+        if participants is None:
+            optional_participants = repeat(None)
+        else:
+            optional_participants = participants
+
+        instances = {
+            hh.digest: (hh, hh_participants)
+            for hh, hh_participants in zip(hhs, optional_participants)
+        }
+
+        with transaction.atomic():
+            for digest in cls.objects.filter(
+                    digest__in=instances.keys(),
+            ).values_list('digest', flat=True):
+                del instances[digest]
+
+            if get_settings().compact_storage_status:
+                cls.compact_all(hh for hh, _ in instances.values())
+
+            hhs = [hh for hh, _ in instances.values()]
+
+            try:
+                with transaction.atomic():
+                    cls.objects.bulk_create(hhs)
+            except IntegrityError:
+                # Some of the hands were stored concurrently in the
+                # meantime, so the rest are stored one by one.
+                for hh in hhs:
+                    hh.pk = None
+
+                    try:
+                        with transaction.atomic():
+                            cls.objects.bulk_create([hh])
+                    except IntegrityError:
+                        del instances[hh.digest]
+
+            # Only the rows inserted above hold these digests, so those
+            # whose keys the backend did not return are looked up.
+            unkeyed_hhs = {
+                hh.digest: hh for hh, _ in instances.values() if hh.pk is None
+            }
+
+            for digest, pk in cls.objects.filter(
+                    digest__in=unkeyed_hhs.keys(),
+            ).values_list('digest', 'pk'):
+                unkeyed_hhs[digest].pk = pk
+
+            created_participants = []
+
+            for hh, hh_participants in instances.values():
+                if hh_participants is None:
+                    hh_participants = hh.get_participants()
+
+                for participant in hh_participants:
+                    participant.hand_history = hh
+
+                    created_participants.append(participant)
+
+            Participant.objects.bulk_create(created_participants)
+
+        return [hh for hh, _ in instances.values()]
+
+    @classmethod
+    def compact_all(cls, hhs: Iterable[HandHistory]) -> None:
+        """Compact the hand histories without saving them.
+
+        The game definitions are moved into shared
+        :class:`HandHistoryGame` rows, created as needed, and the fields
+        specific to each hand are compressed into a single column.
+
+        :param hhs: The expanded hand histories.
+        :return: ``None``.
+        """
+        keyed_hhs = []
+        values: dict[str, dict[str, Any]] = {}
+
+        for hh in hhs:
+            game_values = json.loads(
+                json.dumps(
+                    {name: getattr(hh, name) for name in cls.game_field_names},
+                ),
+            )
+            key = HandHistoryGame.get_key(game_values)
+
+            keyed_hhs.append((key, hh))
+            values.setdefault(key, game_values)
+
+        games = HandHistoryGame.objects.in_bulk(
+            values.keys(),
+            field_name='key',
+        )
+
+        if len(games) < len(values):
+            HandHistoryGame.objects.bulk_create(
+                (
+                    HandHistoryGame(key=key, **game_values)
+                    for key, game_values in values.items()
+                    if key not in games
+                ),
+                ignore_conflicts=True,
+            )
+
+            games = HandHistoryGame.objects.in_bulk(
+                values.keys(),
+                field_name='key',
+            )
+
+        for key, hh in keyed_hhs:
+            hh.game = games[key]
+
+            for name in cls.game_field_names:
+                setattr(hh, name, None)
+
+            hh.compress()
+
+    def compress(self) -> None:
+        """Compress the fields specific to the hand into a single
+        column, without saving.
+
+        :return: ``None``.
+        """
+        values = {}
+
+        for name in self.compressed_field_names:
+            values[name] = getattr(self, name)
+
+            setattr(self, name, None)
+
+        self.compressed_data = zlib.compress(
+            json.dumps(values, separators=(',', ':')).encode(),
+        )
+
+    def expand(self) -> None:
+        """Undo the compaction, without saving.
+
+        :return: ``None``.
+        """
+        for name, value in self.get_values().items():
+            setattr(self, name, value)
+
+        self.game = None
+        self.compressed_data = None
+
+    def get_compacted_values(self) -> dict[str, Any]:
+        """Return the values of the fields stored in the game or the
+        compressed column, if any.
+
+        :return: The values, keyed by name.
+        """
+        values = {}
+
+        if self.game_id is not None:
+            for name in self.game_field_names:
+                values[name] = getattr(self.game, name)
+
+        if self.compressed_data is not None:
+            values.update(json.loads(zlib.decompress(self.compressed_data)))
+
+        return values
+
+    def get_values(self) -> dict[str, Any]:
+        """Return the values of the fields, whether compacted or not.
+
+        :return: The values, keyed by name.
+        """
+        values = {}
 
         for name in type(self).get_field_names():
-            kwargs[name] = getattr(self, name)
+            values[name] = getattr(self, name)
 
-        return pokerkit.HandHistory(**kwargs, automations=self.automations)
+        values.update(self.get_compacted_values())
+
+        return values
+
+    def load(self) -> pokerkit.HandHistory:
+        return pokerkit.HandHistory(
+            **self.get_values(),
+            automations=self.automations,
+        )
+
+    @classmethod
+    def iter_phhs(cls, hhs: Iterable[HandHistory]) -> Iterator[str]:
+        """Iterate through the hand histories as the sections of a
+        multi-hand PHH file, named by their ids.
+
+        :param hhs: The hand histories.
+        :return: The sections.
+        """
+        for hh in hhs:
+            yield f'[{hh.pk}]\n{hh.load().dumps()}\n\n'
+
+    def get_participants(self) -> list[Participant]:
+        """Return the unsaved participants of the hand.
+
+        The participants are built from the recorded values alone, so
+        their finishing stacks and nets are unknown unless the
+        finishing stacks are recorded.
+
+        :return: The participants, or none if the players are unknown.
+        """
+        values = self.get_values()
+
+        if values['players'] is None:
+            return []
+
+        finishing_stacks = values['finishing_stacks']
+        participants = []
+
+        for i, player in enumerate(values['players']):
+            starting_stack = values['starting_stacks'][i]
+
+            if finishing_stacks is None:
+                finishing_stack = net = None
+            else:
+                finishing_stack = finishing_stacks[i]
+                net = finishing_stack - starting_stack
+
+            participants.append(
+                Participant(
+                    hand_history=self,
+                    seat=(
+                        None if values['seats'] is None else values['seats'][i]
+                    ),
+                    player=player,
+                    starting_stack=starting_stack,
+                    finishing_stack=finishing_stack,
+                    net=net,
+                ),
+            )
+
+        return participants
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        self.digest = type(self).get_digest(self.get_values())
+        update_fields = kwargs.get('update_fields')
+
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'digest'}
+
+        super().save(*args, **kwargs)
 
     class Meta:
         verbose_name_plural = 'hand histories'
+        indexes = (
+            models.Index(fields=('variant', 'id')),
+            models.Index(fields=('event', 'id')),
+            models.Index(fields=('year', 'month', 'day', 'id')),
+            models.Index(fields=('table', 'id')),
+        )
+
+
+class Participant(models.Model):
+    hand_history = models.ForeignKey(
+        HandHistory,
+        on_delete=models.CASCADE,
+        related_name='participants',
+    )
+    seat = models.PositiveBigIntegerField(blank=True, null=True)
+    player = models.CharField(max_length=255)
+    starting_stack = models.FloatField()
+    finishing_stack = models.FloatField(blank=True, null=True)
+    net = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        indexes = (models.Index(fields=('player', 'hand_history')),)
 
 
 @receiver(post_save, sender=CashGame)
@@ -321,7 +785,35 @@ def controller_post_save(
     if not created:
         controllers.Controller.stop(name)
 
-    controllers.Controller.start(name, instance.load())
+    instance.start()
+
+    if not created:
+        Gamemaster.reload(name)
+
+
+@receiver(post_save, sender=HandHistory)
+def participant_post_save(
+        sender: type[HandHistory],
+        instance: HandHistory,
+        raw: bool,
+        **kwargs: Any,
+) -> None:
+    if raw:
+        return
+
+    with transaction.atomic():
+        instance.participants.all().delete()
+        Participant.objects.bulk_create(instance.get_participants())
+
+
+@receiver(post_save, sender=HandHistory)
+@receiver(post_delete, sender=HandHistory)
+def replay_cache_post_change(
+        sender: type[HandHistory],
+        instance: HandHistory,
+        **kwargs: Any,
+) -> None:
+    get_settings().replay_cache.discard(instance.pk)
 
 
 @receiver(post_delete, sender=CashGame)
@@ -331,3 +823,4 @@ def controller_post_delete(
         **kwargs: Any,
 ) -> None:
     controllers.Controller.stop(instance.group_name)
+    Gamemaster.discard(instance.group_name)
@@ -0,0 +1,183 @@
+""":mod:`cardroom.recorders` implements classes related to hand
+recorders.
+"""
+
+from __future__ import annotations
+
+from logging import getLogger
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Any, ClassVar
+
+from django.db import close_old_connections
+from django.dispatch import receiver
+import pokerkit
+
+from cardroom.signals import post_termination, pre_state_destruction
+from cardroom.table import Table
+from cardroom.utilities import get_settings
+import cardroom.controllers as controllers
+import cardroom.models as models
+
+logger = getLogger(__name__)
+
+
+class HandRecorder:
+    """The class for hand recorders.
+
+    Played hands are queued by the controller threads and persisted by
+    a background writer, so that database latency never stalls game
+    timers. The writer saves the queued hands in one transaction once
+    there are :func:`cardroom.utilities.get_hand_recorder_flush_size`
+    of them or once the oldest of them has been waiting for
+    :func:`cardroom.utilities.get_hand_recorder_flush_interval`
+    seconds, whichever comes first.
+
+    If the hands cannot be saved, they are kept and saved along with
+    the hands queued since on a later attempt. The attempts are
+    retried after intervals that double from the flush interval up to
+    :attr:`max_retry_interval` seconds.
+    """
+
+    max_retry_interval: ClassVar[float] = 60
+    """The maximum number of seconds between retries of failed
+    writes.
+    """
+    _lock: ClassVar[Lock] = Lock()
+    _queue: ClassVar[Queue[pokerkit.HandHistory | Event]] = Queue()
+    _thread: ClassVar[Thread | None] = None
+
+    @classmethod
+    def record(cls, hand_history: pokerkit.HandHistory) -> None:
+        """Queue the hand history to be persisted.
+
+        :param hand_history: The hand history.
+        :return: ``None``.
+        """
+        with cls._lock:
+            if cls._thread is None:
+                cls._thread = Thread(target=cls._mainloop, daemon=True)
+
+                cls._thread.start()
+
+        cls._queue.put(hand_history)
+
+    @classmethod
+    def flush(cls) -> None:
+        """Persist the queued hand histories and wait until done.
+
+        If the hand histories cannot be saved, this returns once the
+        attempt fails, leaving them to be retried later.
+
+        :return: ``None``.
+        """
+        with cls._lock:
+            if cls._thread is None:
+                return
+
+        event = Event()
+
+        cls._queue.put(event)
+        event.wait()
+
+    @classmethod
+    def _mainloop(cls) -> None:
+        hand_histories = list[pokerkit.HandHistory]()
+        events = list[Event]()
+        deadline = None
+        failure_count = 0
+
+        while True:
+            if deadline is None:
+                timeout = None
+            else:
+                timeout = max(deadline - monotonic(), 0)
+
+            try:
+                item = cls._queue.get(timeout=timeout)
+            except Empty:
+                item = None
+
+            settings = get_settings()
+            interval = settings.hand_recorder_flush_interval
+
+            if isinstance(item, Event):
+                events.append(item)
+            elif item is not None:
+                hand_histories.append(item)
+
+                if deadline is None:
+                    deadline = monotonic() + interval
+
+            if (
+                    item is None
+                    or events
+                    or (
+                        not failure_count
+                        and (
+                            len(hand_histories)
+                            >= settings.hand_recorder_flush_size
+                        )
+                    )
+            ):
+                deadline = None
+
+                if hand_histories:
+                    try:
+                        cls._write(hand_histories)
+                    except Exception:
+                        failure_count += 1
+                        retry_interval = min(
+                            interval * 2 ** failure_count,
+                            cls.max_retry_interval,
+                        )
+                        deadline = monotonic() + retry_interval
+
+                        logger.exception(
+                            (
+                                'Failed to record %d hand(s); retrying in %g'
+                                ' second(s)'
+                            ),
+                            len(hand_histories),
+                            retry_interval,
+                        )
+                    else:
+                        failure_count = 0
+
+                        hand_histories.clear()
+
+                for event in events:
+                    event.set()
+
+                events.clear()
+
+    @classmethod
+    def _write(cls, hand_histories: list[pokerkit.HandHistory]) -> None:
+        close_old_connections()
+        models.HandHistory.create_all(
+            [models.HandHistory.dump(hh) for hh in hand_histories],
+        )
+
+
+@receiver(pre_state_destruction)
+def hand_recorder_pre_state_destruction(
+        sender: type[controllers.Controller],
+        controller: controllers.Controller,
+        table: Table,
+        **kwargs: Any,
+) -> None:
+    hand_history = table.hand_history
+
+    if get_settings().hand_recording_status and hand_history is not None:
+        HandRecorder.record(hand_history)
+
+
+@receiver(post_termination)
+def hand_recorder_post_termination(
+        sender: type[controllers.Controller],
+        controller: controllers.Controller,
+        table: Table,
+        **kwargs: Any,
+) -> None:
+    HandRecorder.flush()
@@ -0,0 +1,250 @@
+""":mod:`cardroom.replays` implements classes related to replays of
+hand histories.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from copy import deepcopy
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+
+from pokerkit import Automation, HandHistory, State
+from pokerkit.notation import parse_action
+
+from cardroom.frame import Frame, Game
+from cardroom.utilities import get_settings, serialize
+
+
+@dataclass
+class Replay:
+    """The class for random-access replays of hand histories.
+
+    The state is checkpointed every :attr:`checkpoint_interval` frames
+    while replaying, so that any frame can later be produced by
+    restoring the nearest checkpoint before it and advancing from
+    there. Produced frames are kept serialized.
+
+    The frames are the same as those of
+    :meth:`cardroom.frame.Frame.from_hand_history`, amounts included
+    (see :meth:`cardroom.utilities.Settings.make_exact`).
+    """
+
+    hand_history: HandHistory
+    """The hand history."""
+    checkpoint_interval: int = 16
+    """The number of frames between checkpoints."""
+    _exact_hand_history: HandHistory = field(
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _checkpoints: list[tuple[State, int]] = field(
+        default_factory=list,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _frames: dict[int, Any] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _frame_count: int | None = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _lock: Lock = field(
+        default_factory=Lock,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    def __post_init__(self) -> None:
+        self._exact_hand_history = get_settings().make_exact(
+            self.hand_history,
+        )
+
+    def advance(self, state: State, action_index: int) -> int | None:
+        """Advance the state to the next frame.
+
+        This mirrors :meth:`pokerkit.HandHistory.iter_state_actions`.
+
+        :param state: The state.
+        :param action_index: The number of actions already applied.
+        :return: The number of actions applied afterwards, or ``None``
+                 if there is no next frame.
+        """
+        while state.status:
+            if state.can_post_ante():
+                state.post_ante()
+            elif state.can_collect_bets():
+                state.collect_bets()
+            elif state.can_post_blind_or_straddle():
+                state.post_blind_or_straddle()
+            elif state.can_burn_card():
+                state.burn_card('??')
+
+                if Automation.CARD_BURNING in self.hand_history.automations:
+                    continue
+            elif state.can_kill_hand():
+                state.kill_hand()
+            elif state.can_push_chips():
+                state.push_chips()
+            elif state.can_pull_chips():
+                state.pull_chips()
+            else:
+                if action_index >= len(self.hand_history.actions):
+                    return None
+
+                parse_action(
+                    state,
+                    self.hand_history.actions[action_index],
+                    self._exact_hand_history.parse_value,
+                )
+
+                action_index += 1
+
+            return action_index
+
+        return None
+
+    def iter_states(self, start: int) -> Iterator[tuple[int, State]]:
+        """Iterate through the states from the frame onwards.
+
+        The yielded state is mutated in place as the iteration goes on.
+
+        :param start: The index of the first frame.
+        :return: The frame indices and the states.
+        """
+        with self._lock:
+            if not self._checkpoints:
+                self._checkpoints.append(
+                    (self._exact_hand_history.create_state(), 0),
+                )
+
+            checkpoint_index = min(
+                start // self.checkpoint_interval,
+                len(self._checkpoints) - 1,
+            )
+            checkpoint, action_index = self._checkpoints[checkpoint_index]
+
+        state = deepcopy(checkpoint)
+        index = checkpoint_index * self.checkpoint_interval
+
+        while True:
+            if index >= start:
+                yield index, state
+
+            optional_action_index = self.advance(state, action_index)
+
+            if optional_action_index is None:
+                self._frame_count = index + 1
+
+                break
+
+            action_index = optional_action_index
+            index += 1
+
+            if not index % self.checkpoint_interval:
+                with self._lock:
+                    if (
+                            index // self.checkpoint_interval
+                            == len(self._checkpoints)
+                    ):
+                        self._checkpoints.append(
+                            (deepcopy(state), action_index),
+                        )
+
+    @property
+    def known_frame_count(self) -> int | None:
+        """Return the number of frames, if known without replaying
+        further.
+
+        :return: The number of frames, or ``None`` if not known yet.
+        """
+        return self._frame_count
+
+    @property
+    def frame_count(self) -> int:
+        """Return the number of frames, replaying the rest of the hand
+        if not known yet.
+
+        :return: The number of frames.
+        """
+        if self._frame_count is None:
+            start = max(len(self._checkpoints) - 1, 0)
+
+            for _ in self.iter_states(start * self.checkpoint_interval):
+                pass
+
+        assert self._frame_count is not None
+
+        return self._frame_count
+
+    def iter_frames(
+            self,
+            start: int = 0,
+            stop: int | None = None,
+    ) -> Iterator[Any]:
+        """Iterate through the serialized frames in the range lazily.
+
+        Like slices, the range is clipped to the frames there are.
+        Frames not produced before are replayed as they are reached.
+
+        :param start: The index of the first frame.
+        :param stop: The index after the last frame, or ``None`` for
+                     the end of the hand.
+        :return: The serialized frames.
+        """
+        game = Game.from_game(self.hand_history.create_game())
+        history = self.hand_history.dumps()
+        states = None
+        index = start
+
+        while stop is None or index < stop:
+            frame = self._frames.get(index)
+
+            if self._frame_count is not None and index >= self._frame_count:
+                break
+            elif frame is None:
+                if states is None:
+                    states = self.iter_states(index)
+
+                try:
+                    _, state = next(states)
+                except StopIteration:
+                    break
+
+                frame = serialize(
+                    Frame.from_state(
+                        state,
+                        self.hand_history.players,
+                        game,
+                        history,
+                    ),
+                )
+                self._frames[index] = frame
+            else:
+                states = None
+
+            yield frame
+
+            index += 1
+
+    def get_frames(self, start: int = 0, stop: int | None = None) -> list[Any]:
+        """Return the serialized frames in the range.
+
+        Like slices, the range is clipped to the frames there are.
+
+        :param start: The index of the first frame.
+        :param stop: The index after the last frame, or ``None`` for
+                     the end of the hand.
+        :return: The serialized frames.
+        """
+        return list(self.iter_frames(start, stop))
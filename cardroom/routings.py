@@ -1,7 +1,7 @@
 from django.urls import path, URLResolver
 
 from cardroom.apps import CardroomConfig
-from cardroom.consumers import CashGameConsumer
+from cardroom.consumers import CashGameConsumer, LobbyConsumer
 
 app_name: str = CardroomConfig.name
 urlpatterns: list[URLResolver] = [
@@ -10,4 +10,5 @@ urlpatterns: list[URLResolver] = [
         CashGameConsumer.as_asgi(),
         name='cashgame_websocket',
     ),
+    path('lobby/', LobbyConsumer.as_asgi(), name='lobby_websocket'),
 ]
@@ -1,9 +1,12 @@
-from typing import cast
+from copy import copy
+from typing import Any, cast
 
 from rest_framework.request import Request
 from rest_framework.serializers import (
     HyperlinkedModelSerializer,
+    ReadOnlyField,
     SerializerMethodField,
+    ValidationError,
 )
 
 from cardroom.models import CashGame, HandHistory, Poker
@@ -11,6 +14,33 @@ from cardroom.utilities import get_felt
 
 
 class CardroomHyperlinkedModelSerializer(HyperlinkedModelSerializer):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+
+        if (
+                request is None
+                or request.method != 'GET'
+                or 'fields' not in request.query_params
+        ):
+            return
+
+        field_names = set(request.query_params['fields'].split(','))
+
+        if field_names - set(self.fields):
+            raise ValidationError(
+                {
+                    'fields': (
+                        'Unknown fields: '
+                        + ', '.join(sorted(field_names - set(self.fields)))
+                    ),
+                },
+            )
+
+        for field_name in set(self.fields) - field_names:
+            self.fields.pop(field_name)
+
     @property
     def request(self) -> Request:
         return cast(Request, self.context['request'])
@@ -22,6 +52,21 @@ class CashGameSerializer(CardroomHyperlinkedModelSerializer):
     def get_frame_url(self, obj: CashGame) -> str:
         return self.request.build_absolute_uri(obj.get_frame_url())
 
+    frame_poll_url = SerializerMethodField()
+
+    def get_frame_poll_url(self, obj: CashGame) -> str:
+        return self.request.build_absolute_uri(obj.get_frame_poll_url())
+
+    frame_events_url = SerializerMethodField()
+
+    def get_frame_events_url(self, obj: CashGame) -> str:
+        return self.request.build_absolute_uri(obj.get_frame_events_url())
+
+    thumbnail_url = SerializerMethodField()
+
+    def get_thumbnail_url(self, obj: CashGame) -> str:
+        return self.request.build_absolute_uri(obj.get_thumbnail_url())
+
     websocket_url = SerializerMethodField()
 
     def get_websocket_url(self, obj: CashGame) -> str:
@@ -49,6 +94,7 @@ class CashGameSerializer(CardroomHyperlinkedModelSerializer):
 
 class HandHistorySerializer(CardroomHyperlinkedModelSerializer):
     url_field_name = 'url_'
+    id = ReadOnlyField()
     frames_url = SerializerMethodField()
 
     def get_frames_url(self, obj: HandHistory) -> str:
@@ -60,9 +106,65 @@ class HandHistorySerializer(CardroomHyperlinkedModelSerializer):
         def get_felt_url(self, obj: HandHistory) -> str:
             return self.request.build_absolute_uri(obj.get_felt_url())
 
+    def to_representation(self, instance: HandHistory) -> Any:
+        if self.fields.keys() & {
+                *HandHistory.game_field_names,
+                *HandHistory.compressed_field_names,
+        }:
+            values = instance.get_compacted_values()
+            instance = copy(instance)
+
+            for name, value in values.items():
+                setattr(instance, name, value)
+
+        return super().to_representation(instance)
+
+    def validate(self, attrs: Any) -> Any:
+        if self.instance is None:
+            instance = HandHistory(**attrs)
+        else:
+            instance = copy(cast(HandHistory, self.instance))
+
+            if attrs.keys() & {
+                    *HandHistory.game_field_names,
+                    *HandHistory.compressed_field_names,
+            }:
+                instance.expand()
+
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+
+        digest = HandHistory.get_digest(instance.get_values())
+
+        if HandHistory.objects.filter(
+                digest=digest,
+        ).exclude(pk=instance.pk).exists():
+            raise ValidationError('An identical hand history exists.')
+
+        return attrs
+
+    def update(
+            self,
+            instance: HandHistory,
+            validated_data: Any,
+    ) -> HandHistory:
+        # Only the hands whose compacted fields change are expanded.
+        if validated_data.keys() & {
+                *HandHistory.game_field_names,
+                *HandHistory.compressed_field_names,
+        }:
+            instance.expand()
+
+        return cast(HandHistory, super().update(instance, validated_data))
+
     class Meta:
         model = HandHistory
-        fields = '__all__'
+        exclude = 'game', 'compressed_data'
+        # The fields are nullable only for the hands stored compactly.
+        extra_kwargs = {
+            name: {'required': True, 'allow_null': False}
+            for name in ('antes', 'starting_stacks', 'actions')
+        }
 
 
 class PokerSerializer(CardroomHyperlinkedModelSerializer):
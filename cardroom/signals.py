@@ -1,5 +1,32 @@
-from django.dispatch import Signal
+from typing import Any
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver, Signal
+
+from cardroom.utilities import get_settings
 
 post_state_construction = Signal()
 pre_state_destruction = Signal()
 post_state_update = Signal()
+post_termination = Signal()
+
+
+@receiver(post_save, sender='authtoken.Token')
+@receiver(post_delete, sender='authtoken.Token')
+def token_cache_token_post_change(
+        sender: type[Any],
+        instance: Any,
+        **kwargs: Any,
+) -> None:
+    get_settings().token_cache.discard(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def token_cache_user_post_change(
+        sender: type[Any],
+        instance: Any,
+        **kwargs: Any,
+) -> None:
+    get_settings().token_cache.discard_user(instance.pk)
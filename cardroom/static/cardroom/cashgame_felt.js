@@ -59,12 +59,14 @@ function getFrame() {
 }
 
 function shifter() {
-	if (!frameGuard && frames.length > 1)
+	if (!frameGuard && frames.length > 1) {
 		frames.shift();
+		felt.invalidate();
+	}
 }
 
 function createWebSocket() {
-	return new WebSocket(`${protocol}//${location.host}${websocketURL}`);
+	return new WebSocket(`${protocol}//${location.host}${websocketURL}?cursor=${version}`);
 }
 
 function watchdog() {
@@ -171,6 +173,7 @@ const websocketURL = JSON.parse(document.getElementById("websocket_url").textCon
 const style = JSON.parse(document.getElementById("style").textContent);
 let frameGuard = true;
 let frames = [JSON.parse(document.getElementById("frame").textContent)];
+let version = JSON.parse(document.getElementById("version").textContent);
 const felt = new Felt(canvas.width, canvas.height, canvas, style, getFrame);
 let protocol;
 
@@ -187,10 +190,21 @@ webSocket.onmessage = function(event) {
 
 	switch (eventData.type) {
 	case "update":
-		frameGuard = true;
+		const sequence = eventData["version"] - eventData["frames"].length + 1;
+
+		if (eventData["keyframe"])
+			version = sequence - 1;
+
+		const newFrames = eventData["frames"].slice(Math.max(version + 1 - sequence, 0));
+
+		if (newFrames.length > 0) {
+			frameGuard = true;
+			version = eventData["version"];
 
-		frames.push(...eventData["frames"]);
-		updateActions();
+			frames.push(...newFrames);
+			updateActions();
+			felt.invalidate();
+		}
 
 		break;
 	case "notify":
@@ -6,6 +6,10 @@ function draw() {
 	felt.draw();
 }
 
+function windowResized() {
+	felt.invalidate();
+}
+
 class Felt {
 	static suitChars = {
 		"c": "♣",
@@ -28,6 +32,9 @@ class Felt {
 		this.canvas = canvas;
 		this.style = style;
 		this.frameGetter = frameGetter;
+		this.readyStatus = false;
+		this.background = null;
+		this.seatPoints = new Map();
 	}
 
 	get frame() {
@@ -50,6 +57,26 @@ class Felt {
 		return createVector(x + dx, y + dy);
 	}
 
+	getSeatPoints(seatCount) {
+		if (!this.seatPoints.has(seatCount)) {
+			const seatPoints = [];
+
+			for (let i = 0; i < seatCount; ++i) {
+				const angle = -TAU * i / seatCount;
+
+				seatPoints.push({
+					"button": this.getPointOnEllipse(0, 0, style["button_ring_width"], style["button_ring_height"], angle + style["button_angle"]),
+					"bet": this.getPointOnEllipse(0, 0, style["bet_ring_width"], style["bet_ring_height"], angle + style["bet_angle"]),
+					"seat": this.getPointOnEllipse(0, 0, style["seat_ring_width"], style["seat_ring_height"], angle + style["seat_angle"]),
+				});
+			}
+
+			this.seatPoints.set(seatCount, seatPoints);
+		}
+
+		return this.seatPoints.get(seatCount);
+	}
+
 	text(str, x, y) {
 		push();
 		translate(x, y);
@@ -60,22 +87,80 @@ class Felt {
 
 	setup() {
 		createCanvas(this.width, this.height, canvas);
-		frameRate(style["frame_rate"]);
+
+		if (style["render_on_change_status"])
+			noLoop();
+		else
+			frameRate(style["frame_rate"]);
+
 		textAlign(CENTER, CENTER);
 		textureMode(NORMAL);
 		rectMode(CENTER);
 		imageMode(CENTER);
+
+		this.readyStatus = true;
+	}
+
+	invalidate() {
+		if (this.readyStatus && style["render_on_change_status"])
+			redraw();
+	}
+
+	createBackground() {
+		const layer = createGraphics(width, height);
+
+		layer.rectMode(CENTER);
+		layer.translate(width / 2, height / 2);
+		layer.scale(min(width, height), -min(width, height));
+		layer.background(style["background_color"]);
+
+		layer.push();
+
+		layer.translate(style["table_x"], style["table_y"]);
+
+		layer.push();
+		layer.fill(style["table_border_color"]);
+		layer.stroke(style["table_border_color"]);
+		layer.strokeWeight(0);
+		layer.ellipse(0, 0, style["table_outer_width"], style["table_outer_height"]);
+		layer.pop();
+
+		layer.push();
+		layer.fill(style["table_felt_color"]);
+		layer.stroke(style["table_felt_color"]);
+		layer.strokeWeight(0);
+		layer.ellipse(0, 0, style["table_inner_width"], style["table_inner_height"]);
+		layer.pop();
+
+		layer.pop();
+
+		layer.push();
+
+		layer.translate(style["board_x"], style["board_y"]);
+		layer.fill(style["board_color"]);
+		layer.stroke(style["board_color"]);
+		layer.strokeWeight(0);
+		layer.rect(0, 0, style["board_width"], style["board_height"], style["board_radius"]);
+
+		layer.pop();
+
+		return layer;
 	}
 
 	draw() {
 		const frame = this.frame;
 
+		if (this.background === null || this.background.width !== width || this.background.height !== height)
+			this.background = this.createBackground();
+
+		clear();
+		image(this.background, width / 2, height / 2);
+
 		push();
 
 		translate(width / 2, height / 2);
 		scale(min(width, height), -min(width, height));
 
-		background(style["background_color"]);
 		this.drawTable(frame);
 
 		for (let i = 0; i < frame["seats"].length; ++i)
@@ -87,35 +172,8 @@ class Felt {
 	drawTable(frame) {
 		push();
 
-		translate(style["table_x"], style["table_y"]);
-
-		push();
-		fill(style["table_border_color"]);
-		stroke(style["table_border_color"]);
-		strokeWeight(0);
-		ellipse(0, 0, style["table_outer_width"], style["table_outer_height"]);
-		pop();
-
-		push();
-		fill(style["table_felt_color"]);
-		stroke(style["table_felt_color"]);
-		strokeWeight(0);
-		ellipse(0, 0, style["table_inner_width"], style["table_inner_height"]);
-		pop();
-
-		pop();
-
-		push();
-
 		translate(style["board_x"], style["board_y"]);
 
-		push();
-		fill(style["board_color"]);
-		stroke(style["board_color"]);
-		strokeWeight(0);
-		rect(0, 0, style["board_width"], style["board_height"], style["board_radius"]);
-		pop();
-
 		push();
 		fill(style["board_pot_text_color"]);
 		stroke(style["board_pot_text_color"]);
@@ -167,14 +225,14 @@ class Felt {
 
 	drawSeat(frame, index) {
 		const seat = frame["seats"][index];
-		const angle = -TAU * index / frame["seats"].length;
+		const seatPoints = this.getSeatPoints(frame["seats"].length)[index];
 
 		push();
 
 		translate(style["table_x"], style["table_y"]);
 
 		if (seat["button"]) {
-			let point = this.getPointOnEllipse(0, 0, style["button_ring_width"], style["button_ring_height"], angle + style["button_angle"]);
+			const point = seatPoints["button"];
 
 			push();
 
@@ -200,7 +258,7 @@ class Felt {
 		}
 
 		if (seat["bet"] !== null && seat["bet"] !== 0) {
-			let point = this.getPointOnEllipse(0, 0, style["bet_ring_width"], style["bet_ring_height"], angle + style["bet_angle"]);
+			const point = seatPoints["bet"];
 
 			push();
 
@@ -229,7 +287,7 @@ class Felt {
 			pop();
 		}
 
-		let point = this.getPointOnEllipse(0, 0, style["seat_ring_width"], style["seat_ring_height"], angle + style["seat_angle"]);
+		const point = seatPoints["seat"];
 
 		push();
 
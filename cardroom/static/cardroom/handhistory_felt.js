@@ -1,21 +1,67 @@
 let index = 0;
 
+function isLoaded(i) {
+	return frames[i] !== undefined;
+}
+
 function update() {
 	previousButton.disabled = index === 0;
-	nextButton.disabled = index === frames.length - 1;
+	nextButton.disabled = (
+		(frameCount !== null && index === frameCount - 1)
+		|| !isLoaded(index + 1)
+	);
 	indexSpan.innerText = index + 1;
-	maxIndexSpan.innerText = frames.length;
+	maxIndexSpan.innerText = frameCount === null ? "?" : frameCount;
+	felt.invalidate();
+}
+
+function loadPage(i) {
+	const start = i - i % framePageSize;
+
+	if (
+		(frameCount !== null && start >= frameCount)
+		|| isLoaded(start)
+		|| pendingStarts.has(start)
+	)
+		return;
+
+	pendingStarts.add(start);
+
+	fetch(`${framesURL}?start=${start}&stop=${start + framePageSize}`)
+		.then(response => {
+			if (response.headers.has("X-Frame-Count"))
+				frameCount = parseInt(response.headers.get("X-Frame-Count"));
+
+			return response.json();
+		})
+		.then(page => {
+			page.forEach((frame, j) => frames[start + j] = frame);
+
+			if (page.length < framePageSize)
+				frameCount = start + page.length;
+
+			update();
+		})
+		.finally(() => pendingStarts.delete(start));
+}
+
+function prefetch() {
+	loadPage(index);
+	loadPage(index + framePageSize / 2);
 }
 
 function decrementIndex() {
 	index = Math.max(0, index - 1);
 
+	prefetch();
 	update();
 }
 
 function incrementIndex() {
-	index = Math.min(index + 1, frames.length - 1);
+	if (isLoaded(index + 1))
+		index += 1;
 
+	prefetch();
 	update();
 }
 
@@ -24,9 +70,14 @@ const previousButton = document.getElementById("previous");
 const nextButton = document.getElementById("next");
 const indexSpan = document.getElementById("index");
 const maxIndexSpan = document.getElementById("max-index");
+const framesURL = JSON.parse(document.getElementById("frames_url").textContent);
 const style = JSON.parse(document.getElementById("style").textContent);
 const frames = JSON.parse(document.getElementById("frames").textContent);
+let frameCount = JSON.parse(document.getElementById("frame_count").textContent);
+const framePageSize = JSON.parse(document.getElementById("frame_page_size").textContent);
+const pendingStarts = new Set();
 const frameGetter = () => frames[index];
 const felt = new Felt(canvas.width, canvas.height, canvas, style, frameGetter);
 
+prefetch();
 update();
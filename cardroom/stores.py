@@ -0,0 +1,811 @@
+""":mod:`cardroom.stores` implements classes related to frame stores.
+
+A frame store keeps the latest JSON-encoded frames of each group so
+that they can be served by any worker, not just the one running the
+group's controller.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from mmap import ACCESS_READ, mmap
+from struct import calcsize, pack, unpack_from
+from tempfile import mkstemp
+from threading import Lock, Thread
+from time import sleep, time_ns
+from typing import Any, BinaryIO, ClassVar
+from uuid import uuid4
+import fcntl
+import os
+
+from django.core.cache import BaseCache, caches, DEFAULT_CACHE_ALIAS
+
+
+class FrameStore(ABC):
+    """The abstract class for frame stores.
+
+    The latest frames are stored as a mapping from users to their
+    JSON-encoded frames. The anonymous view is keyed by ``''``.
+
+    Besides, a bounded history of recent frames is kept so that
+    clients that briefly disconnected can catch up. Each entry is the
+    JSON-encoded mapping from users to their frames, and its sequence
+    number is the version right after it was broadcasted.
+    """
+
+    history_size: int
+    """The maximum number of entries in the history."""
+
+    @abstractmethod
+    def increment(self, group_name: str, count: int) -> int:
+        """Atomically advance the version of the group.
+
+        Concurrent writers are thereby given distinct versions, so they
+        never overwrite each other's frames.
+
+        :param group_name: The group name.
+        :param count: The number of new frames.
+        :return: The new version.
+        """
+        pass
+
+    @abstractmethod
+    def set(
+            self,
+            group_name: str,
+            version: int,
+            data: dict[str, bytes],
+            history: list[bytes],
+    ) -> None:
+        """Store the latest frames of the group.
+
+        :param group_name: The group name.
+        :param version: The version of the frames.
+        :param data: The JSON-encoded frames, keyed by user.
+        :param history: The new history entries, the last of which has
+                        the sequence number ``version``.
+        :return: ``None``.
+        """
+        pass
+
+    @abstractmethod
+    def get_history(self, group_name: str, cursor: int) -> list[bytes] | None:
+        """Return the history entries of the group after the cursor.
+
+        :param group_name: The group name.
+        :param cursor: The sequence number the client already has.
+        :return: The entries in order, or ``None`` if some of them are
+                 no longer (or were never) kept.
+        """
+        pass
+
+    @abstractmethod
+    def get(self, group_name: str) -> tuple[int, dict[str, bytes]]:
+        """Return the latest frames of the group.
+
+        :param group_name: The group name.
+        :return: The version and the JSON-encoded frames.
+        :raises KeyError: If no frames are stored for the group.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, group_name: str) -> None:
+        """Delete the frames of the group, if any.
+
+        :param group_name: The group name.
+        :return: ``None``.
+        """
+        pass
+
+    @abstractmethod
+    def get_epoch(self) -> str:
+        """Return the epoch of the store.
+
+        Versions restart from zero when the store is emptied, so they
+        are qualified by the epoch, which is created along with the
+        store and is the same for all the processes sharing it.
+
+        :return: The epoch.
+        """
+        pass
+
+    @abstractmethod
+    def acquire(self, group_name: str) -> bool:
+        """Claim the group for the controller of this process.
+
+        Only one process may run the controller of each group, as the
+        frames of several would otherwise be interleaved. Claiming a
+        group already claimed by this store succeeds.
+
+        :param group_name: The group name.
+        :return: ``True`` if the group is claimed, or ``False`` if
+                 another process has claimed it.
+        """
+        pass
+
+    @abstractmethod
+    def release(self, group_name: str) -> None:
+        """Give up the claim on the group, if any.
+
+        :param group_name: The group name.
+        :return: ``None``.
+        """
+        pass
+
+    def get_version(self, group_name: str) -> int:
+        """Return the version of the latest frames of the group.
+
+        :param group_name: The group name.
+        :return: The version.
+        :raises KeyError: If no frames are stored for the group.
+        """
+        version, _ = self.get(group_name)
+
+        return version
+
+    def get_data(self, group_name: str, user: str) -> tuple[int, bytes]:
+        """Return the version and the latest frame of the group as seen
+        by the user.
+
+        Users without a dedicated view see the anonymous one.
+
+        :param group_name: The group name.
+        :param user: The user.
+        :return: The version and the JSON-encoded frame.
+        :raises KeyError: If no frames are stored for the group.
+        """
+        version, data = self.get(group_name)
+
+        return version, data.get(user, data[''])
+
+
+@dataclass
+class InMemoryFrameStore(FrameStore):
+    """The class for in-process frame stores.
+
+    This is only suitable for deployments with a single worker. As
+    the frames are not shared, every group can be claimed.
+    """
+
+    history_size: int = 100
+    """The maximum number of entries in the history."""
+    _epoch: str = field(
+        default_factory=lambda: f'{time_ns():x}',
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _frames: dict[str, tuple[int, dict[str, bytes]]] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _histories: dict[str, deque[tuple[int, bytes]]] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _versions: dict[str, int] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _lock: Lock = field(
+        default_factory=Lock,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    def increment(self, group_name: str, count: int) -> int:
+        with self._lock:
+            version = self._versions.get(group_name, 0)
+
+            if group_name in self._frames:
+                version = max(version, self._frames[group_name][0])
+
+            version += count
+            self._versions[group_name] = version
+
+        return version
+
+    def set(
+            self,
+            group_name: str,
+            version: int,
+            data: dict[str, bytes],
+            history: list[bytes],
+    ) -> None:
+        with self._lock:
+            if (
+                    group_name not in self._frames
+                    or self._frames[group_name][0] < version
+            ):
+                self._frames[group_name] = version, data
+
+            entries = self._histories.setdefault(
+                group_name,
+                deque(maxlen=self.history_size),
+            )
+
+            entries.extend(
+                enumerate(history, version - len(history) + 1),
+            )
+
+    def get(self, group_name: str) -> tuple[int, dict[str, bytes]]:
+        with self._lock:
+            return self._frames[group_name]
+
+    def get_history(self, group_name: str, cursor: int) -> list[bytes] | None:
+        with self._lock:
+            if group_name not in self._frames:
+                return None
+
+            version, _ = self._frames[group_name]
+            entries = self._histories[group_name]
+
+            if not version - len(entries) <= cursor <= version:
+                return None
+
+            return [entry for i, entry in entries if i > cursor]
+
+    def delete(self, group_name: str) -> None:
+        with self._lock:
+            self._frames.pop(group_name, None)
+            self._histories.pop(group_name, None)
+            self._versions.pop(group_name, None)
+
+    def get_epoch(self) -> str:
+        return self._epoch
+
+    def acquire(self, group_name: str) -> bool:
+        return True
+
+    def release(self, group_name: str) -> None:
+        pass
+
+
+@dataclass
+class SharedMemoryFrameStore(FrameStore):
+    """The class for frame stores shared by the processes of a host.
+
+    Each group is stored in its own file under :attr:`path`, which
+    should be on a memory-backed filesystem like ``/dev/shm``. Files
+    are replaced atomically on write and memory-mapped on read. Each
+    process keeps the decoded contents until the file is replaced, so
+    repeated lookups only cost a ``stat``. History entries are kept in
+    a separate file each.
+
+    Versions are counted in a separate file per group, which is locked
+    while it is advanced and while the frames are replaced, so frames
+    are never replaced by older ones.
+
+    Groups are claimed by locking yet another file per group for as
+    long as they are claimed. The lock is released by the operating
+    system if the claiming process exits.
+    """
+
+    header_format: ClassVar[str] = '<QI'
+    entry_format: ClassVar[str] = '<II'
+    path: str
+    """The directory path."""
+    history_size: int = 100
+    """The maximum number of entries in the history."""
+    _cache: dict[
+        str,
+        tuple[tuple[int, int, int], int, dict[str, bytes]],
+    ] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _owned_files: dict[str, BinaryIO] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _lock: Lock = field(
+        default_factory=Lock,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    def get_pathname(self, group_name: str) -> str:
+        return os.path.join(self.path, group_name)
+
+    def get_history_pathname(self, group_name: str, sequence: int) -> str:
+        return os.path.join(self.path, f'{group_name}.{sequence}')
+
+    def get_version_pathname(self, group_name: str) -> str:
+        return os.path.join(self.path, f'{group_name}.version')
+
+    def get_owner_pathname(self, group_name: str) -> str:
+        return os.path.join(self.path, f'{group_name}.owner')
+
+    def get_epoch_pathname(self) -> str:
+        return os.path.join(self.path, '.epoch')
+
+    def increment(self, group_name: str, count: int) -> int:
+        os.makedirs(self.path, exist_ok=True)
+
+        with open(self.get_version_pathname(group_name), 'a+b') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.seek(0)
+
+            if content := file.read():
+                version, = unpack_from('<Q', content)
+            else:
+                try:
+                    version = self.get_version(group_name)
+                except KeyError:
+                    version = 0
+
+            version += count
+
+            file.seek(0)
+            file.truncate()
+            file.write(pack('<Q', version))
+
+        return version
+
+    def write(self, pathname: str, content: bytes) -> None:
+        fd, temporary_pathname = mkstemp(
+            prefix=f'.{os.path.basename(pathname)}.',
+            dir=self.path,
+        )
+
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+
+        os.replace(temporary_pathname, pathname)
+
+    def set(
+            self,
+            group_name: str,
+            version: int,
+            data: dict[str, bytes],
+            history: list[bytes],
+    ) -> None:
+        os.makedirs(self.path, exist_ok=True)
+
+        for i, entry in enumerate(history, version - len(history) + 1):
+            if i > version - self.history_size:
+                self.write(self.get_history_pathname(group_name, i), entry)
+
+        chunks = [pack(self.header_format, version, len(data))]
+
+        for user, encoded_frame in data.items():
+            encoded_user = user.encode()
+
+            chunks.append(
+                pack(self.entry_format, len(encoded_user), len(encoded_frame)),
+            )
+            chunks.append(encoded_user)
+            chunks.append(encoded_frame)
+
+        with open(self.get_version_pathname(group_name), 'a+b') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+
+            try:
+                stored_version = self.get_version(group_name)
+            except KeyError:
+                stored_version = 0
+
+            if stored_version < version:
+                self.write(self.get_pathname(group_name), b''.join(chunks))
+
+        for i in range(
+                max(version - len(history) - self.history_size + 1, 1),
+                version - self.history_size + 1,
+        ):
+            self.remove(self.get_history_pathname(group_name, i))
+
+    def remove(self, pathname: str) -> None:
+        try:
+            os.remove(pathname)
+        except FileNotFoundError:
+            pass
+
+    def get(self, group_name: str) -> tuple[int, dict[str, bytes]]:
+        try:
+            file = open(self.get_pathname(group_name), 'rb')
+        except FileNotFoundError:
+            raise KeyError(group_name)
+
+        with file:
+            stat = os.fstat(file.fileno())
+            key = stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+            with self._lock:
+                if (
+                        group_name in self._cache
+                        and self._cache[group_name][0] == key
+                ):
+                    _, version, data = self._cache[group_name]
+
+                    return version, data
+
+            with mmap(file.fileno(), 0, access=ACCESS_READ) as buffer:
+                version, count = unpack_from(self.header_format, buffer)
+                offset = calcsize(self.header_format)
+                data = {}
+
+                for _ in range(count):
+                    user_length, frame_length = unpack_from(
+                        self.entry_format,
+                        buffer,
+                        offset,
+                    )
+                    offset += calcsize(self.entry_format)
+                    user = buffer[offset:offset + user_length].decode()
+                    offset += user_length
+                    data[user] = buffer[offset:offset + frame_length]
+                    offset += frame_length
+
+        with self._lock:
+            self._cache[group_name] = key, version, data
+
+        return version, data
+
+    def get_history(self, group_name: str, cursor: int) -> list[bytes] | None:
+        try:
+            version = self.get_version(group_name)
+        except KeyError:
+            return None
+
+        if not version - self.history_size <= cursor <= version:
+            return None
+
+        history = []
+
+        for i in range(cursor + 1, version + 1):
+            pathname = self.get_history_pathname(group_name, i)
+
+            try:
+                with open(pathname, 'rb') as file:
+                    history.append(file.read())
+            except FileNotFoundError:
+                return None
+
+        return history
+
+    def delete(self, group_name: str) -> None:
+        try:
+            version = self.get_version(group_name)
+        except KeyError:
+            version = 0
+
+        self.remove(self.get_pathname(group_name))
+        self.remove(self.get_version_pathname(group_name))
+
+        for i in range(max(version - self.history_size + 1, 1), version + 1):
+            self.remove(self.get_history_pathname(group_name, i))
+
+        with self._lock:
+            self._cache.pop(group_name, None)
+
+    def get_epoch(self) -> str:
+        pathname = self.get_epoch_pathname()
+
+        try:
+            with open(pathname) as file:
+                return file.read()
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(self.path, exist_ok=True)
+
+        fd, temporary_pathname = mkstemp(prefix='.epoch.', dir=self.path)
+
+        with os.fdopen(fd, 'w') as file:
+            file.write(f'{time_ns():x}')
+
+        # Linking fails if another process created the epoch meanwhile.
+        try:
+            os.link(temporary_pathname, pathname)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temporary_pathname)
+
+        with open(pathname) as file:
+            return file.read()
+
+    def acquire(self, group_name: str) -> bool:
+        os.makedirs(self.path, exist_ok=True)
+
+        with self._lock:
+            if group_name in self._owned_files:
+                return True
+
+            file = open(self.get_owner_pathname(group_name), 'a+b')
+
+            try:
+                fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                file.close()
+
+                return False
+
+            self._owned_files[group_name] = file
+
+        return True
+
+    def release(self, group_name: str) -> None:
+        with self._lock:
+            file = self._owned_files.pop(group_name, None)
+
+        if file is not None:
+            file.close()
+
+
+@dataclass
+class CacheFrameStore(FrameStore):
+    """The class for frame stores backed by a Django cache.
+
+    With a networked cache backend like Redis or Memcached, frames are
+    shared by all workers of all hosts. The local-memory backend can
+    stand in for it in tests.
+
+    Versions are counted with the atomic increments of the cache. The
+    frames of each group are replaced while holding a lock taken with
+    the atomic additions of the cache, so they are never replaced by
+    older ones.
+
+    Groups are claimed with leases, which are also taken with the
+    atomic additions of the cache. A thread of the store renews them
+    while they are claimed, so they lapse within
+    :attr:`lease_duration` seconds of the claiming process exiting.
+    """
+
+    alias: str = DEFAULT_CACHE_ALIAS
+    """The cache alias."""
+    key_prefix: str = 'cardroom.frames'
+    """The cache key prefix."""
+    history_size: int = 100
+    """The maximum number of entries in the history."""
+    lock_timeout: float = 10
+    """The maximum number of seconds a lock is held for."""
+    lease_duration: float = 30
+    """The number of seconds a lease lasts unless renewed."""
+    _owner: str = field(
+        default_factory=lambda: uuid4().hex,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _owned_group_names: set[str] = field(
+        default_factory=set,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _thread: Thread | None = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _lock: Lock = field(
+        default_factory=Lock,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[self.alias]
+
+    def get_key(self, group_name: str) -> str:
+        return f'{self.key_prefix}:{group_name}'
+
+    def get_version_key(self, group_name: str) -> str:
+        return f'{self.key_prefix}:{group_name}:version'
+
+    def get_history_key(self, group_name: str, sequence: int) -> str:
+        return f'{self.key_prefix}:{group_name}:{sequence}'
+
+    def get_counter_key(self, group_name: str) -> str:
+        return f'{self.key_prefix}:{group_name}:counter'
+
+    def get_lock_key(self, group_name: str) -> str:
+        return f'{self.key_prefix}:{group_name}:lock'
+
+    def get_owner_key(self, group_name: str) -> str:
+        return f'{self.key_prefix}:{group_name}:owner'
+
+    def get_epoch_key(self) -> str:
+        return f'{self.key_prefix}:epoch'
+
+    @contextmanager
+    def lock(self, group_name: str) -> Iterator[None]:
+        """Lock the frames of the group.
+
+        The lock expires after :attr:`lock_timeout` seconds, so that a
+        crashed holder does not keep others waiting forever.
+
+        :param group_name: The group name.
+        :return: The context manager.
+        """
+        key = self.get_lock_key(group_name)
+
+        while not self.cache.add(key, True, self.lock_timeout):
+            sleep(0.001)
+
+        try:
+            yield
+        finally:
+            self.cache.delete(key)
+
+    def increment(self, group_name: str, count: int) -> int:
+        key = self.get_counter_key(group_name)
+
+        try:
+            return self.cache.incr(key, count)
+        except ValueError:
+            try:
+                version = self.get_version(group_name)
+            except KeyError:
+                version = 0
+
+            self.cache.add(key, version, None)
+
+            return self.cache.incr(key, count)
+
+    def set(
+            self,
+            group_name: str,
+            version: int,
+            data: dict[str, bytes],
+            history: list[bytes],
+    ) -> None:
+        values: dict[str, Any] = {}
+
+        for i, entry in enumerate(history, version - len(history) + 1):
+            if i > version - self.history_size:
+                values[self.get_history_key(group_name, i)] = entry
+
+        self.cache.set_many(values, None)
+
+        with self.lock(group_name):
+            try:
+                stored_version = self.get_version(group_name)
+            except KeyError:
+                stored_version = 0
+
+            if stored_version < version:
+                self.cache.set_many(
+                    {
+                        self.get_key(group_name): (version, data),
+                        self.get_version_key(group_name): version,
+                    },
+                    None,
+                )
+
+        self.cache.delete_many(
+            [
+                self.get_history_key(group_name, i) for i in range(
+                    max(version - len(history) - self.history_size + 1, 1),
+                    version - self.history_size + 1,
+                )
+            ],
+        )
+
+    def get(self, group_name: str) -> tuple[int, dict[str, bytes]]:
+        frames = self.cache.get(self.get_key(group_name))
+
+        if frames is None:
+            raise KeyError(group_name)
+
+        return frames  # type: ignore[no-any-return]
+
+    def get_history(self, group_name: str, cursor: int) -> list[bytes] | None:
+        try:
+            version = self.get_version(group_name)
+        except KeyError:
+            return None
+
+        if not version - self.history_size <= cursor <= version:
+            return None
+
+        keys = [
+            self.get_history_key(group_name, i)
+            for i in range(cursor + 1, version + 1)
+        ]
+        values = self.cache.get_many(keys)
+
+        if len(values) != len(keys):
+            return None
+
+        return [values[key] for key in keys]
+
+    def delete(self, group_name: str) -> None:
+        try:
+            version = self.get_version(group_name)
+        except KeyError:
+            version = 0
+
+        self.cache.delete_many(
+            [
+                self.get_key(group_name),
+                self.get_version_key(group_name),
+                self.get_counter_key(group_name),
+                *(
+                    self.get_history_key(group_name, i) for i in range(
+                        max(version - self.history_size + 1, 1),
+                        version + 1,
+                    )
+                ),
+            ],
+        )
+
+    def get_epoch(self) -> str:
+        key = self.get_epoch_key()
+        epoch = self.cache.get(key)
+
+        if epoch is None:
+            self.cache.add(key, f'{time_ns():x}', None)
+
+            epoch = self.cache.get(key)
+
+        return epoch  # type: ignore[no-any-return]
+
+    def acquire(self, group_name: str) -> bool:
+        key = self.get_owner_key(group_name)
+
+        if (
+                not self.cache.add(key, self._owner, self.lease_duration)
+                and self.cache.get(key) != self._owner
+        ):
+            return False
+
+        with self._lock:
+            self._owned_group_names.add(group_name)
+
+            if self._thread is None:
+                self._thread = Thread(target=self.renew, daemon=True)
+
+                self._thread.start()
+
+        return True
+
+    def renew(self) -> None:
+        """Renew the leases of the claimed groups periodically.
+
+        :return: ``None``.
+        """
+        while True:
+            sleep(self.lease_duration / 3)
+
+            with self._lock:
+                group_names = tuple(self._owned_group_names)
+
+            for group_name in group_names:
+                key = self.get_owner_key(group_name)
+
+                if self.cache.get(key) == self._owner:
+                    self.cache.touch(key, self.lease_duration)
+
+    def release(self, group_name: str) -> None:
+        with self._lock:
+            self._owned_group_names.discard(group_name)
+
+        key = self.get_owner_key(group_name)
+
+        if self.cache.get(key) == self._owner:
+            self.cache.delete(key)
+
+    def get_version(self, group_name: str) -> int:
+        version = self.cache.get(self.get_version_key(group_name))
+
+        if version is None:
+            raise KeyError(group_name)
+
+        return version  # type: ignore[no-any-return]
@@ -10,12 +10,13 @@ from __future__ import annotations
 
 from collections.abc import Iterator
 from collections import deque
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from random import choice
+from typing import Any
 
 from pokerkit import HandHistory, Poker, State
 
-from cardroom.utilities import get_rat_holing_status
+from cardroom.utilities import get_settings, serialize, Settings
 
 
 @dataclass
@@ -193,6 +194,8 @@ class Table:
     """The minimum starting stack, buy-in amount, etc."""
     max_starting_stack: int
     """The maximum starting stack, buy-in amount, etc."""
+    settings: Settings = field(default_factory=get_settings, repr=False)
+    """The settings the table runs with."""
     button: Button = field(init=False)
     """The table's button."""
     seats: list[Seat] = field(default_factory=list, init=False)
@@ -306,6 +309,8 @@ class Table:
     def hand_history(self) -> HandHistory | None:
         """Return the hand history of active state, if any.
 
+        The finishing stacks are recorded once the state is terminal.
+
         :return: The hand history or ``None``.
         """
         if self.state is None:
@@ -318,8 +323,46 @@ class Table:
                 players=[seat.user for seat in self.player_seats],
             )
 
+            if not self.state.status:
+                hh = replace(hh, finishing_stacks=list(self.state.stacks))
+
+            if self.settings.fixed_point_status:
+                hh = self._unscale_hand_history(hh)
+
         return hh
 
+    def _unscale_hand_history(self, hh: HandHistory) -> HandHistory:
+        # Of the actions, only completions, bets, and raises carry
+        # amounts. Bring-ins are posted without one, and the others
+        # carry cards. The amounts are held as numbers as in the PHH
+        # files, to which the hand histories are dumped, and turned back
+        # into decimals on replay (see Settings.make_exact).
+        def unscale(values: Any) -> Any:
+            return serialize(self.settings.unscale(values))
+
+        actions = []
+
+        for action in hh.actions:
+            tokens = action.split()
+
+            if tokens[1:2] == ['cbr']:
+                tokens[2] = str(self.settings.unscale(int(tokens[2])))
+
+            actions.append(' '.join(tokens))
+
+        return replace(
+            hh,
+            antes=unscale(hh.antes),
+            blinds_or_straddles=unscale(hh.blinds_or_straddles),
+            bring_in=unscale(hh.bring_in),
+            small_bet=unscale(hh.small_bet),
+            big_bet=unscale(hh.big_bet),
+            min_bet=unscale(hh.min_bet),
+            starting_stacks=unscale(hh.starting_stacks),
+            actions=actions,
+            finishing_stacks=unscale(hh.finishing_stacks),
+        )
+
     def get_seat(self, user: str) -> Seat | None:
         """Lookup the seat of the user.
 
@@ -461,7 +504,7 @@ class Table:
                 if (
                         seat.starting_stack is not None
                         and stack > seat.starting_stack
-                        and not get_rat_holing_status()
+                        and not self.settings.rat_holing_status
                 ):
                     seat.starting_stack = None
 
@@ -687,7 +730,7 @@ class Table:
             elif (
                     seat.starting_stack is not None
                     and seat.starting_stack > starting_stack
-                    and not get_rat_holing_status()
+                    and not self.settings.rat_holing_status
             ):
                 raise ValueError(
                     (
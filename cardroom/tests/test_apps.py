@@ -0,0 +1,36 @@
+from unittest.mock import patch
+import sys
+
+from django.apps import apps
+from django.test import SimpleTestCase
+
+from cardroom.apps import CardroomConfig
+
+
+class CardroomConfigTestCase(SimpleTestCase):
+    def test_is_serving(self) -> None:
+        config = apps.get_app_config(CardroomConfig.name)
+
+        assert isinstance(config, CardroomConfig)
+
+        self.assertFalse(config.is_serving())
+
+        with patch.dict(sys.modules, {'cardroom.asgi': None}):
+            self.assertTrue(config.is_serving())
+
+        with patch.object(sys, 'argv', ['manage.py', 'runserver']):
+            self.assertFalse(config.is_serving())
+
+            with patch.dict('os.environ', {'RUN_MAIN': 'true'}):
+                self.assertTrue(config.is_serving())
+
+        with patch.object(
+                sys,
+                'argv',
+                ['manage.py', 'runserver', '--noreload'],
+        ):
+            self.assertTrue(config.is_serving())
+
+        with patch.object(sys, 'argv', ['manage.py', 'migrate']):
+            with patch.dict('os.environ', {'RUN_MAIN': 'true'}):
+                self.assertFalse(config.is_serving())
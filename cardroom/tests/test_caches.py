@@ -0,0 +1,128 @@
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from cardroom.caches import ReplayCache, ThumbnailCache, TokenCache
+from cardroom.middlewares import get_user_from_token
+
+
+class TokenCacheTestCase(SimpleTestCase):
+    def test_eviction(self) -> None:
+        token_cache = TokenCache(size=2)
+
+        self.assertRaises(KeyError, token_cache.get, 'a')
+
+        token_cache.set('a', 0)
+        token_cache.set('b', 1)
+
+        self.assertEqual(token_cache.get('a'), 0)
+
+        token_cache.set('c', 2)
+
+        self.assertEqual(token_cache.get('a'), 0)
+        self.assertRaises(KeyError, token_cache.get, 'b')
+        self.assertEqual(token_cache.get('c'), 2)
+        self.assertEqual(token_cache.hit_count, 3)
+        self.assertEqual(token_cache.miss_count, 2)
+        self.assertEqual(token_cache.hit_rate, 0.6)
+
+        token_cache.clear()
+
+        self.assertRaises(KeyError, token_cache.get, 'a')
+        self.assertEqual(token_cache.hit_rate, 0)
+
+    def test_expiry(self) -> None:
+        token_cache = TokenCache(ttl=10)
+
+        with patch('cardroom.caches.monotonic', return_value=100):
+            token_cache.set('a', 0)
+
+        with patch('cardroom.caches.monotonic', return_value=109):
+            self.assertEqual(token_cache.get('a'), 0)
+
+        with patch('cardroom.caches.monotonic', return_value=110):
+            self.assertRaises(KeyError, token_cache.get, 'a')
+
+
+class ReplayCacheTestCase(SimpleTestCase):
+    def test_get_and_set(self) -> None:
+        replay_cache = ReplayCache(size=2)
+
+        self.assertRaises(KeyError, replay_cache.get, 1, 'a')
+
+        replay_cache.set(1, 'a', [0])
+        replay_cache.set(2, 'b', [1])
+
+        self.assertEqual(replay_cache.get(1, 'a'), [0])
+        self.assertRaises(KeyError, replay_cache.get, 2, 'c')
+        self.assertRaises(KeyError, replay_cache.get, 2, 'b')
+
+        replay_cache.set(2, 'b', [1])
+        replay_cache.set(3, 'c', [2])
+
+        self.assertRaises(KeyError, replay_cache.get, 1, 'a')
+
+        replay_cache.discard(2)
+
+        self.assertRaises(KeyError, replay_cache.get, 2, 'b')
+        self.assertEqual(replay_cache.get(3, 'c'), [2])
+        self.assertEqual(replay_cache.hit_count, 2)
+        self.assertEqual(replay_cache.miss_count, 5)
+
+
+class ThumbnailCacheTestCase(SimpleTestCase):
+    def test_interval(self) -> None:
+        thumbnail_cache = ThumbnailCache(size=1, interval=5)
+
+        self.assertRaises(KeyError, thumbnail_cache.get, 'a', 0)
+
+        with patch('cardroom.caches.monotonic', return_value=100):
+            thumbnail_cache.set('a', 0, '<svg/>')
+
+        with patch('cardroom.caches.monotonic', return_value=104):
+            self.assertEqual(thumbnail_cache.get('a', 0), (0, '<svg/>'))
+            self.assertEqual(thumbnail_cache.get('a', 3), (0, '<svg/>'))
+
+        with patch('cardroom.caches.monotonic', return_value=105):
+            self.assertEqual(thumbnail_cache.get('a', 0), (0, '<svg/>'))
+            self.assertRaises(KeyError, thumbnail_cache.get, 'a', 3)
+
+            thumbnail_cache.set('b', 0, '<svg/>')
+
+        self.assertRaises(KeyError, thumbnail_cache.get, 'a', 0)
+        self.assertEqual(thumbnail_cache.hit_count, 3)
+        self.assertEqual(thumbnail_cache.miss_count, 3)
+
+
+class TokenAuthTestCase(TestCase):
+    @override_settings(CARDROOM_TOKEN_CACHE=TokenCache())
+    def test_get_user_from_token(self) -> None:
+        user = User.objects.create(username='u0')
+        token = Token.objects.create(user=user)
+        get = async_to_sync(get_user_from_token)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get(token.key), user)
+            self.assertEqual(get(token.key), user)
+
+        with self.assertNumQueries(1):
+            self.assertIsInstance(get('a'), AnonymousUser)
+            self.assertIsInstance(get('a'), AnonymousUser)
+
+        user.is_active = False
+
+        user.save()
+
+        with self.assertNumQueries(1):
+            self.assertFalse(get(token.key).is_active)
+
+        key = token.key
+
+        token.delete()
+
+        with self.assertNumQueries(1):
+            self.assertIsInstance(get(key), AnonymousUser)
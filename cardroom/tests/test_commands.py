@@ -0,0 +1,324 @@
+from io import StringIO
+from zipfile import ZipFile
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+import pokerkit
+
+from cardroom.models import (
+    HandHistory,
+    HandHistoryGame,
+    Participant,
+    Poker,
+)
+
+
+class LoadHandHistoriesTestCase(TestCase):
+    content = '''variant = "NT"
+ante_trimming_status = true
+antes = [0, 0]
+blinds_or_straddles = [1, 2]
+min_bet = 2
+starting_stacks = [200, 200]
+actions = ["d dh p1 AcAd", "d dh p2 KcKd", "p2 f"]
+'''
+
+    def test_load(self) -> None:
+        with TemporaryDirectory() as path:
+            for i in range(5):
+                Path(path, f'{i}.phh').write_text(
+                    self.content.replace('200, 200', f'200, {200 + i}'),
+                )
+
+            Path(path, 'bad.phh').write_text('variant = ')
+            Path(path, 'incomplete.phh').write_text("variant = 'NT'\n")
+
+            for workers in (1, 2):
+                self.assertRaises(
+                    CommandError,
+                    call_command,
+                    'loadhandhistories',
+                    f'{path}/*.phh',
+                    workers=workers,
+                    batch_size=10,
+                    stdout=StringIO(),
+                )
+
+                HandHistory.objects.all().delete()
+
+                stderr = StringIO()
+
+                call_command(
+                    'loadhandhistories',
+                    f'{path}/*.phh',
+                    workers=workers,
+                    batch_size=2,
+                    continue_on_error=True,
+                    stdout=StringIO(),
+                    stderr=stderr,
+                )
+
+                self.assertEqual(HandHistory.objects.count(), 5)
+                self.assertIn('bad.phh', stderr.getvalue())
+                self.assertIn('incomplete.phh', stderr.getvalue())
+                self.assertIn('TypeError', stderr.getvalue())
+
+                HandHistory.objects.all().delete()
+
+    def test_deduplication(self) -> None:
+        with TemporaryDirectory() as path:
+            Path(path, '0.phh').write_text(self.content)
+            Path(path, '1.phh').write_text(self.content)
+            Path(path, '2.phh').write_text(
+                self.content.replace('"p2 f"', '"p2 cc"'),
+            )
+
+            stdout = StringIO()
+
+            call_command(
+                'loadhandhistories',
+                f'{path}/*.phh',
+                stdout=stdout,
+            )
+
+            self.assertEqual(HandHistory.objects.count(), 2)
+            self.assertIn('skipped 1 duplicate', stdout.getvalue())
+
+            stdout = StringIO()
+
+            call_command(
+                'loadhandhistories',
+                f'{path}/*.phh',
+                batch_size=1,
+                stdout=stdout,
+            )
+
+            self.assertEqual(HandHistory.objects.count(), 2)
+            self.assertIn('skipped 3 duplicate', stdout.getvalue())
+
+    def test_checkpoint(self) -> None:
+        with TemporaryDirectory() as path:
+            checkpoint = Path(path, 'checkpoint')
+
+            Path(path, '0.phh').write_text(self.content)
+            Path(path, '1.phh').write_text('variant = ')
+            checkpoint.write_text(f'{Path(path, "0.phh")}\n')
+
+            call_command(
+                'loadhandhistories',
+                f'{path}/*.phh',
+                checkpoint=str(checkpoint),
+                continue_on_error=True,
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+            self.assertFalse(HandHistory.objects.exists())
+
+            checkpoint.unlink()
+            Path(path, '1.phh').write_text(
+                self.content.replace('"p2 f"', '"p2 cc"'),
+            )
+            call_command(
+                'loadhandhistories',
+                f'{path}/*.phh',
+                checkpoint=str(checkpoint),
+                stdout=StringIO(),
+            )
+
+            self.assertEqual(HandHistory.objects.count(), 2)
+            self.assertEqual(
+                sorted(checkpoint.read_text().splitlines()),
+                [str(Path(path, '0.phh')), str(Path(path, '1.phh'))],
+            )
+
+            HandHistory.objects.all().delete()
+            call_command(
+                'loadhandhistories',
+                f'{path}/*.phh',
+                checkpoint=str(checkpoint),
+                stdout=StringIO(),
+            )
+
+            self.assertFalse(HandHistory.objects.exists())
+
+    def test_archives(self) -> None:
+        sections = ''.join(
+            f'[{i}]\n' + self.content.replace('200, 200', f'200, {200 + i}')
+            for i in range(1, 4)
+        )
+
+        with TemporaryDirectory() as path:
+            Path(path, '0.phhs').write_text(sections)
+            Path(path, '1.phh.gz').write_bytes(
+                gzip.compress(
+                    self.content.replace('200, 200', '300, 300').encode(),
+                ),
+            )
+            Path(path, '2.phhs.xz').write_bytes(
+                lzma.compress(sections.replace('200, ', '400, ').encode()),
+            )
+            Path(path, '3.phhs.bz2').write_bytes(
+                bz2.compress(sections.replace('200, ', '500, ').encode()),
+            )
+
+            with ZipFile(Path(path, '4.zip'), 'w') as zip_file:
+                zip_file.writestr(
+                    'a/0.phhs',
+                    sections.replace('200, ', '600, '),
+                )
+                zip_file.writestr(
+                    'a/1.phh',
+                    self.content.replace('200, 200', '700, 700'),
+                )
+                zip_file.writestr('a/2.phhs', '[1]\nvariant = ')
+
+            stderr = StringIO()
+
+            call_command(
+                'loadhandhistories',
+                f'{path}/*',
+                batch_size=2,
+                continue_on_error=True,
+                stdout=StringIO(),
+                stderr=stderr,
+            )
+
+            self.assertEqual(HandHistory.objects.count(), 14)
+            self.assertIn(f'{path}/4.zip/a/2.phhs[1]', stderr.getvalue())
+            self.assertEqual(
+                sorted(
+                    hh.get_values()['starting_stacks']
+                    for hh in HandHistory.objects.all()
+                )[:3],
+                [[200, 201], [200, 202], [200, 203]],
+            )
+
+
+class SyncParticipantsTestCase(TestCase):
+    def test_sync(self) -> None:
+        hhs = HandHistory.objects.bulk_create(
+            HandHistory(
+                variant='NT',
+                antes=[0, 0],
+                starting_stacks=[200, 200],
+                actions=[],
+                players=[f'u{i}', 'v'],
+                finishing_stacks=[200 + i, 200 - i],
+            )
+            for i in range(5)
+        )
+
+        hhs[0].save()
+        call_command('syncparticipants', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(Participant.objects.count(), 10)
+        self.assertEqual(
+            list(
+                Participant.objects.filter(
+                    player='v',
+                ).order_by('hand_history').values_list('net', flat=True),
+            ),
+            [0, -1, -2, -3, -4],
+        )
+
+        Participant.objects.filter(player='v').update(net=None)
+
+        stdout = StringIO()
+
+        call_command('syncparticipants', stdout=stdout)
+
+        self.assertIn('of 0 hand histories', stdout.getvalue())
+
+        call_command('syncparticipants', all=True, stdout=StringIO())
+
+        self.assertEqual(Participant.objects.count(), 10)
+        self.assertFalse(Participant.objects.filter(net=None).exists())
+
+
+class CompactHandHistoriesTestCase(TestCase):
+    def test_compact_and_expand(self) -> None:
+        hhs = []
+
+        for i in range(5):
+            hh = HandHistory.dump(
+                pokerkit.HandHistory.loads(
+                    LoadHandHistoriesTestCase.content.replace(
+                        '200, 200',
+                        f'200, {200 + i}',
+                    ),
+                ),
+            )
+
+            hh.save()
+            hhs.append(hh)
+
+        call_command('compacthandhistories', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(HandHistoryGame.objects.count(), 1)
+        self.assertFalse(Poker.objects.exists())
+        self.assertFalse(HandHistory.objects.filter(game=None).exists())
+
+        for hh in hhs:
+            compacted_hh = HandHistory.objects.get(pk=hh.pk)
+
+            self.assertIsNone(compacted_hh.actions)
+            self.assertEqual(compacted_hh.load(), hh.load())
+
+        call_command('compacthandhistories', expand=True, stdout=StringIO())
+
+        self.assertFalse(HandHistory.objects.exclude(game=None).exists())
+
+        for hh in hhs:
+            expanded_hh = HandHistory.objects.get(pk=hh.pk)
+
+            self.assertIsNone(expanded_hh.compressed_data)
+            self.assertEqual(expanded_hh.actions, hh.actions)
+            self.assertEqual(expanded_hh.load(), hh.load())
+
+
+class DumpHandHistoriesTestCase(TestCase):
+    def test_dump(self) -> None:
+        hhs = []
+
+        for i in range(5):
+            hhs.append(
+                HandHistory.dump(
+                    pokerkit.HandHistory.loads(
+                        LoadHandHistoriesTestCase.content.replace(
+                            '200, 200',
+                            f'200, {200 + i}',
+                        ),
+                    ),
+                ),
+            )
+
+        HandHistory.create_all(hhs)
+
+        with TemporaryDirectory() as path:
+            for name in ('a.phhs', 'b.phhs.gz', 'c.phhs.xz', 'd.phhs.zip'):
+                pathname = str(Path(path, name))
+
+                call_command(
+                    'dumphandhistories',
+                    pathname,
+                    chunk_size=2,
+                    stderr=StringIO(),
+                )
+                HandHistory.objects.all().delete()
+                call_command(
+                    'loadhandhistories',
+                    pathname,
+                    stdout=StringIO(),
+                )
+
+                self.assertEqual(
+                    set(HandHistory.objects.values_list('digest', flat=True)),
+                    {hh.digest for hh in hhs},
+                )
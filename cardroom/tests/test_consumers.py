@@ -0,0 +1,122 @@
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import override_settings, TestCase
+
+from cardroom.consumers import CashGameConsumer
+from cardroom.controllers import Controller
+from cardroom.lobbies import Lobby
+from cardroom.models import CashGame, Poker
+from cardroom.stores import SharedMemoryFrameStore
+
+
+class CashGameConsumerTestCase(TestCase):
+    def tearDown(self) -> None:
+        for cash_game in CashGame.objects.all():
+            Lobby.unregister(cash_game.group_name)
+
+    def test_import_side_effects(self) -> None:
+        code = dedent(
+            '''\
+            from threading import active_count
+            import sys
+
+            import django
+
+            django.setup()
+
+            from django.db import connection
+
+            queries = []
+
+            def execute(execute, sql, params, many, context):
+                queries.append(sql)
+
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(execute):
+                import cardroom.routings
+
+                from cardroom.controllers import Controller
+                from cardroom.models import CashGame
+
+                CashGame(pk=1).get_websocket_url()
+
+            print(
+                'cardroom.consumers' in sys.modules,
+                len(queries),
+                active_count(),
+                len(Controller._controllers),
+            )
+            ''',
+        )
+        env = os.environ.copy()
+        env['DJANGO_SETTINGS_MODULE'] = settings.SETTINGS_MODULE
+        env['PYTHONPATH'] = os.pathsep.join(sys.path)
+        process = subprocess.run(
+            (sys.executable, '-c', code),
+            capture_output=True,
+            check=True,
+            env=env,
+            text=True,
+        )
+
+        self.assertEqual(process.stdout.split(), ['True', '0', '1', '0'])
+
+    def test_setup(self) -> None:
+        game = Poker.objects.create(
+            variant='NT',
+            raw_antes=0,
+            raw_blinds_or_straddles=[1, 2],
+            min_bet=2,
+        )
+        cash_game = CashGame.objects.create(
+            game=game,
+            seat_count=6,
+            min_starting_stack=80,
+            max_starting_stack=200,
+            time_bank=30,
+            time_bank_increment=1,
+            state_construction_timeout=1,
+            state_destruction_timeout=3,
+            idle_timeout=60,
+            standing_pat_timeout=1,
+            betting_timeout=10,
+            hole_cards_showing_or_mucking_timeout=1,
+        )
+
+        Controller.stop(cash_game.group_name)
+
+        with self.assertLogs('cardroom.consumers', 'INFO') as logs:
+            CashGameConsumer.setup()
+            CashGameConsumer.setup()
+
+        Controller.stop(cash_game.group_name)
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(logs.records[0].args[0], 1)  # type: ignore[index]
+        self.assertEqual(logs.records[1].args[0], 0)  # type: ignore[index]
+
+        with TemporaryDirectory() as path:
+            frame_store = SharedMemoryFrameStore(path)
+            other_frame_store = SharedMemoryFrameStore(path)
+
+            self.assertTrue(other_frame_store.acquire(cash_game.group_name))
+
+            with override_settings(CARDROOM_FRAME_STORE=frame_store):
+
+                with self.assertLogs('cardroom.consumers', 'INFO') as logs:
+                    CashGameConsumer.setup()
+
+                self.assertRaises(
+                    KeyError,
+                    Controller.lookup,
+                    cash_game.group_name,
+                )
+
+        self.assertEqual(logs.records[0].args[0], 0)  # type: ignore[index]
+        self.assertEqual(logs.records[0].args[2], 1)  # type: ignore[index]
@@ -0,0 +1,129 @@
+from asyncio import create_task, get_running_loop, sleep, wait_for
+from functools import partial
+from json import loads
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer  # type: ignore[import-untyped]
+from django.test import SimpleTestCase
+from pokerkit import NoLimitTexasHoldem
+
+from cardroom.frame import Frame
+from cardroom.gamemaster import Gamemaster
+from cardroom.table import Table
+from cardroom.utilities import serialize
+
+
+class GamemasterTestCase(SimpleTestCase):
+    def create_frames(self) -> dict[str, Frame]:
+        table = Table(
+            NoLimitTexasHoldem((), False, {1: 3}, [1, 2], 2),
+            6,
+            80,
+            200,
+        )
+
+        table.join('u0', 4)
+
+        return Frame.from_table(table, ())
+
+    def test_versions_and_data(self) -> None:
+        group_name = 'GamemasterTestCase-0'
+        frames = self.create_frames()
+
+        self.assertRaises(KeyError, Gamemaster.get_version, group_name)
+        self.assertRaises(KeyError, Gamemaster.get_data, group_name, '')
+
+        Gamemaster.broadcast(group_name, [frames, frames], ([], ''))
+
+        self.assertEqual(Gamemaster.get_version(group_name), 2)
+
+        version, data = Gamemaster.get_data(group_name, 'u0')
+
+        self.assertEqual(version, 2)
+        self.assertEqual(loads(data), serialize(frames['u0']))
+        self.assertIs(Gamemaster.get_data(group_name, 'u0')[1], data)
+        self.assertEqual(
+            Gamemaster.get_data(group_name, 'u1'),
+            Gamemaster.get_data(group_name, ''),
+        )
+
+        Gamemaster.broadcast(group_name, [], ([], ''))
+
+        self.assertEqual(Gamemaster.get_version(group_name), 2)
+
+        Gamemaster.broadcast(group_name, [frames], ([], ''))
+
+        self.assertEqual(Gamemaster.get_version(group_name), 3)
+        self.assertIsNot(Gamemaster.get_data(group_name, 'u0')[1], data)
+        self.assertEqual(
+            Gamemaster.get_history(group_name, 0),
+            serialize([frames, frames, frames]),
+        )
+        self.assertEqual(
+            Gamemaster.get_history(group_name, 2),
+            serialize([frames]),
+        )
+        self.assertIsNone(Gamemaster.get_history(group_name, 4))
+        self.assertEqual(
+            Gamemaster.get_keyframe(group_name),
+            (3, serialize(frames)),
+        )
+
+    async def test_subscribe(self) -> None:
+        group_name = 'GamemasterTestCase-1'
+        frames = self.create_frames()
+
+        async with Gamemaster.subscribe(group_name) as channel_name:
+            receipt = create_task(get_channel_layer().receive(channel_name))
+
+            await sleep(0)
+            await sync_to_async(Gamemaster.broadcast)(
+                group_name,
+                [frames, frames],
+                ([], ''),
+            )
+
+            event = await wait_for(receipt, 1)
+
+        self.assertEqual(event['version'], 2)
+        self.assertEqual(event['frames'], serialize([frames, frames]))
+        self.assertNotIn(group_name, get_channel_layer().groups)
+
+    async def test_send(self) -> None:
+        loop = get_running_loop()
+        channel_layer = get_channel_layer()
+        channel = await channel_layer.new_channel()
+
+        await channel_layer.group_add('GamemasterTestCase', channel)
+
+        receipt = loop.create_task(channel_layer.receive(channel))
+
+        await sleep(0)
+        await loop.run_in_executor(
+            None,
+            partial(
+                Gamemaster.send,
+                'GamemasterTestCase',
+                {'type': 'test', 'value': 0},
+            ),
+        )
+
+        self.assertEqual(
+            await wait_for(receipt, 1),
+            {'type': 'test', 'value': 0},
+        )
+
+        Gamemaster.send(
+            'GamemasterTestCase',
+            {'type': 'test', 'value': 1},
+        )
+
+        self.assertEqual(
+            await wait_for(channel_layer.receive(channel), 1),
+            {'type': 'test', 'value': 1},
+        )
+
+        await channel_layer.group_discard(
+            'GamemasterTestCase',
+            channel,
+        )
@@ -0,0 +1,36 @@
+from asyncio import get_running_loop, sleep, wait_for
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from cardroom.layers import InMemoryChannelLayer
+
+
+class InMemoryChannelLayerTestCase(SimpleTestCase):
+    async def test_group_send(self) -> None:
+        loop = get_running_loop()
+        channel_layer = InMemoryChannelLayer(capacity=1)
+        channel = await channel_layer.new_channel()
+
+        await channel_layer.group_add('test', channel)
+
+        receipt = loop.create_task(channel_layer.receive(channel))
+
+        await sleep(0)
+
+        for value in range(3):
+            await loop.run_in_executor(
+                None,
+                async_to_sync(channel_layer.group_send),
+                'test',
+                {'type': 'test', 'value': value},
+            )
+
+        self.assertEqual(
+            await wait_for(receipt, 1),
+            {'type': 'test', 'value': 0},
+        )
+
+        await channel_layer.group_discard('test', channel)
+
+        self.assertFalse(channel_layer._loops)
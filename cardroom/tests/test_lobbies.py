@@ -0,0 +1,163 @@
+from decimal import Decimal
+from types import SimpleNamespace
+import json
+
+from asgiref.sync import sync_to_async
+from channels.testing import (  # type: ignore[import-untyped]
+    WebsocketCommunicator,
+)
+from django.test import SimpleTestCase
+from pokerkit import Automation, NoLimitTexasHoldem
+
+from cardroom.consumers import LobbyConsumer
+from cardroom.lobbies import HandStatistics, Lobby
+from cardroom.signals import (
+    post_state_construction,
+    post_termination,
+    pre_state_destruction,
+)
+from cardroom.table import Table
+import cardroom.controllers as controllers
+
+
+class HandStatisticsTestCase(SimpleTestCase):
+    def test_window(self) -> None:
+        statistics = HandStatistics(window=1800)
+
+        self.assertEqual(statistics.average_pot, 0)
+
+        statistics.record(0, 10)
+        statistics.record(600, 20)
+        statistics.record(1200, 60)
+
+        self.assertEqual(statistics.hand_count, 3)
+        self.assertEqual(statistics.hands_per_hour, 6)
+        self.assertEqual(statistics.average_pot, 30)
+
+        statistics.expire(1800)
+
+        self.assertEqual(statistics.hand_count, 2)
+        self.assertEqual(statistics.average_pot, 40)
+
+        statistics.expire(3000)
+
+        self.assertEqual(statistics.hand_count, 0)
+        self.assertEqual(statistics.average_pot, 0)
+
+        statistics.record(3600, Decimal('0.1'))
+        statistics.record(3600, Decimal('0.2'))
+
+        self.assertEqual(json.dumps(statistics.average_pot), '0.15')
+
+
+class LobbyTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.controller = SimpleNamespace(name='test')
+        self.table = Table(
+            NoLimitTexasHoldem(
+                (
+                    Automation.ANTE_POSTING,
+                    Automation.BET_COLLECTION,
+                    Automation.BLIND_OR_STRADDLE_POSTING,
+                    Automation.CARD_BURNING,
+                    Automation.HOLE_DEALING,
+                    Automation.BOARD_DEALING,
+                    Automation.HOLE_CARDS_SHOWING_OR_MUCKING,
+                    Automation.HAND_KILLING,
+                    Automation.CHIPS_PUSHING,
+                    Automation.CHIPS_PULLING,
+                ),
+                False,
+                0,
+                [1, 2],
+                2,
+            ),
+            6,
+            80,
+            200,
+        )
+
+        self.table.join('u0', 0)
+        self.table.join('u1', 1)
+        self.table.join('u2', 2)
+        self.table.buy_rebuy_top_off_or_rat_hole('u0', 200)
+        self.table.buy_rebuy_top_off_or_rat_hole('u1', 200)
+
+    def tearDown(self) -> None:
+        Lobby.unregister('test')
+
+    def send_signal(self, signal: object) -> None:
+        signal.send(  # type: ignore[attr-defined]
+            controllers.CashGame,
+            controller=self.controller,
+            table=self.table,
+        )
+
+    def get_summary(self) -> dict[str, object]:
+        _, data = Lobby.get_data()
+        summary: dict[str, object] = json.loads(data)['tables']['test']
+
+        return summary
+
+    def test_summary(self) -> None:
+        self.send_signal(post_state_construction)
+
+        version, _ = Lobby.get_data()
+
+        Lobby.register('test', {'id': 0, 'variant': 'NT'})
+
+        self.assertEqual(Lobby.get_data()[0], version + 1)
+        self.assertEqual(
+            self.get_summary(),
+            {
+                'id': 0,
+                'variant': 'NT',
+                'player_count': 0,
+                'waiting_count': 0,
+                'average_pot': 0,
+                'hands_per_hour': 0,
+            },
+        )
+
+        self.send_signal(post_state_construction)
+        self.send_signal(post_state_construction)
+
+        self.assertEqual(Lobby.get_data()[0], version + 2)
+        self.assertEqual(self.get_summary()['player_count'], 3)
+        self.assertEqual(self.get_summary()['waiting_count'], 3)
+
+        self.table.construct_state()
+
+        assert self.table.state is not None
+
+        while self.table.state.status:
+            self.table.state.check_or_call()
+
+        self.send_signal(pre_state_destruction)
+        self.table.destroy_state()
+
+        self.assertEqual(self.get_summary()['average_pot'], 4)
+        self.assertEqual(self.get_summary()['hands_per_hour'], 1)
+
+        self.send_signal(post_termination)
+
+        self.assertNotIn('test', json.loads(Lobby.get_data()[1])['tables'])
+        self.assertEqual(Lobby.get_data()[0], version + 4)
+
+    async def test_consumer(self) -> None:
+        communicator = WebsocketCommunicator(LobbyConsumer.as_asgi(), '/')
+        connected, _ = await communicator.connect()
+
+        self.assertTrue(connected)
+
+        snapshot = await communicator.receive_json_from()
+
+        await sync_to_async(Lobby.register)('test', {'id': 0})
+
+        delta = await communicator.receive_json_from()
+
+        self.assertNotIn('test', snapshot['tables'])
+        self.assertEqual(delta['version'], snapshot['version'] + 1)
+        self.assertEqual(delta['tables']['test']['id'], 0)
+
+        await communicator.disconnect()
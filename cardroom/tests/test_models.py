@@ -1,13 +1,24 @@
+from decimal import Decimal
 from pickle import dumps
 from textwrap import dedent
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from django.test import TestCase
+from django.db.models import Count
+from django.test import override_settings, TestCase
 from pokerkit import Automation, NoLimitShortDeckHoldem, NoLimitTexasHoldem
 import pokerkit
 
-from cardroom.models import Controller, HandHistory, Poker
-from cardroom.utilities import get_divmod
+from cardroom.caches import ReplayCache
+from cardroom.frame import Frame
+from cardroom.models import (
+    Controller,
+    HandHistory,
+    HandHistoryGame,
+    Participant,
+    Poker,
+)
+from cardroom.replays import Replay
+from cardroom.utilities import get_divmod, get_settings, serialize
 import cardroom.table as table
 
 
@@ -118,6 +129,164 @@ class ControllerTestCase(PickleTestCaseMixin, TestCase):
             ),
         )
 
+    @override_settings(
+            CARDROOM_DECIMAL_PLACES=2,
+            CARDROOM_FIXED_POINT_STATUS=True,
+    )
+    def test_fixed_point(self) -> None:
+        game = Poker(
+            variant='NT',
+            raw_antes=0,
+            raw_blinds_or_straddles=[0.05, 0.1],
+            min_bet=0.1,
+        )
+        controller = MagicMock(
+            game=game,
+            seat_count=2,
+            min_starting_stack=2,
+            max_starting_stack=10,
+        )
+        table_ = Controller.load_table(controller)
+        parse_value = get_settings().parse_value
+
+        self.assertEqual(table_.game.raw_blinds_or_straddles, [5, 10])
+        self.assertEqual(table_.max_starting_stack, 1000)
+
+        table_.join('u0', 0)
+        table_.join('u1', 1)
+        table_.buy_rebuy_top_off_or_rat_hole('u0', parse_value('3.33'))
+        table_.buy_rebuy_top_off_or_rat_hole('u1', parse_value('3.33'))
+        table_.construct_state()
+
+        state = table_.state
+
+        assert state is not None
+
+        while state.can_post_blind_or_straddle():
+            state.post_blind_or_straddle()
+
+        while state.can_deal_hole():
+            state.deal_hole()
+
+        state.complete_bet_or_raise_to(parse_value('0.35'))
+
+        self.assertEqual(sorted(state.stacks), [298, 323])
+
+        assert table_.turn_seat is not None
+        assert table_.turn_seat.user is not None
+
+        frame = Frame.from_table(table_, ())[table_.turn_seat.user]
+
+        self.assertEqual(
+            sorted((seat.bet, seat.stack) for seat in frame.seats),
+            [
+                (Decimal('0.1'), Decimal('3.23')),
+                (Decimal('0.35'), Decimal('2.98')),
+            ],
+        )
+        self.assertEqual(frame.action.brtr, (2, 10))
+        self.assertEqual(frame.action.cc, Decimal('0.25'))
+        self.assertEqual(
+            frame.action.cbr,
+            (False, True, Decimal('0.6'), Decimal('3.33')),
+        )
+        self.assertEqual(
+            serialize(frame.action)['cbr'],
+            [False, True, 0.6, 3.33],
+        )
+
+        state.check_or_call()
+
+        hh = table_.hand_history
+
+        assert hh is not None
+
+        self.assertEqual(hh.blinds_or_straddles, [0.05, 0.1])
+        self.assertEqual(hh.starting_stacks, [3.33, 3.33])
+        self.assertEqual(
+            [action.split()[1:] for action in hh.actions[2:]],
+            [['cbr', '0.35'], ['cc']],
+        )
+
+        hh_ = HandHistory.dump(hh)
+
+        hh_.save()
+        hh_.refresh_from_db()
+
+        amounts = []
+
+        for serialized_frame in hh_.get_serialized_frames():
+            amounts.extend(serialized_frame['pot'])
+
+            for seat in serialized_frame['seats']:
+                amounts.extend((seat['bet'], seat['stack']))
+
+        self.assertIn(3.23, amounts)
+        self.assertIn(2.98, amounts)
+        self.assertEqual(amounts, [round(amount, 2) for amount in amounts])
+
+    @override_settings(
+            CARDROOM_DECIMAL_PLACES=2,
+            CARDROOM_FIXED_POINT_STATUS=True,
+    )
+    def test_fixed_point_hand_history(self) -> None:
+        game = Poker(
+            variant='F7S',
+            raw_antes=0.05,
+            bring_in=0.1,
+            small_bet=0.25,
+            big_bet=0.5,
+        )
+        controller = MagicMock(
+            game=game,
+            seat_count=2,
+            min_starting_stack=2,
+            max_starting_stack=10,
+        )
+        table_ = Controller.load_table(controller)
+        parse_value = get_settings().parse_value
+
+        table_.join('u0', 0)
+        table_.join('u1', 1)
+        table_.buy_rebuy_top_off_or_rat_hole('u0', parse_value('3.33'))
+        table_.buy_rebuy_top_off_or_rat_hole('u1', parse_value('3.33'))
+        table_.construct_state()
+
+        state = table_.state
+
+        assert state is not None
+
+        while state.can_post_ante():
+            state.post_ante()
+
+        if state.can_collect_bets():
+            state.collect_bets()
+
+        while state.can_deal_hole():
+            state.deal_hole()
+
+        state.post_bring_in()
+        state.complete_bet_or_raise_to()
+        state.fold()
+
+        hh = table_.hand_history
+
+        assert hh is not None
+
+        # Only completions, bets, and raises carry amounts.
+        self.assertEqual(
+            [action.split()[1:] for action in hh.actions[2:]],
+            [['pb'], ['cbr', '0.25'], ['f']],
+        )
+        self.assertEqual(hh.antes, [0.05, 0.05])
+        self.assertEqual(hh.bring_in, 0.1)
+        self.assertEqual(hh.small_bet, 0.25)
+        self.assertEqual(hh.big_bet, 0.5)
+        self.assertEqual(
+            pokerkit.HandHistory.loads(hh.dumps()).starting_stacks,
+            [3.33, 3.33],
+        )
+
 
 class HandHistoryTestCase(TestCase):
     def test_dump_and_load(self) -> None:
@@ -206,3 +375,277 @@ class HandHistoryTestCase(TestCase):
         pkhh1 = hh1.load()
 
         self.assertEqual(pkhh0, pkhh1)
+
+        digest = hh1.digest
+        hh1.author = 'Alice'
+
+        hh1.save(update_fields=['author'])
+        hh1.refresh_from_db()
+
+        self.assertNotEqual(hh1.digest, digest)
+        self.assertEqual(
+            hh1.digest,
+            HandHistory.get_digest(hh1.get_values()),
+        )
+
+    def test_participants(self) -> None:
+        pkhh = pokerkit.HandHistory.loads(
+            dedent(
+                '''\
+                variant = "NT"
+                ante_trimming_status = true
+                antes = [0, 0, 0]
+                blinds_or_straddles = [1, 2, 0]
+                min_bet = 2
+                starting_stacks = [200, 200, 200]
+                actions = [
+                  "d dh p1 AcAd",
+                  "d dh p2 KcKd",
+                  "d dh p3 QcQd",
+                  "p3 cbr 6",
+                  "p1 f",
+                  "p2 f",
+                ]
+                seats = [3, 1, 2]
+                players = ["Alice", "Bob", "Carol"]
+                '''
+            ),
+        )
+        hh = HandHistory.dump(pkhh)
+
+        hh.save()
+
+        self.assertEqual(
+            list(
+                hh.participants.order_by('pk').values_list(
+                    'seat',
+                    'player',
+                    'starting_stack',
+                    'finishing_stack',
+                    'net',
+                ),
+            ),
+            [
+                (3, 'Alice', 200, None, None),
+                (1, 'Bob', 200, None, None),
+                (2, 'Carol', 200, None, None),
+            ],
+        )
+
+        hh.players = ['Alice', 'Bob', 'Ted']
+
+        hh.save()
+
+        self.assertEqual(
+            list(hh.participants.values_list('player', flat=True)),
+            ['Alice', 'Bob', 'Ted'],
+        )
+
+        pkhh.finishing_stacks = [0, 0, 0]
+        hhs = HandHistory.create_all(
+            [HandHistory.dump(pkhh), hh, HandHistory.dump(pkhh)],
+        )
+
+        self.assertEqual(len(hhs), 1)
+        self.assertEqual(
+            list(
+                Participant.objects.filter(
+                    hand_history=hhs[0],
+                ).values_list('net', flat=True),
+            ),
+            [-200, -200, -200],
+        )
+
+    def test_table_participants(self) -> None:
+        table_ = table.Table(
+            NoLimitTexasHoldem(
+                (Automation.BLIND_OR_STRADDLE_POSTING,),
+                False,
+                0,
+                [1, 2],
+                2,
+            ),
+            2,
+            80,
+            200,
+        )
+
+        table_.join('Alice', 0)
+        table_.join('Bob', 1)
+        table_.buy_rebuy_top_off_or_rat_hole('Alice', 200)
+        table_.buy_rebuy_top_off_or_rat_hole('Bob', 100)
+        table_.construct_state()
+
+        state = table_.state
+
+        assert state is not None
+
+        while state.can_deal_hole():
+            state.deal_hole()
+
+        state.fold()
+
+        while state.status:
+            if state.can_collect_bets():
+                state.collect_bets()
+            elif state.can_push_chips():
+                state.push_chips()
+            else:
+                state.pull_chips()
+
+        hh = table_.hand_history
+
+        assert hh is not None
+
+        hhs = HandHistory.create_all([HandHistory.dump(hh)])
+
+        self.assertEqual(
+            sorted(
+                Participant.objects.filter(
+                    hand_history=hhs[0],
+                ).values_list('net', flat=True),
+            ),
+            [-1, 1],
+        )
+
+    @override_settings(CARDROOM_COMPACT_STORAGE_STATUS=True)
+    def test_concurrent_creation(self) -> None:
+        pkhhs = [
+            pokerkit.HandHistory(
+                variant='NT',
+                ante_trimming_status=True,
+                antes=[0, 0],
+                blinds_or_straddles=[1, 2],
+                min_bet=2,
+                starting_stacks=[starting_stack] * 2,
+                actions=[],
+                players=['Alice', 'Bob'],
+                finishing_stacks=[starting_stack] * 2,
+            )
+            for starting_stack in (200, 300)
+        ]
+        compact_all = HandHistory.compact_all
+
+        def store_concurrently(hhs: object) -> None:
+            HandHistory.dump(pkhhs[0]).save()
+            compact_all(hhs)  # type: ignore[arg-type]
+
+        with patch.object(
+                HandHistory,
+                'compact_all',
+                side_effect=store_concurrently,
+        ):
+            hhs = HandHistory.create_all(map(HandHistory.dump, pkhhs))
+
+        self.assertEqual(len(hhs), 1)
+        self.assertEqual(hhs[0].load().starting_stacks, [300, 300])
+        self.assertEqual(
+            list(
+                HandHistory.objects.order_by('pk').annotate(
+                    participant_count=Count('participants'),
+                ).values_list('participant_count', flat=True),
+            ),
+            [2, 2],
+        )
+        self.assertEqual(
+            list(hhs[0].participants.values_list('net', flat=True)),
+            [0, 0],
+        )
+
+    @override_settings(CARDROOM_COMPACT_STORAGE_STATUS=True)
+    def test_compact_storage(self) -> None:
+        pkhhs = []
+
+        for starting_stack in (200, 300):
+            pkhhs.append(
+                pokerkit.HandHistory.loads(
+                    dedent(
+                        f'''\
+                        variant = "NT"
+                        ante_trimming_status = true
+                        antes = [0, 1, 0]
+                        blinds_or_straddles = [1, 2, 0]
+                        min_bet = 2
+                        starting_stacks = [{starting_stack}, 200, 200]
+                        actions = [
+                          "d dh p1 AcAd",
+                          "d dh p2 KcKd",
+                          "d dh p3 QcQd",
+                          "p3 cbr 6",
+                          "p1 f",
+                          "p2 f",
+                        ]
+                        players = ["Alice", "Bob", "Carol"]
+                        finishing_stacks = [{starting_stack - 1}, 198, 203]
+                        time = 12:34:56
+                        '''
+                    ),
+                    automations=HandHistory.automations,
+                ),
+            )
+
+        hhs = HandHistory.create_all(map(HandHistory.dump, pkhhs))
+
+        self.assertEqual(len(hhs), 2)
+        self.assertEqual(HandHistoryGame.objects.count(), 1)
+        self.assertFalse(Poker.objects.exists())
+
+        for pkhh, hh in zip(pkhhs, HandHistory.objects.order_by('pk')):
+            self.assertIsNotNone(hh.game)
+            self.assertIsNotNone(hh.compressed_data)
+            self.assertIsNone(hh.antes)
+            self.assertIsNone(hh.actions)
+            self.assertEqual(hh.load(), pkhh)
+            self.assertEqual(
+                list(hh.participants.values_list('net', flat=True)),
+                [-1, -2, 3],
+            )
+
+            hh.expand()
+            hh.save()
+
+            self.assertEqual(hh.load(), pkhh)
+
+        self.assertEqual(
+            HandHistory.create_all(map(HandHistory.dump, pkhhs)),
+            [],
+        )
+
+    @override_settings(CARDROOM_REPLAY_CACHE=ReplayCache())
+    def test_serialized_frames(self) -> None:
+        hh = HandHistory.dump(
+            pokerkit.HandHistory.loads(
+                dedent(
+                    '''\
+                    variant = "NT"
+                    ante_trimming_status = true
+                    antes = [0, 0]
+                    blinds_or_straddles = [1, 2]
+                    min_bet = 2
+                    starting_stacks = [200, 200]
+                    actions = ["d dh p1 AcAd", "d dh p2 KcKd", "p2 f"]
+                    '''
+                ),
+            ),
+        )
+        frames = serialize(hh.frames)
+
+        with patch('cardroom.models.Replay', wraps=Replay) as mock:
+            self.assertEqual(hh.get_serialized_frames(), frames)
+
+            hh.save()
+
+            self.assertEqual(hh.get_serialized_frames(), frames)
+            self.assertEqual(hh.get_serialized_frames(), frames)
+            self.assertEqual(
+                HandHistory.objects.get(pk=hh.pk).get_serialized_frames(),
+                frames,
+            )
+            self.assertEqual(mock.call_count, 2)
+
+            hh.starting_stacks = [100, 100]
+
+            hh.save()
+
+            self.assertNotEqual(hh.get_serialized_frames(), frames)
+            self.assertEqual(mock.call_count, 3)
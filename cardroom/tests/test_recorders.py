@@ -0,0 +1,133 @@
+from threading import Event
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import TransactionTestCase
+from django.test.utils import override_settings
+from pokerkit import HandHistory as PokerkitHandHistory, NoLimitTexasHoldem
+
+from cardroom.models import HandHistory
+from cardroom.recorders import HandRecorder
+from cardroom.signals import post_termination, pre_state_destruction
+from cardroom.table import Table
+import cardroom.controllers as controllers
+
+
+class HandRecorderTestCase(TransactionTestCase):
+    def create_table(self) -> Table:
+        table = Table(
+            NoLimitTexasHoldem((), False, 0, [1, 2], 2),
+            6,
+            80,
+            200,
+        )
+
+        table.join('u0', 0)
+        table.join('u1', 1)
+        table.buy_rebuy_top_off_or_rat_hole('u0', 200)
+        table.buy_rebuy_top_off_or_rat_hole('u1', 200)
+        table.construct_state()
+
+        return table
+
+    def send_signal(self, signal: object, table: Table) -> None:
+        signal.send(  # type: ignore[attr-defined]
+            controllers.CashGame,
+            controller=SimpleNamespace(name=''),
+            table=table,
+        )
+
+    @override_settings(
+            CARDROOM_HAND_RECORDER_FLUSH_SIZE=2,
+            CARDROOM_HAND_RECORDER_FLUSH_INTERVAL=60,
+    )
+    def test_flush_size(self) -> None:
+        table = self.create_table()
+        hand_history = table.hand_history
+        counts = []
+        event = Event()
+
+        assert hand_history is not None
+
+        def write(hand_histories: list[PokerkitHandHistory]) -> None:
+            counts.append(len(hand_histories))
+            event.set()
+
+        with patch.object(HandRecorder, '_write', side_effect=write):
+            for _ in range(3):
+                self.send_signal(pre_state_destruction, table)
+
+            self.assertTrue(event.wait(5))
+            self.assertEqual(counts, [2])
+
+            self.send_signal(post_termination, table)
+
+        self.assertEqual(counts, [2, 1])
+
+        self.send_signal(pre_state_destruction, table)
+        self.send_signal(post_termination, table)
+
+        self.assertEqual(HandHistory.objects.count(), 1)
+
+        saved_hand_history = HandHistory.objects.get().load()
+
+        self.assertEqual(saved_hand_history.actions, hand_history.actions)
+        self.assertEqual(saved_hand_history.players, hand_history.players)
+
+    @override_settings(
+            CARDROOM_HAND_RECORDER_FLUSH_SIZE=100,
+            CARDROOM_HAND_RECORDER_FLUSH_INTERVAL=0.01,
+    )
+    def test_flush_interval(self) -> None:
+        event = Event()
+        hand_history = self.create_table().hand_history
+
+        assert hand_history is not None
+
+        with patch.object(
+                HandRecorder,
+                '_write',
+                side_effect=lambda hand_histories: event.set(),
+        ):
+            HandRecorder.record(hand_history)
+
+            self.assertTrue(event.wait(5))
+
+    @override_settings(
+            CARDROOM_HAND_RECORDER_FLUSH_SIZE=100,
+            CARDROOM_HAND_RECORDER_FLUSH_INTERVAL=60,
+    )
+    def test_retry(self) -> None:
+        event = Event()
+        hand_history = self.create_table().hand_history
+        counts = []
+
+        assert hand_history is not None
+
+        def write(hand_histories: list[PokerkitHandHistory]) -> None:
+            counts.append(len(hand_histories))
+
+            if len(counts) == 1:
+                raise RuntimeError
+
+            event.set()
+
+        with (
+                patch.object(HandRecorder, '_write', side_effect=write),
+                patch.object(HandRecorder, 'max_retry_interval', 0.01),
+                self.assertLogs('cardroom.recorders', 'ERROR'),
+        ):
+            HandRecorder.record(hand_history)
+            HandRecorder.record(hand_history)
+            HandRecorder.flush()
+
+            self.assertTrue(event.wait(5))
+
+        self.assertEqual(counts, [2, 2])
+
+    @override_settings(CARDROOM_HAND_RECORDING_STATUS=False)
+    def test_recording_status(self) -> None:
+        self.send_signal(pre_state_destruction, self.create_table())
+        self.send_signal(post_termination, self.create_table())
+
+        self.assertFalse(HandHistory.objects.exists())
@@ -0,0 +1,86 @@
+from textwrap import dedent
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+import pokerkit
+
+from cardroom.frame import Frame
+from cardroom.replays import Replay
+from cardroom.utilities import serialize
+
+
+class ReplayTestCase(SimpleTestCase):
+    hand_history = pokerkit.HandHistory.loads(
+        dedent(
+            '''\
+            variant = "NT"
+            ante_trimming_status = true
+            antes = [0, 0, 0]
+            blinds_or_straddles = [1, 2, 0]
+            min_bet = 2
+            starting_stacks = [200, 200, 200]
+            actions = [
+              "d dh p1 AcAd",
+              "d dh p2 KcKd",
+              "d dh p3 QcQd",
+              "p3 cc",
+              "p1 cc",
+              "p2 cc",
+              "d db 2h3h4s",
+              "p1 cc",
+              "p2 cc",
+              "p3 cc",
+              "d db 5s",
+              "p1 cc",
+              "p2 cc",
+              "p3 cc",
+              "d db 7s",
+              "p1 cc",
+              "p2 cc",
+              "p3 cc",
+            ]
+            players = ["Alice", "Bob", "Carol"]
+            '''
+        ),
+        automations=(pokerkit.Automation.CARD_BURNING,),
+    )
+
+    def test_get_frames(self) -> None:
+        frames = serialize(Frame.from_hand_history(self.hand_history))
+
+        for start, stop in (
+                (0, None),
+                (10, 13),
+                (3, 4),
+                (5, 1000),
+                (1000, None),
+                (7, 2),
+        ):
+            replay = Replay(self.hand_history, 4)
+
+            self.assertEqual(
+                replay.get_frames(start, stop),
+                frames[start:stop],
+            )
+            self.assertEqual(replay.get_frames(), frames)
+            self.assertEqual(replay.frame_count, len(frames))
+            self.assertEqual(
+                replay.get_frames(start, stop),
+                frames[start:stop],
+            )
+
+    def test_checkpoints(self) -> None:
+        frames = serialize(Frame.from_hand_history(self.hand_history))
+        replay = Replay(self.hand_history, 4)
+
+        self.assertEqual(replay.frame_count, len(frames))
+        self.assertEqual(len(replay._checkpoints), (len(frames) - 1) // 4 + 1)
+
+        with patch.object(
+                Replay,
+                'advance',
+                autospec=True,
+                side_effect=Replay.advance,
+        ) as mock:
+            self.assertEqual(replay.get_frames(9, 11), frames[9:11])
+            self.assertEqual(mock.call_count, 2)
@@ -0,0 +1,198 @@
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+
+from django.test import SimpleTestCase
+
+from cardroom.stores import (
+    CacheFrameStore,
+    FrameStore,
+    InMemoryFrameStore,
+    SharedMemoryFrameStore,
+)
+
+
+class FrameStoreTestCaseMixin:
+    def create_frame_store(self) -> FrameStore:
+        raise NotImplementedError
+
+    def test_frames(self) -> None:
+        assert isinstance(self, SimpleTestCase)
+
+        frame_store = self.create_frame_store()
+
+        self.assertRaises(KeyError, frame_store.get, 'a')
+        self.assertRaises(KeyError, frame_store.get_version, 'a')
+        self.assertRaises(KeyError, frame_store.get_data, 'a', '')
+
+        frame_store.set('a', 1, {'': b'{}', 'u0': b'{"u": 0}'}, [b'1'])
+        frame_store.set('b', 2, {'': b'[]'}, [b'1', b'2'])
+
+        self.assertEqual(
+            frame_store.get('a'),
+            (1, {'': b'{}', 'u0': b'{"u": 0}'}),
+        )
+        self.assertEqual(frame_store.get_version('a'), 1)
+        self.assertEqual(frame_store.get_data('a', 'u0'), (1, b'{"u": 0}'))
+        self.assertEqual(frame_store.get_data('a', 'u1'), (1, b'{}'))
+        self.assertEqual(frame_store.get_data('b', 'u0'), (2, b'[]'))
+
+        frame_store.set('a', 3, {'': b'"\xce\xb1"', 'α': b'0'}, [b'2', b'3'])
+
+        self.assertEqual(frame_store.get_version('a'), 3)
+        self.assertEqual(frame_store.get_data('a', 'α'), (3, b'0'))
+        self.assertEqual(frame_store.get_data('a', 'u0'), (3, b'"\xce\xb1"'))
+
+        frame_store.delete('a')
+        frame_store.delete('c')
+
+        self.assertRaises(KeyError, frame_store.get, 'a')
+        self.assertIsNone(frame_store.get_history('a', 0))
+        self.assertEqual(frame_store.get_version('b'), 2)
+
+    def test_increment(self) -> None:
+        assert isinstance(self, SimpleTestCase)
+
+        frame_store = self.create_frame_store()
+
+        self.assertEqual(frame_store.increment('a', 2), 2)
+
+        frame_store.set('b', 5, {'': b'5'}, [b'5'])
+
+        self.assertEqual(frame_store.increment('b', 1), 6)
+
+        with ThreadPoolExecutor(8) as executor:
+            versions = list(
+                executor.map(
+                    lambda _: frame_store.increment('a', 1),
+                    range(100),
+                ),
+            )
+
+        self.assertEqual(sorted(versions), list(range(3, 103)))
+
+        frame_store.delete('a')
+
+        self.assertEqual(frame_store.increment('a', 1), 1)
+
+    def test_history(self) -> None:
+        assert isinstance(self, SimpleTestCase)
+
+        frame_store = self.create_frame_store()
+
+        self.assertIsNone(frame_store.get_history('a', 0))
+
+        frame_store.set('a', 2, {'': b'2'}, [b'1', b'2'])
+
+        self.assertEqual(frame_store.get_history('a', 1), [b'2'])
+        self.assertEqual(frame_store.get_history('a', 2), [])
+        self.assertIsNone(frame_store.get_history('a', 3))
+
+        frame_store.set('a', 5, {'': b'5'}, [b'3', b'4', b'5'])
+
+        self.assertIsNone(frame_store.get_history('a', 1))
+        self.assertEqual(frame_store.get_history('a', 2), [b'3', b'4', b'5'])
+        self.assertEqual(frame_store.get_history('a', 4), [b'5'])
+
+        frame_store.set('a', 10, {'': b'10'}, [b'6', b'7', b'8', b'9', b'10'])
+
+        self.assertIsNone(frame_store.get_history('a', 6))
+        self.assertEqual(frame_store.get_history('a', 7), [b'8', b'9', b'10'])
+
+    def test_epoch(self) -> None:
+        assert isinstance(self, SimpleTestCase)
+
+        frame_store = self.create_frame_store()
+        epoch = frame_store.get_epoch()
+
+        self.assertTrue(epoch)
+        self.assertEqual(frame_store.get_epoch(), epoch)
+
+    def test_ordering(self) -> None:
+        assert isinstance(self, SimpleTestCase)
+
+        frame_store = self.create_frame_store()
+
+        frame_store.set('a', 2, {'': b'2'}, [b'2'])
+        frame_store.set('a', 1, {'': b'1'}, [b'1'])
+
+        self.assertEqual(frame_store.get_data('a', ''), (2, b'2'))
+
+
+class InMemoryFrameStoreTestCase(FrameStoreTestCaseMixin, SimpleTestCase):
+    def create_frame_store(self) -> FrameStore:
+        return InMemoryFrameStore(3)
+
+
+class SharedMemoryFrameStoreTestCase(FrameStoreTestCaseMixin, SimpleTestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def create_frame_store(self) -> FrameStore:
+        return SharedMemoryFrameStore(self.directory.name, 3)
+
+    def test_sharing(self) -> None:
+        frame_store0 = SharedMemoryFrameStore(self.directory.name)
+        frame_store1 = SharedMemoryFrameStore(self.directory.name)
+
+        self.assertEqual(frame_store0.get_epoch(), frame_store1.get_epoch())
+
+        frame_store0.set('a', 1, {'': b'{}'}, [b'1'])
+
+        self.assertEqual(frame_store1.get_data('a', ''), (1, b'{}'))
+
+        frame_store0.set('a', 2, {'': b'[]'}, [b'2'])
+
+        self.assertEqual(frame_store1.get_data('a', ''), (2, b'[]'))
+        self.assertEqual(frame_store1.get_history('a', 0), [b'1', b'2'])
+
+        frame_store0.delete('a')
+
+        self.assertRaises(KeyError, frame_store1.get, 'a')
+
+    def test_ownership(self) -> None:
+        frame_store0 = SharedMemoryFrameStore(self.directory.name)
+        frame_store1 = SharedMemoryFrameStore(self.directory.name)
+
+        self.assertTrue(frame_store0.acquire('a'))
+        self.assertTrue(frame_store0.acquire('a'))
+        self.assertFalse(frame_store1.acquire('a'))
+        self.assertTrue(frame_store1.acquire('b'))
+
+        frame_store0.release('a')
+
+        self.assertTrue(frame_store1.acquire('a'))
+
+
+class CacheFrameStoreTestCase(FrameStoreTestCaseMixin, SimpleTestCase):
+    def create_frame_store(self) -> FrameStore:
+        frame_store = CacheFrameStore(history_size=3)
+
+        frame_store.cache.clear()
+
+        return frame_store
+
+    def test_ownership(self) -> None:
+        frame_store0 = self.create_frame_store()
+        frame_store1 = CacheFrameStore(history_size=3)
+
+        self.assertTrue(frame_store0.acquire('a'))
+        self.assertTrue(frame_store0.acquire('a'))
+        self.assertFalse(frame_store1.acquire('a'))
+        self.assertTrue(frame_store1.acquire('b'))
+
+        frame_store0.release('a')
+
+        self.assertTrue(frame_store1.acquire('a'))
+
+    def test_sharing(self) -> None:
+        frame_store0 = self.create_frame_store()
+        frame_store1 = CacheFrameStore(history_size=3)
+
+        self.assertEqual(frame_store0.get_epoch(), frame_store1.get_epoch())
+
+        frame_store0.set('a', 1, {'': b'{}'}, [b'1'])
+
+        self.assertEqual(frame_store1.get_data('a', ''), (1, b'{}'))
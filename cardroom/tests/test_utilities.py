@@ -1,33 +1,67 @@
 from datetime import datetime
+from decimal import Decimal
 from math import inf
+from pickle import dumps, loads
 import builtins
+import gzip
 
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.test import SimpleTestCase
 from django.test.utils import override_settings
 from django.utils.module_loading import import_string
 
+from cardroom.caches import ReplayCache, ThumbnailCache, TokenCache
 from cardroom.felt import Style
+from cardroom.stores import SharedMemoryFrameStore
 from cardroom.utilities import (
     DEFAULT_ADMIN,
     DEFAULT_AUTH,
+    DEFAULT_COMPACT_STORAGE_STATUS,
     DEFAULT_DECIMAL_PLACES,
     DEFAULT_DIVMOD,
     DEFAULT_FELT,
+    DEFAULT_FIXED_POINT_STATUS,
+    DEFAULT_FRAME_STORE,
+    DEFAULT_HAND_RECORDER_FLUSH_INTERVAL,
+    DEFAULT_HAND_RECORDER_FLUSH_SIZE,
+    DEFAULT_HAND_RECORDING_STATUS,
+    DEFAULT_KEEPALIVE_TIMEOUT,
     DEFAULT_PARSE_VALUE,
+    DEFAULT_POLLING_TIMEOUT,
     DEFAULT_RAT_HOLING_STATUS,
+    DEFAULT_REPLAY_CACHE,
     DEFAULT_ROOT_ROUTINGCONF,
+    DEFAULT_STREAMING_LIFETIME,
     DEFAULT_STYLE,
+    DEFAULT_THUMBNAIL_CACHE,
+    DEFAULT_TOKEN_CACHE,
     get_admin,
     get_auth,
+    get_compact_storage_status,
     get_decimal_places,
     get_divmod,
     get_felt,
+    get_fixed_point_status,
+    get_frame_store,
+    get_hand_recorder_flush_interval,
+    get_hand_recorder_flush_size,
+    get_hand_recording_status,
+    get_keepalive_timeout,
     get_parse_value,
+    get_polling_timeout,
     get_rat_holing_status,
+    get_replay_cache,
     get_root_routingconf,
+    get_settings,
+    get_streaming_lifetime,
     get_style,
+    get_thumbnail_cache,
+    get_token_cache,
+    iter_gzip,
+    iter_json_array,
     serialize,
+    Settings,
 )
 
 
@@ -86,6 +120,46 @@ class UtilitiesTestCase(SimpleTestCase):
         self.assertEqual(get_parse_value()('1.25'), 1.25)
         self.assertEqual(get_parse_value()(str(8 / 3)), 8 / 3)
 
+    @override_settings(
+            CARDROOM_DECIMAL_PLACES=2,
+            CARDROOM_FIXED_POINT_STATUS=True,
+    )
+    def test_fixed_point(self) -> None:
+        del settings.CARDROOM_DIVMOD
+        del settings.CARDROOM_PARSE_VALUE
+
+        settings_ = get_settings()
+
+        self.assertEqual(get_parse_value()('0'), 0)
+        self.assertEqual(get_parse_value()('1.25'), 125)
+        self.assertEqual(get_parse_value()('0.1'), 10)
+        self.assertEqual(get_parse_value()('3'), 300)
+        self.assertRaises(ValueError, get_parse_value(), 'inf')
+        self.assertRaises(ValueError, get_parse_value(), 'one')
+        self.assertEqual(get_divmod()(1001, 3), (333, 2))
+        self.assertEqual(
+            settings_.scale({1: 0.1, 2: [0.2, 3]}),
+            {1: 10, 2: [20, 300]},
+        )
+        self.assertIsNone(settings_.scale(None))
+        self.assertEqual(
+            settings_.unscale((10, 125, 300, 0)),
+            (Decimal('0.1'), Decimal('1.25'), 3, 0),
+        )
+        self.assertIsInstance(settings_.unscale(300), int)
+        self.assertIsInstance(settings_.unscale(125), Decimal)
+        self.assertEqual(str(settings_.unscale(10)), '0.1')
+
+        total = 0
+
+        for _ in range(10):
+            total += settings_.scale(0.1)
+
+        self.assertEqual(settings_.unscale(total), 1)
+
+        with override_settings(CARDROOM_DECIMAL_PLACES=inf):
+            self.assertRaises(ImproperlyConfigured, get_settings)
+
     @override_settings(
             CARDROOM_DIVMOD='builtins.divmod',
             CARDROOM_PARSE_VALUE='builtins.int',
@@ -95,7 +169,19 @@ class UtilitiesTestCase(SimpleTestCase):
             CARDROOM_RAT_HOLING_STATUS=False,
             CARDROOM_FELT=False,
             CARDROOM_STYLE=Style(background_color=''),
-            ROOT_ROUTINGCONF=''
+            ROOT_ROUTINGCONF='',
+            CARDROOM_POLLING_TIMEOUT=5,
+            CARDROOM_KEEPALIVE_TIMEOUT=5,
+            CARDROOM_FRAME_STORE=SharedMemoryFrameStore(''),
+            CARDROOM_TOKEN_CACHE=TokenCache(ttl=0),
+            CARDROOM_HAND_RECORDING_STATUS=False,
+            CARDROOM_HAND_RECORDER_FLUSH_SIZE=10,
+            CARDROOM_HAND_RECORDER_FLUSH_INTERVAL=1,
+            CARDROOM_COMPACT_STORAGE_STATUS=True,
+            CARDROOM_REPLAY_CACHE=ReplayCache(size=1),
+            CARDROOM_FIXED_POINT_STATUS=True,
+            CARDROOM_THUMBNAIL_CACHE=ThumbnailCache(interval=1),
+            CARDROOM_STREAMING_LIFETIME=60
     )
     def test_non_defaults_1(self) -> None:
         self.assertEqual(get_divmod(), builtins.divmod)
@@ -107,6 +193,18 @@ class UtilitiesTestCase(SimpleTestCase):
         self.assertFalse(get_felt())
         self.assertEqual(get_style(), Style(background_color=''))
         self.assertEqual(get_root_routingconf(), '')
+        self.assertEqual(get_polling_timeout(), 5)
+        self.assertEqual(get_keepalive_timeout(), 5)
+        self.assertEqual(get_streaming_lifetime(), 60)
+        self.assertEqual(get_frame_store(), SharedMemoryFrameStore(''))
+        self.assertEqual(get_token_cache(), TokenCache(ttl=0))
+        self.assertEqual(get_replay_cache(), ReplayCache(size=1))
+        self.assertEqual(get_thumbnail_cache(), ThumbnailCache(interval=1))
+        self.assertFalse(get_hand_recording_status())
+        self.assertEqual(get_hand_recorder_flush_size(), 10)
+        self.assertEqual(get_hand_recorder_flush_interval(), 1)
+        self.assertTrue(get_compact_storage_status())
+        self.assertTrue(get_fixed_point_status())
 
         self.assertNotEqual(get_divmod(), import_string(DEFAULT_DIVMOD))
         self.assertNotEqual(
@@ -120,6 +218,36 @@ class UtilitiesTestCase(SimpleTestCase):
         self.assertNotEqual(get_felt(), DEFAULT_FELT)
         self.assertNotEqual(get_style(), DEFAULT_STYLE)
         self.assertNotEqual(get_root_routingconf(), DEFAULT_ROOT_ROUTINGCONF)
+        self.assertNotEqual(get_polling_timeout(), DEFAULT_POLLING_TIMEOUT)
+        self.assertNotEqual(get_keepalive_timeout(), DEFAULT_KEEPALIVE_TIMEOUT)
+        self.assertNotEqual(
+            get_streaming_lifetime(),
+            DEFAULT_STREAMING_LIFETIME,
+        )
+        self.assertNotEqual(get_frame_store(), DEFAULT_FRAME_STORE)
+        self.assertNotEqual(get_token_cache(), DEFAULT_TOKEN_CACHE)
+        self.assertNotEqual(get_replay_cache(), DEFAULT_REPLAY_CACHE)
+        self.assertNotEqual(get_thumbnail_cache(), DEFAULT_THUMBNAIL_CACHE)
+        self.assertNotEqual(
+            get_hand_recording_status(),
+            DEFAULT_HAND_RECORDING_STATUS,
+        )
+        self.assertNotEqual(
+            get_hand_recorder_flush_size(),
+            DEFAULT_HAND_RECORDER_FLUSH_SIZE,
+        )
+        self.assertNotEqual(
+            get_hand_recorder_flush_interval(),
+            DEFAULT_HAND_RECORDER_FLUSH_INTERVAL,
+        )
+        self.assertNotEqual(
+            get_compact_storage_status(),
+            DEFAULT_COMPACT_STORAGE_STATUS,
+        )
+        self.assertNotEqual(
+            get_fixed_point_status(),
+            DEFAULT_FIXED_POINT_STATUS,
+        )
 
         del settings.CARDROOM_DIVMOD
         del settings.CARDROOM_PARSE_VALUE
@@ -130,6 +258,18 @@ class UtilitiesTestCase(SimpleTestCase):
         del settings.CARDROOM_FELT
         del settings.CARDROOM_STYLE
         del settings.ROOT_ROUTINGCONF
+        del settings.CARDROOM_POLLING_TIMEOUT
+        del settings.CARDROOM_KEEPALIVE_TIMEOUT
+        del settings.CARDROOM_FRAME_STORE
+        del settings.CARDROOM_TOKEN_CACHE
+        del settings.CARDROOM_HAND_RECORDING_STATUS
+        del settings.CARDROOM_HAND_RECORDER_FLUSH_SIZE
+        del settings.CARDROOM_HAND_RECORDER_FLUSH_INTERVAL
+        del settings.CARDROOM_COMPACT_STORAGE_STATUS
+        del settings.CARDROOM_REPLAY_CACHE
+        del settings.CARDROOM_FIXED_POINT_STATUS
+        del settings.CARDROOM_THUMBNAIL_CACHE
+        del settings.CARDROOM_STREAMING_LIFETIME
 
         self.assertEqual(get_divmod(), import_string(DEFAULT_DIVMOD))
         self.assertEqual(get_parse_value(), import_string(DEFAULT_PARSE_VALUE))
@@ -140,6 +280,33 @@ class UtilitiesTestCase(SimpleTestCase):
         self.assertEqual(get_felt(), DEFAULT_FELT)
         self.assertEqual(get_style(), DEFAULT_STYLE)
         self.assertEqual(get_root_routingconf(), DEFAULT_ROOT_ROUTINGCONF)
+        self.assertEqual(get_polling_timeout(), DEFAULT_POLLING_TIMEOUT)
+        self.assertEqual(get_keepalive_timeout(), DEFAULT_KEEPALIVE_TIMEOUT)
+        self.assertEqual(get_streaming_lifetime(), DEFAULT_STREAMING_LIFETIME)
+        self.assertEqual(get_frame_store(), DEFAULT_FRAME_STORE)
+        self.assertEqual(get_token_cache(), DEFAULT_TOKEN_CACHE)
+        self.assertEqual(get_replay_cache(), DEFAULT_REPLAY_CACHE)
+        self.assertEqual(get_thumbnail_cache(), DEFAULT_THUMBNAIL_CACHE)
+        self.assertEqual(
+            get_hand_recording_status(),
+            DEFAULT_HAND_RECORDING_STATUS,
+        )
+        self.assertEqual(
+            get_hand_recorder_flush_size(),
+            DEFAULT_HAND_RECORDER_FLUSH_SIZE,
+        )
+        self.assertEqual(
+            get_hand_recorder_flush_interval(),
+            DEFAULT_HAND_RECORDER_FLUSH_INTERVAL,
+        )
+        self.assertEqual(
+            get_compact_storage_status(),
+            DEFAULT_COMPACT_STORAGE_STATUS,
+        )
+        self.assertEqual(
+            get_fixed_point_status(),
+            DEFAULT_FIXED_POINT_STATUS,
+        )
 
     @override_settings()
     def test_defaults(self) -> None:
@@ -152,6 +319,33 @@ class UtilitiesTestCase(SimpleTestCase):
         self.assertEqual(get_felt(), DEFAULT_FELT)
         self.assertEqual(get_style(), DEFAULT_STYLE)
         self.assertEqual(get_root_routingconf(), DEFAULT_ROOT_ROUTINGCONF)
+        self.assertEqual(get_polling_timeout(), DEFAULT_POLLING_TIMEOUT)
+        self.assertEqual(get_keepalive_timeout(), DEFAULT_KEEPALIVE_TIMEOUT)
+        self.assertEqual(get_streaming_lifetime(), DEFAULT_STREAMING_LIFETIME)
+        self.assertEqual(get_frame_store(), DEFAULT_FRAME_STORE)
+        self.assertEqual(get_token_cache(), DEFAULT_TOKEN_CACHE)
+        self.assertEqual(get_replay_cache(), DEFAULT_REPLAY_CACHE)
+        self.assertEqual(get_thumbnail_cache(), DEFAULT_THUMBNAIL_CACHE)
+        self.assertEqual(
+            get_hand_recording_status(),
+            DEFAULT_HAND_RECORDING_STATUS,
+        )
+        self.assertEqual(
+            get_hand_recorder_flush_size(),
+            DEFAULT_HAND_RECORDER_FLUSH_SIZE,
+        )
+        self.assertEqual(
+            get_hand_recorder_flush_interval(),
+            DEFAULT_HAND_RECORDER_FLUSH_INTERVAL,
+        )
+        self.assertEqual(
+            get_compact_storage_status(),
+            DEFAULT_COMPACT_STORAGE_STATUS,
+        )
+        self.assertEqual(
+            get_fixed_point_status(),
+            DEFAULT_FIXED_POINT_STATUS,
+        )
 
         del settings.CARDROOM_DIVMOD
         del settings.CARDROOM_PARSE_VALUE
@@ -162,6 +356,18 @@ class UtilitiesTestCase(SimpleTestCase):
         del settings.CARDROOM_FELT
         del settings.CARDROOM_STYLE
         del settings.ROOT_ROUTINGCONF
+        del settings.CARDROOM_POLLING_TIMEOUT
+        del settings.CARDROOM_KEEPALIVE_TIMEOUT
+        del settings.CARDROOM_FRAME_STORE
+        del settings.CARDROOM_TOKEN_CACHE
+        del settings.CARDROOM_HAND_RECORDING_STATUS
+        del settings.CARDROOM_HAND_RECORDER_FLUSH_SIZE
+        del settings.CARDROOM_HAND_RECORDER_FLUSH_INTERVAL
+        del settings.CARDROOM_COMPACT_STORAGE_STATUS
+        del settings.CARDROOM_REPLAY_CACHE
+        del settings.CARDROOM_FIXED_POINT_STATUS
+        del settings.CARDROOM_THUMBNAIL_CACHE
+        del settings.CARDROOM_STREAMING_LIFETIME
 
         self.assertEqual(get_divmod(), import_string(DEFAULT_DIVMOD))
         self.assertEqual(get_parse_value(), import_string(DEFAULT_PARSE_VALUE))
@@ -172,6 +378,52 @@ class UtilitiesTestCase(SimpleTestCase):
         self.assertEqual(get_felt(), DEFAULT_FELT)
         self.assertEqual(get_style(), DEFAULT_STYLE)
         self.assertEqual(get_root_routingconf(), DEFAULT_ROOT_ROUTINGCONF)
+        self.assertEqual(get_polling_timeout(), DEFAULT_POLLING_TIMEOUT)
+        self.assertEqual(get_keepalive_timeout(), DEFAULT_KEEPALIVE_TIMEOUT)
+        self.assertEqual(get_streaming_lifetime(), DEFAULT_STREAMING_LIFETIME)
+        self.assertEqual(get_frame_store(), DEFAULT_FRAME_STORE)
+        self.assertEqual(get_token_cache(), DEFAULT_TOKEN_CACHE)
+        self.assertEqual(get_replay_cache(), DEFAULT_REPLAY_CACHE)
+        self.assertEqual(get_thumbnail_cache(), DEFAULT_THUMBNAIL_CACHE)
+        self.assertEqual(
+            get_hand_recording_status(),
+            DEFAULT_HAND_RECORDING_STATUS,
+        )
+        self.assertEqual(
+            get_hand_recorder_flush_size(),
+            DEFAULT_HAND_RECORDER_FLUSH_SIZE,
+        )
+        self.assertEqual(
+            get_hand_recorder_flush_interval(),
+            DEFAULT_HAND_RECORDER_FLUSH_INTERVAL,
+        )
+        self.assertEqual(
+            get_compact_storage_status(),
+            DEFAULT_COMPACT_STORAGE_STATUS,
+        )
+        self.assertEqual(
+            get_fixed_point_status(),
+            DEFAULT_FIXED_POINT_STATUS,
+        )
+
+    def test_settings(self) -> None:
+        settings_ = get_settings()
+
+        self.assertIs(get_settings(), settings_)
+        self.assertEqual(settings_, Settings.from_settings())
+        self.assertIs(loads(dumps(settings_)), settings_)
+
+        with override_settings(
+                CARDROOM_DECIMAL_PLACES=2,
+                CARDROOM_RAT_HOLING_STATUS=False,
+        ):
+            self.assertEqual(get_settings().decimal_places, 2)
+            self.assertFalse(get_settings().rat_holing_status)
+            self.assertEqual(get_divmod()(3, 2), (1.5, 0))
+
+        self.assertEqual(get_settings(), settings_)
+        self.assertIsNot(get_settings(), settings_)
+        self.assertEqual(get_divmod()(3, 2), (1, 1))
 
     def test_serialize(self) -> None:
         dt = datetime.now()
@@ -180,3 +432,23 @@ class UtilitiesTestCase(SimpleTestCase):
             serialize({3: [1, {1}, dt], dt: False}),
             {3: [1, [1], dt.isoformat()], dt.isoformat(): False},
         )
+        self.assertEqual(serialize([Decimal('0.1'), 2]), [0.1, 2])
+        self.assertEqual(
+            serialize({3: [1, {1}, dt], dt: Decimal('0.1')}),
+            {3: [1, [1], dt.isoformat()], dt.isoformat(): 0.1},
+        )
+
+    def test_iter_json_array(self) -> None:
+        self.assertEqual(b''.join(iter_json_array([])), b'[]')
+        self.assertEqual(
+            list(iter_json_array([1, {'a': None}])),
+            [b'[1', b',{"a": null}', b']'],
+        )
+
+    def test_iter_gzip(self) -> None:
+        chunks = [b'a' * 1000, b'', b'b' * 1000]
+
+        self.assertEqual(
+            gzip.decompress(b''.join(iter_gzip(chunks))),
+            b''.join(chunks),
+        )
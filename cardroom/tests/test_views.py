@@ -0,0 +1,615 @@
+from asyncio import ensure_future, sleep, wait_for
+from collections.abc import AsyncIterator
+from io import StringIO
+import gzip
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
+import pokerkit
+
+from cardroom.caches import ReplayCache
+from cardroom.frame import Frame
+from cardroom.gamemaster import Gamemaster
+from cardroom.lobbies import Lobby
+from cardroom.management.commands.loadhandhistories import iter_sections
+from cardroom.models import CashGame, HandHistory
+from cardroom.utilities import get_etag, get_settings, serialize
+
+
+class HandHistoryViewSetTestCase(TestCase):
+    def setUp(self) -> None:
+        for i, (variant, players) in enumerate(
+                (
+                    ('NT', ['Alice', 'Bob']),
+                    ('NT', ['Bob', 'Carol']),
+                    ('FT', ['Carol', 'Alice']),
+                    ('NT', ['Alicia', 'Ted']),
+                ),
+        ):
+            HandHistory.objects.create(
+                variant=variant,
+                antes=[0, 0],
+                starting_stacks=[200, 200],
+                actions=[],
+                players=players,
+                event='WSOP' if i % 2 else None,
+                year=2024,
+                month=1,
+                day=i + 1,
+                table=i,
+            )
+
+    def get_ids(self, query: str) -> list[int]:
+        response = self.client.get(f'/hand-histories/?{query}')
+
+        self.assertEqual(response.status_code, 200)
+
+        return [result['id'] for result in response.json()['results']]
+
+    def test_pagination(self) -> None:
+        ids = list(
+            HandHistory.objects.order_by('-id').values_list('id', flat=True),
+        )
+        response = self.client.get('/hand-histories/?page_size=3')
+        data = response.json()
+
+        self.assertNotIn('count', data)
+        self.assertEqual([result['id'] for result in data['results']], ids[:3])
+
+        data = self.client.get(data['next']).json()
+
+        self.assertEqual([result['id'] for result in data['results']], ids[3:])
+        self.assertIsNone(data['next'])
+
+    def test_filters(self) -> None:
+        def get_pks(**kwargs: object) -> list[int]:
+            return list(
+                HandHistory.objects.filter(
+                    **kwargs,
+                ).order_by('-id').values_list('id', flat=True),
+            )
+
+        self.assertEqual(self.get_ids('variant=NT'), get_pks(variant='NT'))
+        self.assertEqual(self.get_ids('event=WSOP'), get_pks(event='WSOP'))
+        self.assertEqual(
+            self.get_ids('year=2024&month=1&day=2'),
+            get_pks(day=2),
+        )
+        self.assertEqual(self.get_ids('table=3'), get_pks(table=3))
+        self.assertEqual(
+            self.get_ids('player=Alice'),
+            get_pks(table__in=(0, 2)),
+        )
+        self.assertEqual(
+            self.get_ids('player=Alice&variant=NT'),
+            get_pks(table=0),
+        )
+        self.assertEqual(
+            self.client.get('/hand-histories/?year=x').status_code,
+            400,
+        )
+
+    def test_fields(self) -> None:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/hand-histories/?fields=id,variant')
+
+        self.assertEqual(
+            [set(result) for result in response.json()['results']],
+            [{'id', 'variant'}] * 4,
+        )
+        self.assertNotIn('actions', context.captured_queries[-1]['sql'])
+        self.assertEqual(
+            self.client.get('/hand-histories/?fields=id,x').status_code,
+            400,
+        )
+
+    def test_create(self) -> None:
+        self.client.force_login(
+            User.objects.create_superuser('admin', password='password'),
+        )
+
+        response = self.client.post(
+            '/hand-histories/',
+            {'variant': 'NT', 'antes': None},
+            'application/json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(response.json()),
+            {'antes', 'starting_stacks', 'actions'},
+        )
+
+    def test_duplicates(self) -> None:
+        self.client.force_login(
+            User.objects.create_superuser('admin', password='password'),
+        )
+
+        data = {
+            'variant': 'NT',
+            'antes': [0, 0],
+            'blinds_or_straddles': [1, 2],
+            'min_bet': 2,
+            'starting_stacks': [200, 200],
+            'actions': ['d dh p1 AcAd', 'd dh p2 KcKd', 'p2 f'],
+        }
+        response = self.client.post(
+            '/hand-histories/',
+            data,
+            'application/json',
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post(
+            '/hand-histories/',
+            data,
+            'application/json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.json())
+
+        hh = HandHistory.objects.earliest('id')
+        response = self.client.patch(
+            f'/hand-histories/{hh.pk}/',
+            data | dict.fromkeys(
+                ('players', 'event', 'year', 'month', 'day', 'table'),
+            ),
+            'application/json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_update(self) -> None:
+        self.client.force_login(
+            User.objects.create_superuser('admin', password='password'),
+        )
+        call_command('compacthandhistories', stdout=StringIO())
+
+        hh = HandHistory.objects.earliest('id')
+        response = self.client.patch(
+            f'/hand-histories/{hh.pk}/',
+            {'event': 'WSOPE'},
+            'application/json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['actions'], [])
+
+        hh.refresh_from_db()
+
+        self.assertEqual(hh.event, 'WSOPE')
+        self.assertIsNotNone(hh.compressed_data)
+
+        response = self.client.patch(
+            f'/hand-histories/{hh.pk}/',
+            {'actions': ['d dh p1 AcAd', 'd dh p2 KcKd']},
+            'application/json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        hh.refresh_from_db()
+
+        self.assertIsNone(hh.compressed_data)
+        self.assertEqual(hh.actions, ['d dh p1 AcAd', 'd dh p2 KcKd'])
+        self.assertEqual(hh.antes, [0, 0])
+
+    def test_compact_storage(self) -> None:
+        response = self.client.get('/hand-histories/')
+
+        call_command('compacthandhistories', stdout=StringIO())
+
+        self.assertFalse(
+            HandHistory.objects.filter(compressed_data__isnull=True).exists(),
+        )
+        self.assertEqual(
+            self.client.get('/hand-histories/').json(),
+            response.json(),
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/hand-histories/?fields=id,actions')
+
+        self.assertEqual(
+            response.json()['results'],
+            [
+                {'id': id_, 'actions': []}
+                for id_ in HandHistory.objects.order_by('-id').values_list(
+                    'id',
+                    flat=True,
+                )
+            ],
+        )
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_export(self) -> None:
+        response = self.client.get('/hand-histories/export/?variant=NT')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+
+        content = response.getvalue().decode()
+        sections = list(iter_sections(content.splitlines(True)))
+
+        self.assertEqual(
+            [int(name) for name, _ in sections],
+            list(
+                HandHistory.objects.filter(
+                    variant='NT',
+                ).order_by('pk').values_list('pk', flat=True),
+            ),
+        )
+        self.assertEqual(
+            [pokerkit.HandHistory.loads(text).players for _, text in sections],
+            [['Alice', 'Bob'], ['Bob', 'Carol'], ['Alicia', 'Ted']],
+        )
+
+        response = self.client.get(
+            '/hand-histories/export/?variant=NT&compression=gz',
+        )
+
+        self.assertEqual(
+            gzip.decompress(response.getvalue()).decode(),
+            content,
+        )
+        self.assertEqual(
+            self.client.get(
+                '/hand-histories/export/?compression=zip',
+            ).status_code,
+            400,
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.client.get(
+                    '/hand-histories/export/?variant=NT&fields=id',
+                ).getvalue().decode(),
+                content,
+            )
+
+    def create_hand_history(self) -> HandHistory:
+        hh = HandHistory.dump(
+            pokerkit.HandHistory.loads(
+                '''variant = "NT"
+ante_trimming_status = true
+antes = [0, 0]
+blinds_or_straddles = [1, 2]
+min_bet = 2
+starting_stacks = [200, 200]
+actions = ["d dh p1 AcAd", "d dh p2 KcKd", "p2 f"]
+''',
+            ),
+        )
+
+        hh.save()
+
+        return hh
+
+    @override_settings(CARDROOM_REPLAY_CACHE=ReplayCache())
+    def test_frame_range(self) -> None:
+        hh = self.create_hand_history()
+        url = f'/hand-histories/{hh.pk}/frames/'
+        response = self.client.get(f'{url}?start=0&stop=2')
+
+        self.assertEqual(len(json.loads(response.getvalue())), 2)
+        self.assertNotIn('X-Frame-Count', response)
+
+        response = self.client.get(url)
+        frames = json.loads(response.getvalue())
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            frames,
+            serialize(Frame.from_hand_history(hh.load())),
+        )
+        self.assertNotIn('X-Frame-Count', response)
+
+        response = self.client.get(f'{url}?start=1&stop=3')
+
+        self.assertEqual(json.loads(response.getvalue()), frames[1:3])
+        self.assertEqual(response['X-Frame-Count'], str(len(frames)))
+        self.assertEqual(
+            json.loads(self.client.get(f'{url}?start=2').getvalue()),
+            frames[2:],
+        )
+        self.assertEqual(
+            json.loads(self.client.get(f'{url}?start=9').getvalue()),
+            [],
+        )
+        self.assertEqual(self.client.get(f'{url}?start=a').status_code, 400)
+        self.assertEqual(self.client.get(f'{url}?stop=-1').status_code, 400)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            json.loads(gzip.decompress(response.getvalue())),
+            frames,
+        )
+
+    async def test_frame_streaming(self) -> None:
+        hh = await sync_to_async(self.create_hand_history)()
+        frames = serialize(Frame.from_hand_history(hh.load()))
+        response = await self.async_client.get(
+            f'/hand-histories/{hh.pk}/frames/',
+        )
+
+        assert isinstance(response, StreamingHttpResponse)
+        assert isinstance(response.streaming_content, AsyncIterator)
+
+        chunks = [chunk async for chunk in response.streaming_content]
+
+        self.assertEqual(len(chunks), len(frames) + 1)
+        self.assertEqual(json.loads(b''.join(chunks)), frames)
+
+    @override_settings(CARDROOM_REPLAY_CACHE=ReplayCache())
+    def test_frame_streaming_latency(self) -> None:
+        hh = self.create_hand_history()
+        response = self.client.get(f'/hand-histories/{hh.pk}/frames/?stop=2')
+
+        assert hh.digest is not None
+
+        replay = get_settings().replay_cache.get(hh.pk, hh.digest)
+
+        self.assertFalse(replay._frames)
+
+        frames = json.loads(response.getvalue())
+
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(len(replay._frames), 2)
+        self.assertIsNone(replay.known_frame_count)
+
+    def test_felt(self) -> None:
+        actions = ['d dh p1 AcAd', 'd dh p2 KcKd']
+
+        for i in range(50):
+            actions.append(f'p{2 - i % 2} cbr {4 + 2 * i}')
+
+        actions.append('p2 f')
+
+        hh = HandHistory.dump(
+            pokerkit.HandHistory(
+                variant='NT',
+                ante_trimming_status=True,
+                antes=[0, 0],
+                blinds_or_straddles=[1, 2],
+                min_bet=2,
+                starting_stacks=[500, 500],
+                actions=actions,
+            ),
+        )
+
+        hh.save()
+
+        response = self.client.get(f'/hand-histories/{hh.pk}/felt/')
+        frames = json.loads(
+            self.client.get(f'/hand-histories/{hh.pk}/frames/').getvalue(),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(frames), 32)
+        self.assertEqual(response.context['frames'], frames[:32])
+        self.assertIsNone(response.context['frame_count'])
+
+
+class CashGameFrameViewTestCase(TestCase):
+    def setUp(self) -> None:
+        self.group_name = CashGame.get_group_name(1)
+
+        get_settings().frame_store.delete(self.group_name)
+
+    def tearDown(self) -> None:
+        get_settings().frame_store.delete(self.group_name)
+
+    def test_etag(self) -> None:
+        self.assertEqual(
+            self.client.get('/cash-games/1/frame/').status_code,
+            404,
+        )
+
+        get_settings().frame_store.set(self.group_name, 1, {'': b'{}'}, [])
+
+        response = self.client.get('/cash-games/1/frame/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['ETag'],
+            f'"{get_settings().frame_store.get_epoch()}-1"',
+        )
+        self.assertEqual(
+            self.client.get(
+                '/cash-games/1/frame/',
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            ).status_code,
+            304,
+        )
+        self.assertEqual(
+            self.client.get(
+                '/cash-games/1/frame/',
+                HTTP_IF_NONE_MATCH='"1"',
+            ).status_code,
+            200,
+        )
+
+    async def test_poll(self) -> None:
+        get_settings().frame_store.set(self.group_name, 2, {'': b'[2]'}, [])
+
+        response = await self.async_client.get(
+            '/cash-games/1/frame/poll/?cursor=x',
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.get(
+            '/cash-games/1/frame/poll/?cursor=1',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'[2]')
+        self.assertEqual(response['X-Frame-Version'], '2')
+
+        with self.settings(CARDROOM_POLLING_TIMEOUT=0.1):
+            response = await self.async_client.get(
+                '/cash-games/1/frame/poll/?cursor=2',
+            )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['X-Frame-Version'], '2')
+
+        task = ensure_future(
+            self.async_client.get('/cash-games/1/frame/poll/?cursor=2'),
+        )
+
+        await sleep(0.1)
+
+        self.assertFalse(task.done())
+
+        await sync_to_async(Gamemaster.send)(
+            self.group_name,
+            {'type': 'update', 'frames': [{'': [3]}], 'version': 3},
+        )
+
+        response = await wait_for(task, 1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'[3]')
+        self.assertEqual(response['X-Frame-Version'], '3')
+
+    async def test_events(self) -> None:
+        get_settings().frame_store.set(self.group_name, 1, {'': b'{}'}, [])
+
+        with self.settings(
+                CARDROOM_KEEPALIVE_TIMEOUT=0.1,
+                CARDROOM_STREAMING_LIFETIME=0.5,
+        ):
+            response = await self.async_client.get(
+                '/cash-games/1/frame/events/',
+            )
+
+            assert isinstance(response, StreamingHttpResponse)
+            assert isinstance(response.streaming_content, AsyncIterator)
+
+            chunks: list[bytes] = []
+
+            async for chunk in response.streaming_content:
+                if not chunks:
+                    await sync_to_async(Gamemaster.send)(
+                        self.group_name,
+                        {'type': 'update', 'frames': [{'': {}}], 'version': 2},
+                    )
+
+                chunks.append(chunk)
+
+        self.assertEqual(
+            chunks[:2],
+            [b'id: 1\ndata: {}\n\n', b'id: 2\ndata: {}\n\n'],
+        )
+        self.assertIn(b': keepalive\n\n', chunks[2:])
+
+
+class CashGameThumbnailViewTestCase(TestCase):
+    def setUp(self) -> None:
+        hh = pokerkit.HandHistory(
+            variant='NT',
+            ante_trimming_status=True,
+            antes=[0, 0],
+            blinds_or_straddles=[1, 2],
+            min_bet=2,
+            starting_stacks=[200, 200],
+            actions=['d dh p1 AcAd', 'd dh p2 KcKd', 'p2 cbr 6'],
+            players=['Alice', '<Bob>'],
+        )
+        self.frames = [
+            json.dumps(serialize(frame)).encode()
+            for frame in Frame.from_hand_history(hh)
+        ]
+        self.group_name = CashGame.get_group_name(1)
+
+        get_settings().frame_store.delete(self.group_name)
+        get_settings().thumbnail_cache.clear()
+
+    def tearDown(self) -> None:
+        get_settings().frame_store.delete(self.group_name)
+        get_settings().thumbnail_cache.clear()
+
+    def set_frame(self, version: int) -> None:
+        get_settings().frame_store.set(
+            self.group_name,
+            version,
+            {'': self.frames[version]},
+            [self.frames[version]],
+        )
+
+    def test_get(self) -> None:
+        self.assertEqual(
+            self.client.get('/cash-games/1/thumbnail/').status_code,
+            404,
+        )
+
+        self.set_frame(len(self.frames) - 1)
+
+        response = self.client.get('/cash-games/1/thumbnail/')
+        content = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertEqual(response['ETag'], get_etag(len(self.frames) - 1))
+        self.assertIn('max-age=5', response['Cache-Control'])
+        self.assertTrue(content.startswith('<svg '))
+        self.assertIn('Alice', content)
+        self.assertIn('&lt;Bob&gt;', content)
+        self.assertIn('A♣', content)
+        self.assertEqual(
+            self.client.get(
+                '/cash-games/1/thumbnail/',
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            ).status_code,
+            304,
+        )
+
+        self.set_frame(0)
+
+        self.assertEqual(
+            self.client.get('/cash-games/1/thumbnail/').content.decode(),
+            content,
+        )
+        self.assertEqual(get_settings().thumbnail_cache.hit_count, 2)
+        self.assertEqual(get_settings().thumbnail_cache.miss_count, 1)
+
+
+class LobbyViewTestCase(TestCase):
+    def test_get(self) -> None:
+        Lobby.register('test', {'id': 0})
+
+        response = self.client.get('/lobby/')
+        version, data = Lobby.get_data()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, data)
+        self.assertEqual(response.json()['tables']['test']['id'], 0)
+        self.assertEqual(response['ETag'], get_etag(version))
+        self.assertEqual(
+            self.client.get(
+                '/lobby/',
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            ).status_code,
+            304,
+        )
+
+        Lobby.unregister('test')
+
+        self.assertEqual(
+            self.client.get(
+                '/lobby/',
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            ).status_code,
+            200,
+        )
@@ -7,11 +7,15 @@ from cardroom.apps import CardroomConfig
 from cardroom.utilities import get_admin, get_auth, get_felt
 from cardroom.views import (
     CashGameFeltView,
+    CashGameFrameEventsView,
+    CashGameFramePollView,
     CashGameFrameView,
+    CashGameThumbnailView,
     CashGameViewSet,
     HandHistoryFeltView,
     HandHistoryFramesView,
     HandHistoryViewSet,
+    LobbyView,
     PokerViewSet,
 )
 
@@ -24,11 +28,27 @@ router.register('games', PokerViewSet)
 
 urlpatterns: list[URLPattern | URLResolver] = [
     path('', include(router.urls)),
+    path('lobby/', LobbyView.as_view(), name='lobby'),
     path(
         'cash-games/<int:pk>/frame/',
         CashGameFrameView.as_view(),
         name='cashgame_frame',
     ),
+    path(
+        'cash-games/<int:pk>/frame/poll/',
+        CashGameFramePollView.as_view(),
+        name='cashgame_frame_poll',
+    ),
+    path(
+        'cash-games/<int:pk>/frame/events/',
+        CashGameFrameEventsView.as_view(),
+        name='cashgame_frame_events',
+    ),
+    path(
+        'cash-games/<int:pk>/thumbnail/',
+        CashGameThumbnailView.as_view(),
+        name='cashgame_thumbnail',
+    ),
     path(
         'hand-histories/<int:pk>/frames/',
         HandHistoryFramesView.as_view(),
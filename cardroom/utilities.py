@@ -1,34 +1,71 @@
-from collections.abc import Callable, Iterable, Mapping
-from dataclasses import asdict, is_dataclass
+from __future__ import annotations
+
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+from dataclasses import asdict, dataclass, is_dataclass, replace
 from datetime import datetime
+from decimal import Decimal
+from functools import partial
 from math import floor
 from typing import Any, cast
 from zoneinfo import ZoneInfo
 import builtins
+import json
 import math
+import zlib
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpRequest
 from django.utils.module_loading import import_string
 import pokerkit
 
+from cardroom.caches import ReplayCache, ThumbnailCache, TokenCache
 from cardroom.felt import Style
+from cardroom.stores import FrameStore, InMemoryFrameStore
 
 DEFAULT_DIVMOD: str = 'cardroom.utilities.divmod'
 DEFAULT_PARSE_VALUE: str = 'cardroom.utilities.parse_value'
 DEFAULT_DECIMAL_PLACES: int = 0
+DEFAULT_FIXED_POINT_STATUS: bool = False
 DEFAULT_AUTH: bool = True
 DEFAULT_ADMIN: bool = True
 DEFAULT_RAT_HOLING_STATUS: bool = True
 DEFAULT_FELT: bool = True
 DEFAULT_STYLE: Style = Style()
 DEFAULT_ROOT_ROUTINGCONF: str = 'cardroom.routings'
+DEFAULT_POLLING_TIMEOUT: float = 30
+DEFAULT_KEEPALIVE_TIMEOUT: float = 15
+DEFAULT_STREAMING_LIFETIME: float = 300
+DEFAULT_FRAME_STORE: FrameStore = InMemoryFrameStore()
+DEFAULT_TOKEN_CACHE: TokenCache = TokenCache()
+DEFAULT_HAND_RECORDING_STATUS: bool = True
+DEFAULT_HAND_RECORDER_FLUSH_SIZE: int = 100
+DEFAULT_HAND_RECORDER_FLUSH_INTERVAL: float = 5
+DEFAULT_COMPACT_STORAGE_STATUS: bool = False
+DEFAULT_REPLAY_CACHE: ReplayCache = ReplayCache()
+DEFAULT_THUMBNAIL_CACHE: ThumbnailCache = ThumbnailCache()
 
 
 def divmod(dividend: int, divisor: int) -> tuple[int, int]:
     quotient: float
     remainder: float
+    settings_ = get_settings()
 
-    match get_decimal_places():
+    if settings_.fixed_point_status:
+        return builtins.divmod(dividend, divisor)
+
+    match settings_.decimal_places:
         case 0:
             quotient, remainder = builtins.divmod(dividend, divisor)
         case math.inf:
@@ -46,9 +83,17 @@ def divmod(dividend: int, divisor: int) -> tuple[int, int]:
 
 
 def parse_value(raw_value: str) -> int:
+    settings_ = get_settings()
+
+    if settings_.fixed_point_status:
+        try:
+            return round(Decimal(raw_value).scaleb(settings_.decimal_places))
+        except ArithmeticError:
+            raise ValueError(f'The value {repr(raw_value)} is not an amount.')
+
     value = pokerkit.parse_value(raw_value)
 
-    match get_decimal_places():
+    match settings_.decimal_places:
         case 0:
             value = round(value)
         case math.inf:
@@ -85,6 +130,14 @@ def get_decimal_places() -> int:
     return getattr(settings, 'CARDROOM_DECIMAL_PLACES', DEFAULT_DECIMAL_PLACES)
 
 
+def get_fixed_point_status() -> bool:
+    return getattr(
+        settings,
+        'CARDROOM_FIXED_POINT_STATUS',
+        DEFAULT_FIXED_POINT_STATUS,
+    )
+
+
 def get_auth() -> bool:
     return getattr(settings, 'CARDROOM_AUTH', DEFAULT_AUTH)
 
@@ -113,9 +166,309 @@ def get_root_routingconf() -> str:
     return getattr(settings, 'ROOT_ROUTINGCONF', DEFAULT_ROOT_ROUTINGCONF)
 
 
+def get_polling_timeout() -> float:
+    return getattr(
+        settings,
+        'CARDROOM_POLLING_TIMEOUT',
+        DEFAULT_POLLING_TIMEOUT,
+    )
+
+
+def get_keepalive_timeout() -> float:
+    return getattr(
+        settings,
+        'CARDROOM_KEEPALIVE_TIMEOUT',
+        DEFAULT_KEEPALIVE_TIMEOUT,
+    )
+
+
+def get_streaming_lifetime() -> float:
+    return getattr(
+        settings,
+        'CARDROOM_STREAMING_LIFETIME',
+        DEFAULT_STREAMING_LIFETIME,
+    )
+
+
+def get_frame_store() -> FrameStore:
+    return getattr(settings, 'CARDROOM_FRAME_STORE', DEFAULT_FRAME_STORE)
+
+
+def get_token_cache() -> TokenCache:
+    return getattr(settings, 'CARDROOM_TOKEN_CACHE', DEFAULT_TOKEN_CACHE)
+
+
+def get_hand_recording_status() -> bool:
+    return getattr(
+        settings,
+        'CARDROOM_HAND_RECORDING_STATUS',
+        DEFAULT_HAND_RECORDING_STATUS,
+    )
+
+
+def get_hand_recorder_flush_size() -> int:
+    return getattr(
+        settings,
+        'CARDROOM_HAND_RECORDER_FLUSH_SIZE',
+        DEFAULT_HAND_RECORDER_FLUSH_SIZE,
+    )
+
+
+def get_hand_recorder_flush_interval() -> float:
+    return getattr(
+        settings,
+        'CARDROOM_HAND_RECORDER_FLUSH_INTERVAL',
+        DEFAULT_HAND_RECORDER_FLUSH_INTERVAL,
+    )
+
+
+def get_compact_storage_status() -> bool:
+    return getattr(
+        settings,
+        'CARDROOM_COMPACT_STORAGE_STATUS',
+        DEFAULT_COMPACT_STORAGE_STATUS,
+    )
+
+
+def get_replay_cache() -> ReplayCache:
+    return getattr(settings, 'CARDROOM_REPLAY_CACHE', DEFAULT_REPLAY_CACHE)
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    return getattr(
+        settings,
+        'CARDROOM_THUMBNAIL_CACHE',
+        DEFAULT_THUMBNAIL_CACHE,
+    )
+
+
+@dataclass(frozen=True)
+class Settings:
+    """The class for snapshots of the cardroom settings.
+
+    Reading Django settings is comparatively slow, especially for
+    unset ones, so code on hot paths should read the snapshot from
+    :func:`get_settings` instead of calling the individual getters.
+    """
+
+    tzinfo: ZoneInfo
+    """The timezone."""
+    divmod: Callable[[int, int], tuple[int, int]]
+    """The divmod function."""
+    parse_value: Callable[[str], int]
+    """The value parser."""
+    decimal_places: int
+    """The number of decimal places."""
+    fixed_point_status: bool
+    """The fixed-point status."""
+    auth: bool
+    """The authentication status."""
+    admin: bool
+    """The admin status."""
+    rat_holing_status: bool
+    """The rat-holing status."""
+    felt: bool
+    """The felt status."""
+    style: Style
+    """The felt style."""
+    root_routingconf: str
+    """The root routing configuration."""
+    polling_timeout: float
+    """The polling timeout."""
+    keepalive_timeout: float
+    """The keepalive timeout."""
+    streaming_lifetime: float
+    """The streaming lifetime."""
+    frame_store: FrameStore
+    """The frame store."""
+    token_cache: TokenCache
+    """The token cache."""
+    hand_recording_status: bool
+    """The hand recording status."""
+    hand_recorder_flush_size: int
+    """The hand recorder flush size."""
+    hand_recorder_flush_interval: float
+    """The hand recorder flush interval."""
+    compact_storage_status: bool
+    """The compact storage status."""
+    replay_cache: ReplayCache
+    """The replay cache."""
+    thumbnail_cache: ThumbnailCache
+    """The thumbnail cache."""
+
+    @classmethod
+    def from_settings(cls) -> Settings:
+        """Resolve the current settings.
+
+        :return: The snapshot.
+        """
+        if get_fixed_point_status() and get_decimal_places() == math.inf:
+            raise ImproperlyConfigured(
+                'Fixed-point amounts need finitely many decimal places.',
+            )
+
+        return cls(
+            get_tzinfo(),
+            get_divmod(),
+            get_parse_value(),
+            get_decimal_places(),
+            get_fixed_point_status(),
+            get_auth(),
+            get_admin(),
+            get_rat_holing_status(),
+            get_felt(),
+            get_style(),
+            get_root_routingconf(),
+            get_polling_timeout(),
+            get_keepalive_timeout(),
+            get_streaming_lifetime(),
+            get_frame_store(),
+            get_token_cache(),
+            get_hand_recording_status(),
+            get_hand_recorder_flush_size(),
+            get_hand_recorder_flush_interval(),
+            get_compact_storage_status(),
+            get_replay_cache(),
+            get_thumbnail_cache(),
+        )
+
+    def scale(self, values: Any) -> Any:
+        """Convert the amounts to how live tables hold them.
+
+        In fixed-point mode, the amounts are held as integers scaled by
+        ``10 ** decimal_places``. Otherwise, they are returned as is.
+
+        :param values: The amount, or a sequence or mapping of them.
+        :return: The converted amount or amounts.
+        """
+        if not self.fixed_point_status:
+            return values
+
+        def scale(value: Any) -> int:
+            if isinstance(value, int):
+                return value * 10 ** self.decimal_places
+
+            return round(Decimal(str(value)).scaleb(self.decimal_places))
+
+        return _map_values(scale, values)
+
+    def unscale(self, values: Any) -> Any:
+        """Convert the amounts held by live tables back.
+
+        This is the inverse of :meth:`scale`. Whole amounts are
+        converted to integers and the others to decimals, so that no
+        precision is lost.
+
+        :param values: The amount, or a sequence or mapping of them.
+        :return: The converted amount or amounts.
+        """
+        if not self.fixed_point_status:
+            return values
+
+        scale = 10 ** self.decimal_places
+
+        def unscale(value: int) -> int | Decimal:
+            quotient, remainder = builtins.divmod(value, scale)
+
+            if remainder:
+                return Decimal(value).scaleb(-self.decimal_places).normalize()
+
+            return quotient
+
+        return _map_values(unscale, values)
+
+    def make_exact(self, hh: pokerkit.HandHistory) -> pokerkit.HandHistory:
+        """Return the hand history to be replayed exactly.
+
+        Hand histories hold the amounts as JSON and PHH numbers. In
+        fixed-point mode, the returned hand history holds them as
+        decimals (see :meth:`unscale`) instead, and splits them as the
+        live tables do, so that the replays show the same amounts as
+        the tables did. Otherwise, the hand history is returned as is.
+
+        :param hh: The hand history.
+        :return: The hand history to be replayed.
+        """
+        if not self.fixed_point_status:
+            return hh
+
+        def convert(values: Any) -> Any:
+            return self.unscale(self.scale(values))
+
+        def divmod(dividend: Any, divisor: int) -> tuple[Any, Any]:
+            quotient, remainder = builtins.divmod(
+                self.scale(dividend),
+                divisor,
+            )
+
+            return self.unscale(quotient), self.unscale(remainder)
+
+        def parse_value(raw_value: str) -> Any:
+            return self.unscale(self.parse_value(raw_value))
+
+        return replace(
+            hh,
+            antes=convert(hh.antes),
+            blinds_or_straddles=convert(hh.blinds_or_straddles),
+            bring_in=convert(hh.bring_in),
+            small_bet=convert(hh.small_bet),
+            big_bet=convert(hh.big_bet),
+            min_bet=convert(hh.min_bet),
+            starting_stacks=convert(hh.starting_stacks),
+            finishing_stacks=convert(hh.finishing_stacks),
+            divmod=divmod,
+            parse_value=parse_value,
+        )
+
+    def __reduce__(self) -> tuple[Callable[[], Settings], tuple[()]]:
+        # The stores and caches are process-local and cannot be pickled.
+        return get_settings, ()
+
+
+def _map_values(function: Callable[[Any], Any], values: Any) -> Any:
+    if values is None:
+        return None
+    elif isinstance(values, Mapping):
+        return {
+            key: _map_values(function, value) for key, value in values.items()
+        }
+    elif isinstance(values, list | tuple):
+        return type(values)(_map_values(function, value) for value in values)
+
+    return function(values)
+
+
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    """Return the snapshot of the current settings.
+
+    The snapshot is resolved on first use and again after any setting
+    changes through :func:`django.test.override_settings` and the like.
+
+    :return: The snapshot.
+    """
+    global _settings
+
+    if _settings is None:
+        _settings = Settings.from_settings()
+
+    return _settings
+
+
+@receiver(setting_changed)
+def settings_setting_changed(**kwargs: Any) -> None:
+    global _settings
+
+    _settings = None
+
+
 def serialize(obj: Any) -> Any:
     if obj is None or isinstance(obj, bytes | str | int | float | bool):
         return obj
+    elif isinstance(obj, Decimal):
+        return float(obj)
     elif is_dataclass(obj):
         return serialize(asdict(obj))
     elif isinstance(obj, Mapping):
@@ -126,3 +479,83 @@ def serialize(obj: Any) -> Any:
         return obj.isoformat()
     else:
         raise AssertionError
+
+
+def get_etag(version: int) -> str:
+    """Return the entity tag of the version.
+
+    Versions restart from zero when the frame store is emptied, so
+    they are qualified by the epoch of the store (see
+    :meth:`cardroom.stores.FrameStore.get_epoch`). Otherwise, a client
+    could be told that an unrelated frame is unchanged.
+
+    :param version: The version.
+    :return: The entity tag.
+    """
+    return f'"{get_settings().frame_store.get_epoch()}-{version}"'
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[bytes]:
+    """Encode the items as a JSON array lazily.
+
+    :param items: The JSON-serializable items.
+    :return: The encoded chunks.
+    """
+    separator = b'['
+
+    for item in items:
+        yield separator + json.dumps(item, cls=DjangoJSONEncoder).encode()
+
+        separator = b','
+
+    yield b']' if separator == b',' else b'[]'
+
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress the chunks into a gzip stream lazily.
+
+    :param chunks: The uncompressed chunks.
+    :return: The compressed chunks.
+    """
+    compressor = zlib.compressobj(wbits=31)
+
+    for chunk in chunks:
+        if compressed_chunk := compressor.compress(chunk):
+            yield compressed_chunk
+
+    yield compressor.flush()
+
+
+async def aiter_sync(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    """Iterate through the chunks in the thread that runs synchronous
+    code.
+
+    This keeps database cursors in the thread they were opened in.
+
+    :param chunks: The chunks.
+    :return: The chunks.
+    """
+    get_chunk = sync_to_async(partial(next, iter(chunks), None))
+
+    while (chunk := await get_chunk()) is not None:
+        yield chunk
+
+
+def get_streaming_content(
+        request: HttpRequest,
+        chunks: Iterable[bytes],
+) -> Iterable[bytes] | AsyncIterator[bytes]:
+    """Return the chunks in the form the server streams without
+    buffering.
+
+    Under ASGI, synchronous streaming content is consumed whole before
+    being sent, so it is made asynchronous.
+
+    :param request: The request.
+    :param chunks: The chunks.
+    :return: The streaming content.
+    """
+    if isinstance(request, ASGIRequest):
+        return aiter_sync(chunks)
+
+    return chunks
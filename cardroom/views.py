@@ -1,16 +1,58 @@
+from asyncio import get_running_loop, timeout
+from collections.abc import AsyncIterator, Iterator
+from math import ceil
 from typing import Any
+import json
+import re
 
-from django.http import JsonResponse
-from django.views.generic import DetailView
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer  # type: ignore[import-untyped]
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.db.models import QuerySet
+from django.http.response import HttpResponseBase
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.views.generic import DetailView, View
+from django.views.generic.detail import SingleObjectMixin
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ModelViewSet
 
-from cardroom.models import CashGame, HandHistory, Poker
+from cardroom.felt import render_thumbnail
+from cardroom.gamemaster import Gamemaster
+from cardroom.lobbies import Lobby
+from cardroom.models import CashGame, HandHistory, Participant, Poker
 from cardroom.serializers import (
     CashGameSerializer,
     HandHistorySerializer,
     PokerSerializer,
 )
-from cardroom.utilities import get_style, serialize
+from cardroom.utilities import (
+    get_etag,
+    get_keepalive_timeout,
+    get_polling_timeout,
+    get_settings,
+    get_streaming_content,
+    get_streaming_lifetime,
+    get_style,
+    iter_gzip,
+    iter_json_array,
+    serialize,
+)
+
+ACCEPTS_GZIP_PATTERN = re.compile(r'\bgzip\b')
 
 
 class CashGameViewSet(ModelViewSet):  # type: ignore[type-arg]
@@ -18,9 +60,109 @@ class CashGameViewSet(ModelViewSet):  # type: ignore[type-arg]
     serializer_class = CashGameSerializer
 
 
+class HandHistoryPagination(CursorPagination):
+    page_size = api_settings.PAGE_SIZE or 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = '-id'
+
+
 class HandHistoryViewSet(ModelViewSet):  # type: ignore[type-arg]
     queryset = HandHistory.objects.all()
     serializer_class = HandHistorySerializer
+    pagination_class = HandHistoryPagination
+    filter_field_names = 'variant', 'event'
+    integral_filter_field_names = 'year', 'month', 'day', 'table'
+    export_chunk_size = 2000
+
+    def get_filtered_queryset(self) -> QuerySet[HandHistory]:
+        """Return the hand histories filtered by the query parameters,
+        with all their fields.
+
+        :return: The queryset.
+        """
+        queryset = super().get_queryset()
+        query_params = self.request.query_params
+
+        for name in self.filter_field_names:
+            if name in query_params:
+                queryset = queryset.filter(**{name: query_params[name]})
+
+        for name in self.integral_filter_field_names:
+            if name in query_params:
+                value = query_params[name]
+
+                if not value.isdigit():
+                    raise ValidationError(
+                        {name: 'A non-negative integer is required.'},
+                    )
+
+                queryset = queryset.filter(**{name: int(value)})
+
+        if 'player' in query_params:
+            queryset = queryset.filter(
+                id__in=Participant.objects.filter(
+                    player=query_params['player'],
+                ).values('hand_history'),
+            )
+
+        return queryset.select_related('game')
+
+    def get_queryset(self) -> QuerySet[HandHistory]:
+        queryset = self.get_filtered_queryset()
+        query_params = self.request.query_params
+
+        if self.request.method == 'GET' and 'fields' in query_params:
+            field_names = set(query_params['fields'].split(','))
+            only_field_names = {'id'}
+
+            only_field_names.update(
+                field_names.intersection(HandHistory.get_field_names()),
+            )
+
+            if field_names & {
+                    *HandHistory.game_field_names,
+                    *HandHistory.compressed_field_names,
+            }:
+                only_field_names.update(('game', 'compressed_data'))
+            else:
+                queryset = queryset.select_related(None)
+
+            queryset = queryset.only(*only_field_names)
+
+        return queryset
+
+    @action(detail=False)
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """Stream the filtered hand histories as a multi-hand PHH
+        file, gzip-compressed if ``?compression=gz`` is supplied.
+
+        :param request: The request.
+        :return: The response.
+        """
+        compression = request.query_params.get('compression')
+
+        if compression not in (None, 'gz'):
+            raise ValidationError({'compression': 'Only gz is supported.'})
+
+        queryset = self.get_filtered_queryset().order_by('pk')
+        sections = HandHistory.iter_phhs(
+            queryset.iterator(self.export_chunk_size),
+        )
+        content: Iterator[bytes] = (section.encode() for section in sections)
+        filename = 'hand-histories.phhs'
+
+        if compression == 'gz':
+            content = iter_gzip(content)
+            filename += '.gz'
+
+        response = StreamingHttpResponse(
+            get_streaming_content(request._request, content),
+            content_type='application/octet-stream',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+        return response
 
 
 class PokerViewSet(ModelViewSet):  # type: ignore[type-arg]
@@ -35,8 +177,12 @@ class CashGameFeltView(DetailView):  # type: ignore[type-arg]
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context['style'] = serialize(get_style())
-        frames = self.object.get_frames()
-        context['frame'] = serialize(frames.get(self.request.user, frames['']))
+        version, frames = Gamemaster.get_keyframe(self.object.group_name)
+        context['version'] = version
+        context['frame'] = frames.get(
+            self.request.user.get_username(),
+            frames[''],
+        )
 
         return context
 
@@ -44,37 +190,347 @@ class CashGameFeltView(DetailView):  # type: ignore[type-arg]
 class HandHistoryFeltView(DetailView):  # type: ignore[type-arg]
     model = HandHistory
     template_name = 'cardroom/handhistory_felt.html'
+    frame_page_size = 32
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context['style'] = serialize(get_style())
-        context['frames'] = serialize(self.object.frames)
+        context['frames'] = self.object.get_serialized_frames(
+            0,
+            self.frame_page_size,
+        )
+        context['frame_page_size'] = self.frame_page_size
+
+        if len(context['frames']) < self.frame_page_size:
+            context['frame_count'] = len(context['frames'])
+        else:
+            context['frame_count'] = None
 
         return context
 
 
-class CashGameFrameView(DetailView):  # type: ignore[type-arg]
-    model = CashGame
+class CashGameFrameView(View):
+    def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        try:
+            version, data = Gamemaster.get_data(
+                CashGame.get_group_name(pk),
+                request.user.get_username(),
+            )
+        except KeyError:
+            raise Http404(f'No running cash game with the id {pk} exists.')
+
+        etag = get_etag(version)
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = HttpResponse(data, content_type='application/json')
+
+        response['ETag'] = etag
+        response['X-Frame-Version'] = str(version)
+
+        patch_vary_headers(response, ('Cookie',))
+
+        return response
+
+
+class LobbyView(View):
+    def get(self, request: HttpRequest) -> HttpResponse:
+        version, data = Lobby.get_data()
+        etag = get_etag(version)
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = HttpResponse(data, content_type='application/json')
+
+        response['ETag'] = etag
+
+        return response
+
+
+class CashGameThumbnailView(View):
+    thumbnail_width = 240
+    thumbnail_height = 180
+
+    def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        group_name = CashGame.get_group_name(pk)
+        settings = get_settings()
+        cache = settings.thumbnail_cache
+
+        try:
+            version = Gamemaster.get_version(group_name)
+        except KeyError:
+            raise Http404(f'No running cash game with the id {pk} exists.')
+
+        try:
+            version, thumbnail = cache.get(group_name, version)
+        except KeyError:
+            try:
+                version, data = Gamemaster.get_data(group_name, '')
+            except KeyError:
+                raise Http404(
+                    f'No running cash game with the id {pk} exists.',
+                )
+
+            thumbnail = render_thumbnail(
+                json.loads(data),
+                settings.style,
+                self.thumbnail_width,
+                self.thumbnail_height,
+            )
+
+            cache.set(group_name, version, thumbnail)
+
+        etag = get_etag(version)
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = HttpResponse(thumbnail, content_type='image/svg+xml')
+
+        response['ETag'] = etag
+
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=ceil(cache.interval),
+        )
 
-    def render_to_response(
+        return response
+
+
+class CashGameFrameSubscriptionView(View):
+    async def get_username(self) -> str:
+        return await sync_to_async(  # type: ignore[no-any-return]
+            lambda: self.request.user.get_username(),
+        )()
+
+    def get_cursor(self) -> int:
+        return int(self.request.GET.get('cursor', 0))
+
+    async def receive(
             self,
-            context: dict[str, Any],
-            **response_kwargs: Any,
-    ) -> JsonResponse:
-        frames = self.object.get_frames()
-
-        return JsonResponse(
-            serialize(frames.get(self.request.user, frames[''])),
-            safe=False,
+            channel_name: str,
+            cursor: int,
+    ) -> tuple[int, list[dict[str, Any]]] | None:
+        """Wait for the frames broadcasted after the cursor.
+
+        :param channel_name: The subscribed channel name.
+        :param cursor: The version the client already has.
+        :return: The sequence number of the first frame and the frames,
+                 or ``None`` if the cash game was terminated.
+        """
+        channel_layer = get_channel_layer()
+
+        while True:
+            event = await channel_layer.receive(channel_name)
+
+            match event['type']:
+                case 'update' if event['version'] > cursor:
+                    frames = event['frames']
+
+                    return event['version'] - len(frames) + 1, frames
+                case 'terminate':
+                    return None
+
+
+class CashGameFramePollView(CashGameFrameSubscriptionView):
+    """The view of the latest frame of a cash game, long-polled.
+
+    The frame is returned at once if it is newer than the ``cursor``.
+    Otherwise, the response is held until a new frame is broadcasted,
+    or until the polling timeout, upon which nothing is returned. The
+    version to poll with next is returned in the ``X-Frame-Version``
+    header.
+    """
+
+    async def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        group_name = CashGame.get_group_name(pk)
+        username = await self.get_username()
+
+        try:
+            cursor = self.get_cursor()
+        except ValueError:
+            return HttpResponseBadRequest('The cursor must be an integer.')
+
+        async with Gamemaster.subscribe(group_name) as channel_name:
+            try:
+                version, data = Gamemaster.get_data(group_name, username)
+            except KeyError:
+                raise Http404(f'No running cash game with the id {pk} exists.')
+
+            if version == cursor:
+                try:
+                    async with timeout(get_polling_timeout()):
+                        received = await self.receive(channel_name, cursor)
+                except TimeoutError:
+                    received = None
+
+                if received is None:
+                    data = b''
+                else:
+                    sequence, frames = received
+                    version = sequence + len(frames) - 1
+                    data = json.dumps(
+                        frames[-1].get(username, frames[-1]['']),
+                    ).encode()
+
+        if data:
+            response = HttpResponse(data, content_type='application/json')
+        else:
+            response = HttpResponse(status=204)
+
+        response['ETag'] = get_etag(version)
+        response['X-Frame-Version'] = str(version)
+        response['Cache-Control'] = 'no-cache'
+
+        return response
+
+
+class CashGameFrameEventsView(CashGameFrameSubscriptionView):
+    def get_cursor(self) -> int:
+        if 'cursor' in self.request.GET:
+            cursor = super().get_cursor()
+        else:
+            cursor = int(self.request.headers.get('Last-Event-ID', 0))
+
+        return cursor
+
+    async def get(self, request: HttpRequest, pk: int) -> HttpResponseBase:
+        group_name = CashGame.get_group_name(pk)
+        username = await self.get_username()
+
+        try:
+            cursor = self.get_cursor()
+        except ValueError:
+            return HttpResponseBadRequest('The cursor must be an integer.')
+
+        try:
+            Gamemaster.get_version(group_name)
+        except KeyError:
+            raise Http404(f'No running cash game with the id {pk} exists.')
+
+        def encode(version: int, user_frames: dict[str, Any]) -> bytes:
+            data = json.dumps(user_frames.get(username, user_frames['']))
+
+            return b'id: %d\ndata: %s\n\n' % (version, data.encode())
+
+        def catch_up() -> Iterator[bytes]:
+            nonlocal cursor
+
+            if cursor:
+                history = Gamemaster.get_history(group_name, cursor)
+            else:
+                history = None
+
+            if history is None:
+                version, data = Gamemaster.get_data(group_name, username)
+                cursor = version
+
+                yield b'id: %d\ndata: %s\n\n' % (version, data)
+            else:
+                for cursor, user_frames in enumerate(history, cursor + 1):
+                    yield encode(cursor, user_frames)
+
+        async def stream() -> AsyncIterator[bytes]:
+            nonlocal cursor
+
+            loop = get_running_loop()
+            deadline = loop.time() + get_streaming_lifetime()
+
+            async with Gamemaster.subscribe(group_name) as channel_name:
+                for data in catch_up():
+                    yield data
+
+                while (lifetime := deadline - loop.time()) > 0:
+                    try:
+                        async with timeout(
+                                min(get_keepalive_timeout(), lifetime),
+                        ):
+                            received = await self.receive(
+                                channel_name,
+                                cursor,
+                            )
+                    except TimeoutError:
+                        yield b': keepalive\n\n'
+
+                        continue
+
+                    if received is None:
+                        break
+
+                    sequence, frames = received
+
+                    if sequence > cursor + 1:
+                        try:
+                            for data in catch_up():
+                                yield data
+                        except KeyError:
+                            break
+
+                        continue
+
+                    for i, user_frames in enumerate(frames, sequence):
+                        if i > cursor:
+                            cursor = i
+
+                            yield encode(i, user_frames)
+
+        response = StreamingHttpResponse(
+            stream(),
+            content_type='text/event-stream',
         )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+
+        return response
 
 
-class HandHistoryFramesView(DetailView):  # type: ignore[type-arg]
+class HandHistoryFramesView(
+        SingleObjectMixin,  # type: ignore[type-arg]
+        View,
+):
     model = HandHistory
 
-    def render_to_response(
+    def get(
             self,
-            context: dict[str, Any],
-            **response_kwargs: Any,
-    ) -> JsonResponse:
-        return JsonResponse(serialize(self.object.frames), safe=False)
+            request: HttpRequest,
+            *args: Any,
+            **kwargs: Any,
+    ) -> HttpResponseBase:
+        stop: int | None = None
+
+        try:
+            start = int(request.GET.get('start', 0))
+
+            if 'stop' in request.GET:
+                stop = int(request.GET['stop'])
+        except ValueError:
+            return HttpResponseBadRequest('The range must be integral.')
+
+        if start < 0 or (stop is not None and stop < 0):
+            return HttpResponseBadRequest('The range must be non-negative.')
+
+        replay = self.get_object().get_replay()
+        content = iter_json_array(replay.iter_frames(start, stop))
+        gzip_status = ACCEPTS_GZIP_PATTERN.search(
+            request.headers.get('Accept-Encoding', ''),
+        ) is not None
+
+        if gzip_status:
+            content = iter_gzip(content)
+
+        response = StreamingHttpResponse(
+            get_streaming_content(request, content),
+            content_type='application/json',
+        )
+
+        if gzip_status:
+            response['Content-Encoding'] = 'gzip'
+
+        # The frame count is only sent if known, as counting the frames
+        # would replay the whole hand before the first byte is sent.
+        if stop is not None and replay.known_frame_count is not None:
+            response['X-Frame-Count'] = replay.known_frame_count
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        return response
@@ -15,7 +15,9 @@ default settings by cardroom.
 
 from pathlib import Path
 
+from cardroom.caches import ReplayCache, ThumbnailCache, TokenCache
 from cardroom.felt import Style
+from cardroom.stores import InMemoryFrameStore
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent
@@ -83,7 +85,7 @@ ASGI_APPLICATION = 'cardroom.asgi.application'
 
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        'BACKEND': 'cardroom.layers.InMemoryChannelLayer',
     },
 }
 
@@ -179,7 +181,7 @@ REST_FRAMEWORK = {
 }
 
 # Cardroom
-# https://cardroom.readthedocs.io/en/stable/
+# https://cardroom.readthedocs.io/en/stable/settings.html
 
 # Use integral values
 
@@ -189,6 +191,11 @@ CARDROOM_PARSE_VALUE = 'cardroom.utilities.parse_value'
 
 CARDROOM_DECIMAL_PLACES = 0
 
+# Hold the amounts of live tables as integers scaled by the decimal
+# places
+
+CARDROOM_FIXED_POINT_STATUS = False
+
 # Enable authentation APIs
 
 CARDROOM_AUTH = True
@@ -208,3 +215,48 @@ CARDROOM_FELT = True
 # Override felt style
 
 CARDROOM_STYLE = Style()
+
+# Long-poll frame requests give up after this many seconds
+
+CARDROOM_POLLING_TIMEOUT = 30
+
+# Frame event streams send a keepalive after this many idle seconds
+
+CARDROOM_KEEPALIVE_TIMEOUT = 15
+
+# Frame event streams end after this many seconds, after which clients
+# reconnect from where they left off
+
+CARDROOM_STREAMING_LIFETIME = 300
+
+# Store the latest frames in the process (use SharedMemoryFrameStore or
+# CacheFrameStore when running several workers)
+
+CARDROOM_FRAME_STORE = InMemoryFrameStore()
+
+# Cache websocket token authentication for this many seconds
+
+CARDROOM_TOKEN_CACHE = TokenCache(ttl=60)
+
+# Save played hands in batches of up to this many, at least once every
+# this many seconds
+
+CARDROOM_HAND_RECORDING_STATUS = True
+
+CARDROOM_HAND_RECORDER_FLUSH_SIZE = 100
+
+CARDROOM_HAND_RECORDER_FLUSH_INTERVAL = 5
+
+# Store new hand histories with their games shared and their actions
+# compressed
+
+CARDROOM_COMPACT_STORAGE_STATUS = False
+
+# Keep the replays of this many hand histories in each process
+
+CARDROOM_REPLAY_CACHE = ReplayCache(size=256)
+
+# Render lobby thumbnails of each table at most once every this many
+# seconds
+
+CARDROOM_THUMBNAIL_CACHE = ThumbnailCache(interval=5)